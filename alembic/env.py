@@ -21,6 +21,10 @@ from app.config import settings
 from app.models.user import User
 from app.models.transaction import Transaction
 from app.models.category import Category
+from app.models.transaction_rollup import TransactionRollup
+from app.models.budget import Budget
+from app.models.recurring_transaction import RecurringTransaction
+from app.models.exchange_rate import ExchangeRate
 
 # Set the database URL from your settings
 config.set_main_option("sqlalchemy.url", settings.database_url)
@@ -45,6 +49,14 @@ if config.config_file_name is not None:
 # ... etc.
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Leave the SQLite full-text search tables (transactions_fts and its shadow tables, created
+    by migration c6e2b7d9f4a1, not by the models) out of autogenerate, which would drop them.
+    """
+    return not (type_ == "table" and name.startswith("transactions_fts"))
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -61,6 +73,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -81,7 +94,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -1,7 +1,7 @@
 """Add categories and update transactions
 
 Revision ID: 44034f855ee9
-Revises: 
+Revises: 0b1d5e3a7c92
 Create Date: 2025-12-20 23:59:34.173016
 
 """
@@ -13,7 +13,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision: str = '44034f855ee9'
-down_revision: Union[str, Sequence[str], None] = None
+down_revision: Union[str, Sequence[str], None] = '0b1d5e3a7c92'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
@@ -35,16 +35,21 @@ def upgrade() -> None:
     op.create_index(op.f('ix_categories_id'), 'categories', ['id'], unique=False)
     op.create_index(op.f('ix_categories_name'), 'categories', ['name'], unique=False)
     op.create_index(op.f('ix_categories_user_id'), 'categories', ['user_id'], unique=False)
-    op.add_column('transactions', sa.Column('category_id', sa.Integer(), nullable=True))
-    op.create_foreign_key(None, 'transactions', 'categories', ['category_id'], ['id'], ondelete='SET NULL')
+    # Batch mode: SQLite cannot add a constraint with ALTER TABLE (the table is recreated there).
+    # The name is the one PostgreSQL gives the constraint by default.
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('transactions_category_id_fkey', 'categories', ['category_id'], ['id'],
+                                    ondelete='SET NULL')
     # ### end Alembic commands ###
 
 
 def downgrade() -> None:
     """Downgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_constraint(None, 'transactions', type_='foreignkey')
-    op.drop_column('transactions', 'category_id')
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.drop_constraint('transactions_category_id_fkey', type_='foreignkey')
+        batch_op.drop_column('category_id')
     op.drop_index(op.f('ix_categories_user_id'), table_name='categories')
     op.drop_index(op.f('ix_categories_name'), table_name='categories')
     op.drop_index(op.f('ix_categories_id'), table_name='categories')
@@ -0,0 +1,28 @@
+"""Add composite index for transactions keyset pagination
+
+Revision ID: 7c1d2e9a4b3f
+Revises: 44034f855ee9
+Create Date: 2026-10-17 16:05:12.418233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1d2e9a4b3f'
+down_revision: Union[str, Sequence[str], None] = '44034f855ee9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_transactions_user_date_id', 'transactions', ['user_id', 'date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_user_date_id', table_name='transactions')
@@ -0,0 +1,29 @@
+"""Add currency to recurring transaction templates
+
+Revision ID: 9f4c2b7e1d3a
+Revises: e7a2c9d4b6f1
+Create Date: 2026-10-18 14:03:27.912461
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f4c2b7e1d3a'
+down_revision: Union[str, Sequence[str], None] = 'e7a2c9d4b6f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL: the user's own currency, which is what every existing template is in
+    op.add_column('recurring_transactions', sa.Column('currency', sa.String(length=3), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('recurring_transactions', 'currency')
@@ -0,0 +1,28 @@
+"""Add users.data_version
+
+Revision ID: a8d3f5b2c9e1
+Revises: f1c3a8e6d4b7
+Create Date: 2026-10-17 20:41:09.377154
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d3f5b2c9e1'
+down_revision: Union[str, Sequence[str], None] = 'f1c3a8e6d4b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'data_version')
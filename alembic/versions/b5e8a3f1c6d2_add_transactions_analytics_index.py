@@ -0,0 +1,29 @@
+"""Add covering index for transaction analytics
+
+Revision ID: b5e8a3f1c6d2
+Revises: 7c1d2e9a4b3f
+Create Date: 2026-10-17 17:02:40.913527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e8a3f1c6d2'
+down_revision: Union[str, Sequence[str], None] = '7c1d2e9a4b3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_transactions_user_type_date_category_amount', 'transactions',
+                    ['user_id', 'transaction_type', 'date', 'category_id', 'amount'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_user_type_date_category_amount', table_name='transactions')
@@ -0,0 +1,60 @@
+"""Add transaction filter indexes and description full-text search
+
+Revision ID: c6e2b7d9f4a1
+Revises: a8d3f5b2c9e1
+Create Date: 2026-10-17 21:26:52.148830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e2b7d9f4a1'
+down_revision: Union[str, Sequence[str], None] = 'a8d3f5b2c9e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.models.transaction.SQLITE_FTS_DDL as of this revision
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(description, content='transactions', content_rowid='id')",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF description ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+        INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description);
+    END""",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_transactions_user_category_date_id', 'transactions', ['user_id', 'category_id', 'date', 'id'], unique=False)
+    op.create_index('ix_transactions_user_amount', 'transactions', ['user_id', 'amount'], unique=False)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index('ix_transactions_description_tsv', 'transactions',
+                        [sa.text("to_tsvector('simple', coalesce(description, ''))")], unique=False, postgresql_using='gin')
+    elif op.get_bind().dialect.name == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+        # Index the existing rows
+        op.execute("INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_transactions_description_tsv', table_name='transactions')
+    elif op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('transactions_fts_ai', 'transactions_fts_ad', 'transactions_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS transactions_fts")
+    op.drop_index('ix_transactions_user_amount', table_name='transactions')
+    op.drop_index('ix_transactions_user_category_date_id', table_name='transactions')
@@ -0,0 +1,42 @@
+"""Add transaction_rollups table
+
+Revision ID: d2a7c4e8f913
+Revises: b5e8a3f1c6d2
+Create Date: 2026-10-17 17:31:08.206114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7c4e8f913'
+down_revision: Union[str, Sequence[str], None] = 'b5e8a3f1c6d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('transaction_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.Enum('DAY', 'MONTH', name='rollupgranularity'), nullable=False),
+    sa.Column('period', sa.Date(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    # Reuses the enum type of transactions.transaction_type
+    sa.Column('transaction_type', postgresql.ENUM('INCOME', 'EXPENSE', name='transactiontype', create_type=False), nullable=False),
+    sa.Column('total', sa.DECIMAL(precision=14, scale=2), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'granularity', 'period', 'category_id', 'transaction_type')
+    )
+    # Backfill from the existing transactions: python -m app.services.rollup_service
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('transaction_rollups')
+    sa.Enum(name='rollupgranularity').drop(op.get_bind(), checkfirst=True)
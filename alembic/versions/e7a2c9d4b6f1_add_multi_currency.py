@@ -0,0 +1,64 @@
+"""Add currencies to users, transactions and rollups, and the exchange_rates table
+
+Revision ID: e7a2c9d4b6f1
+Revises: c6e2b7d9f4a1
+Create Date: 2026-10-18 09:12:40.517302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a2c9d4b6f1'
+down_revision: Union[str, Sequence[str], None] = 'c6e2b7d9f4a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_KEY = ['user_id', 'granularity', 'period', 'category_id', 'transaction_type']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('currency', sa.String(length=3), server_default='USD', nullable=False))
+    op.add_column('users', sa.Column('is_admin', sa.Boolean(), server_default=sa.false(), nullable=False))
+    # NULL: the user's own currency, which is what every existing transaction is in
+    op.add_column('transactions', sa.Column('currency', sa.String(length=3), nullable=True))
+    op.drop_index('ix_transactions_user_type_date_category_amount', table_name='transactions')
+    op.create_index('ix_transactions_user_type_date_category_amount_currency', 'transactions',
+                    ['user_id', 'transaction_type', 'date', 'category_id', 'amount', 'currency'], unique=False)
+    # Existing rollups are all in the users' own currency ('')
+    # SQLite recreates the table, where the new (named) primary key replaces the reflected unnamed one
+    with op.batch_alter_table('transaction_rollups') as batch_op:
+        batch_op.add_column(sa.Column('currency', sa.String(length=3), server_default='', nullable=False))
+        if op.get_bind().dialect.name != 'sqlite':
+            batch_op.drop_constraint('transaction_rollups_pkey', type_='primary')
+        batch_op.create_primary_key('transaction_rollups_pkey', ROLLUP_KEY + ['currency'])
+    op.create_table('exchange_rates',
+    sa.Column('base', sa.String(length=3), nullable=False),
+    sa.Column('quote', sa.String(length=3), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('rate', sa.DECIMAL(precision=18, scale=8), nullable=False),
+    sa.PrimaryKeyConstraint('base', 'quote', 'date')
+    )
+    # Load rates with POST /api/v1/exchange-rates or: python -m app.services.currency_service rates.csv
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('exchange_rates')
+    # Foreign-currency rollups cannot be folded back without converting them
+    op.execute("DELETE FROM transaction_rollups WHERE currency <> ''")
+    with op.batch_alter_table('transaction_rollups') as batch_op:
+        if op.get_bind().dialect.name != 'sqlite':
+            batch_op.drop_constraint('transaction_rollups_pkey', type_='primary')
+        batch_op.create_primary_key('transaction_rollups_pkey', ROLLUP_KEY)
+        batch_op.drop_column('currency')
+    op.drop_index('ix_transactions_user_type_date_category_amount_currency', table_name='transactions')
+    op.create_index('ix_transactions_user_type_date_category_amount', 'transactions',
+                    ['user_id', 'transaction_type', 'date', 'category_id', 'amount'], unique=False)
+    op.drop_column('transactions', 'currency')
+    op.drop_column('users', 'is_admin')
+    op.drop_column('users', 'currency')
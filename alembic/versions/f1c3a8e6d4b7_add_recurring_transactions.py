@@ -0,0 +1,63 @@
+"""Add recurring_transactions table
+
+Revision ID: f1c3a8e6d4b7
+Revises: e4b9d1c7a2f5
+Create Date: 2026-10-17 19:03:27.814265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c3a8e6d4b7'
+down_revision: Union[str, Sequence[str], None] = 'e4b9d1c7a2f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('recurring_transactions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('amount', sa.DECIMAL(precision=10, scale=2), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    # Reuses the enum type of transactions.transaction_type
+    sa.Column('transaction_type', postgresql.ENUM('INCOME', 'EXPENSE', name='transactiontype', create_type=False), nullable=False),
+    sa.Column('frequency', sa.Enum('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY', name='recurrencefrequency'), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('next_occurrence_date', sa.Date(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_recurring_transactions_id'), 'recurring_transactions', ['id'], unique=False)
+    op.create_index(op.f('ix_recurring_transactions_user_id'), 'recurring_transactions', ['user_id'], unique=False)
+    op.create_index('ix_recurring_transactions_active_next', 'recurring_transactions', ['is_active', 'next_occurrence_date'], unique=False)
+    # Batch mode: SQLite cannot add constraints with ALTER TABLE (the table is recreated there)
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.add_column(sa.Column('recurring_transaction_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('transactions_recurring_transaction_id_fkey', 'recurring_transactions',
+                                    ['recurring_transaction_id'], ['id'], ondelete='SET NULL')
+        batch_op.create_unique_constraint('uq_transaction_recurring_occurrence', ['recurring_transaction_id', 'date'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.drop_constraint('uq_transaction_recurring_occurrence', type_='unique')
+        batch_op.drop_constraint('transactions_recurring_transaction_id_fkey', type_='foreignkey')
+        batch_op.drop_column('recurring_transaction_id')
+    op.drop_index('ix_recurring_transactions_active_next', table_name='recurring_transactions')
+    op.drop_index(op.f('ix_recurring_transactions_user_id'), table_name='recurring_transactions')
+    op.drop_index(op.f('ix_recurring_transactions_id'), table_name='recurring_transactions')
+    op.drop_table('recurring_transactions')
+    sa.Enum(name='recurrencefrequency').drop(op.get_bind(), checkfirst=True)
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
+from typing import Optional
 
 class Settings(BaseSettings):
     # Application
@@ -11,10 +12,71 @@ class Settings(BaseSettings):
     secret_key: str  # ← No default, must come from .env
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # Cache of already verified tokens, keyed by token digest
+    token_cache_enabled: bool = True
+    token_cache_max_size: int = 10000
+    # Authenticated user cache (max_size 0 disables it)
+    user_cache_max_size: int = 10000
+    user_cache_ttl_seconds: int = 60
+    # Owned category ids per user, checked on every transaction write (max_size 0 disables it)
+    category_cache_max_size: int = 10000
+    category_cache_ttl_seconds: int = 300
+    
+    # Password hashing (Argon2 cost, and the pool that runs it off the event loop)
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536  # KiB
+    argon2_parallelism: int = 4
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64  # queued + running jobs before answering 503
     
     # Database
     database_url: str  # ← No default, must come from .env
     db_echo: bool = False
+    # Optional override for the async engine (derived from database_url when empty)
+    async_database_url: Optional[str] = None
+    # False: request sessions use the sync engine (DATABASE_URL's own driver) with each query run
+    # in the threadpool, instead of the async driver; the read replica is then not used
+    database_async: bool = True
+    # Optional read replica (same URL forms as database_url) serving the read-only endpoints;
+    # a user's reads stay on the primary for replica_sticky_seconds after each of their writes
+    replica_database_url: Optional[str] = None
+    replica_sticky_seconds: float = 5.0
+    replica_sticky_max_users: int = 100000
+    # Per-request SQL tracking (Server-Timing header, request log); strict mode fails a request
+    # running one statement shape more than sql_repeated_statement_limit times (N+1 queries)
+    sql_strict_mode: bool = False
+    sql_repeated_statement_limit: int = 5
+    # Startup: refuse to serve a database that is not at the Alembic head revision (tables are
+    # never created by the app), then open this many pool connections before /ready says so
+    schema_check_enabled: bool = True
+    pool_prewarm_connections: int = 2
+    
+    # Pagination
+    default_page_size: int = 100
+    max_page_size: int = 500
+    bulk_create_max_items: int = 5000
+    
+    # Analytics: buckets one GET /analytics/timeseries may return (1100 days: three years daily)
+    timeseries_max_buckets: int = 1100
+    
+    # Export / import
+    export_batch_size: int = 1000  # rows fetched per round-trip and written per chunk
+    import_batch_size: int = 1000  # rows inserted (and committed) together
+    import_max_errors: int = 100  # errors listed in the import report
+    
+    # Currencies: the exchange rate table is held in memory per worker and reloaded after
+    # exchange_rate_reload_seconds; pairs without a stored rate are crossed through the pivot
+    exchange_rate_reload_seconds: int = 300
+    exchange_rate_pivot: str = "USD"
+    # Optional external rate provider (exchangerate-api.com style), used by POST /exchange-rates/fetch;
+    # the URL may contain {base}, {year}, {month} and {day}
+    exchange_rate_provider_url: Optional[str] = None
+    
+    # Recurring transactions scheduler
+    recurring_scheduler_enabled: bool = True
+    recurring_batch_size: int = 1000  # templates locked and materialized per commit
+    recurring_poll_seconds: int = 60  # longest sleep between two due checks
+    recurring_reload_seconds: int = 600  # rebuild the due queue from the database (other workers' templates)
     
     model_config = ConfigDict(
         env_file=".env",
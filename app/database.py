@@ -1,20 +1,122 @@
-from sqlalchemy import create_engine
+from datetime import datetime, timezone
+from sqlalchemy import DateTime, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.types import TypeDecorator
 from app.config import settings
+from app.utils.metrics import InstrumentedAsyncQueuePool
+from app.utils.query_stats import instrument_engine
+from app.utils.cache import TTLCache
+from app.utils.threaded_session import ThreadedSession
 
 
-# Create engine
+# Async drivers used for each sync URL scheme we accept in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """Swap the driver of a sync URL for its async one (psycopg2 -> asyncpg, pysqlite -> aiosqlite)."""
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def get_async_database_url() -> str:
+    """
+    Return the URL for the async engine.
+    Uses ASYNC_DATABASE_URL when set, otherwise swaps the driver of DATABASE_URL.
+    """
+    if settings.async_database_url:
+        return settings.async_database_url
+    return to_async_url(settings.database_url)
+
+
+def get_async_pool_class(url: str):
+    """
+    Queue pool timing connection checkouts for /metrics, where the driver pools by default
+    (in-memory SQLite keeps its single shared connection).
+    """
+    parsed = make_url(url)
+    default = parsed.get_dialect().get_pool_class(parsed)
+    return InstrumentedAsyncQueuePool if issubclass(default, AsyncAdaptedQueuePool) else default
+
+
+# Create engine (sync: used by alembic, scripts and background jobs)
 engine = create_engine(
     settings.database_url,  # ← lowercase
     pool_pre_ping=True,
     echo=settings.db_echo
 )# to print sql queries in debug mode
 
+# Create the async engine used by the API routers
+async_database_url = get_async_database_url()
+async_engine = create_async_engine(
+    async_database_url,
+    poolclass=get_async_pool_class(async_database_url),
+    pool_pre_ping=True,
+    echo=settings.db_echo
+)
+
+# Optional read replica for the read-only endpoints (see get_read_db)
+replica_engine = None
+if settings.replica_database_url:
+    replica_database_url = to_async_url(settings.replica_database_url)
+    replica_engine = create_async_engine(
+        replica_database_url,
+        poolclass=get_async_pool_class(replica_database_url),
+        pool_pre_ping=True,
+        echo=settings.db_echo
+    )
+
+# Statement counts and database time per request (Server-Timing, request log, N+1 strict mode)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+if replica_engine is not None:
+    instrument_engine(replica_engine.sync_engine)
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Request sessions of the sync path (database_async off), with the async sessions' semantics
+ThreadedSessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+# Objects stay usable after commit so responses can be built without another round-trip
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+ReplicaSessionLocal = (
+    async_sessionmaker(bind=replica_engine, autoflush=False, expire_on_commit=False)
+    if replica_engine is not None else None
+)
+
+# Users who wrote recently: their reads stay on the primary until the replica has caught up.
+# Per process, like the other caches (a user's next request may reach another worker, so keep
+# replica_sticky_seconds comfortably above the usual replication lag)
+recent_writers: TTLCache[int, bool] = TTLCache(
+    max_size=settings.replica_sticky_max_users,
+    ttl=settings.replica_sticky_seconds
+)
+
+class UTCDateTime(TypeDecorator):
+    """
+    Timestamp stored as naive UTC (timestamp without time zone). Aware values are converted to
+    UTC and made naive before binding: asyncpg rejects aware values for these columns (psycopg2
+    let them through), and SQLite would store their local wall time instead.
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
 
-# Create Base class for models
-Base = declarative_base()
+# Create Base class for models (every Mapped[datetime] column is a UTCDateTime)
+Base = declarative_base(type_annotation_map={datetime: UTCDateTime})
 
 
 # Dependency to get DB session
@@ -25,3 +127,23 @@ def get_db():
     finally:
         db.close()
 
+
+# Dependency to get an async DB session (a ThreadedSession over the sync engine with database_async off)
+async def get_async_db():
+    if not settings.database_async:
+        async with ThreadedSession(ThreadedSessionLocal()) as db:
+            yield db
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def mark_user_write(user_id: int) -> None:
+    """Send the user's reads to the primary for the next replica_sticky_seconds (no-op without a replica)."""
+    if ReplicaSessionLocal is not None:
+        recent_writers.set(user_id, True)
+
+
+def reads_from_primary(user_id: int) -> bool:
+    """True when the user's reads must not go to the replica (none configured, sync path, or a recent write)."""
+    return ReplicaSessionLocal is None or not settings.database_async or recent_writers.get(user_id) is not None
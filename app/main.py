@@ -1,23 +1,48 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response, status
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import logging
+import time
 import httpx
 from app.config import settings
-from app.database import engine, Base
+from app.database import async_engine
+from app.utils.security import shutdown_password_executor
+from app.utils.metrics import CONTENT_TYPE, MetricsMiddleware, render_metrics
+from app.utils.query_stats import QueryStatsMiddleware
+from app.utils.startup import verify_schema_revision, prewarm_pool, precompile_schemas
+from app.services.recurring_service import recurring_scheduler
+from app.services.currency_service import ExchangeRateError
 # Import models to register them with Base
-from app.routers import auth , users , transactions , categories
+from app.routers import auth , users , transactions , categories , export , imports , analytics , budgets , recurring , currencies
+
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Create tables and httpx client
-    print("Starting up...")
-    Base.metadata.create_all(bind=engine)
+    # Startup: check the schema, warm the pool and schemas up, then report ready (/ready)
+    start = time.perf_counter()
+    app.state.ready = False
+    if settings.schema_check_enabled:
+        await verify_schema_revision(async_engine)
+    await prewarm_pool(async_engine, settings.pool_prewarm_connections)
+    precompile_schemas(app)
     app.state.http_client = httpx.AsyncClient()
+    # Materializes due recurring transactions in the background
+    if settings.recurring_scheduler_enabled:
+        recurring_scheduler.start()
+    app.state.startup_seconds = time.perf_counter() - start
+    app.state.ready = True
+    logger.info("Ready in %.1f ms", app.state.startup_seconds * 1000)
     
     yield
     
-    # Shutdown: Close httpx client
-    print("Shutting down...")
+    # Shutdown: stop taking traffic, then close the scheduler, httpx client and pool
+    app.state.ready = False
+    await recurring_scheduler.stop()
     await app.state.http_client.aclose()
+    await async_engine.dispose()
+    shutdown_password_executor()
 
 app = FastAPI(
     title=settings.app_name,
@@ -25,12 +50,29 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Per-route request counts, latency histograms and in-flight gauge, served at /metrics
+app.add_middleware(MetricsMiddleware)
+# SQL statements and database time per request, in Server-Timing and the request log
+app.add_middleware(QueryStatsMiddleware)
+
 # Include routers here later
 # app.include_router(auth_router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(auth.router , prefix=f"{settings.api_v1_str}/auth", tags=["Authentication"] )
 app.include_router(users.users_router , prefix=f"{settings.api_v1_str}/users", tags=["Users"] )
 app.include_router(transactions.router , prefix=f"{settings.api_v1_str}", tags=["Transactions"] )
 app.include_router(categories.router , prefix=f"{settings.api_v1_str}", tags=["Categories"] )
+app.include_router(export.router , prefix=f"{settings.api_v1_str}", tags=["Export"] )
+app.include_router(imports.router , prefix=f"{settings.api_v1_str}", tags=["Import"] )
+app.include_router(analytics.router , prefix=f"{settings.api_v1_str}", tags=["Analytics"] )
+app.include_router(budgets.router , prefix=f"{settings.api_v1_str}", tags=["Budgets"] )
+app.include_router(recurring.router , prefix=f"{settings.api_v1_str}", tags=["Recurring Transactions"] )
+app.include_router(currencies.router , prefix=f"{settings.api_v1_str}", tags=["Currencies"] )
+
+
+@app.exception_handler(ExchangeRateError)
+async def exchange_rate_error_handler(request: Request, exc: ExchangeRateError):
+    """An amount in a currency without rates to the one asked for cannot be converted."""
+    return JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, content={"detail": str(exc)})
 
 
 @app.get("/")
@@ -43,4 +85,17 @@ async def read_root():
 
 @app.get("/health")
 async def check_health():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/ready")
+async def check_ready(response: Response):
+    """Readiness (unlike /health, liveness): 503 until startup warm-up is done and again once shutdown starts."""
+    if not getattr(app.state, "ready", False):
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "not ready"}
+    return {"status": "ready"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request and connection pool metrics in the Prometheus text format."""
+    return Response(render_metrics(async_engine.pool), media_type=CONTENT_TYPE)
@@ -1,4 +1,9 @@
 from .user import User
-#from .transaction import Transaction 
+from .category import Category
+from .transaction import Transaction
+from .transaction_rollup import TransactionRollup
+from .budget import Budget
+from .recurring_transaction import RecurringTransaction
+from .exchange_rate import ExchangeRate
 
-__all__ = ["User"]
\ No newline at end of file
+__all__ = ["User", "Category", "Transaction", "TransactionRollup", "Budget", "RecurringTransaction", "ExchangeRate"]
\ No newline at end of file
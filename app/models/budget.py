@@ -0,0 +1,29 @@
+import enum
+from datetime import datetime, timezone, date
+from decimal import Decimal
+from sqlalchemy import ForeignKey, Enum as SQLAlchemyEnum, DECIMAL
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.database import Base
+
+class BudgetPeriod(str, enum.Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+    YEARLY = "yearly"
+
+class Budget(Base):
+    __tablename__ = "budgets"
+    
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    # NULL means the budget covers all expenses
+    category_id: Mapped[int | None] = mapped_column(ForeignKey("categories.id", ondelete="CASCADE"), nullable=True)
+    amount: Mapped[Decimal] = mapped_column(DECIMAL(10, 2))
+    period: Mapped[BudgetPeriod] = mapped_column(SQLAlchemyEnum(BudgetPeriod), nullable=False)
+    start_date: Mapped[date] = mapped_column()
+    end_date: Mapped[date | None] = mapped_column(nullable=True)
+    # Using a lambda for default ensures the time is calculated at insertion
+    created_at: Mapped[datetime] = mapped_column(default=lambda: datetime.now(timezone.utc))
+    
+    # Relationship back to User 
+    user = relationship("User", back_populates="budgets")
@@ -0,0 +1,17 @@
+import datetime
+from decimal import Decimal
+from sqlalchemy import DECIMAL, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class ExchangeRate(Base):
+    """
+    Historical exchange rates: 1 unit of base is worth `rate` units of quote from `date`
+    until the pair's next row. Read whole into memory (see app.services.currency_service).
+    """
+    __tablename__ = "exchange_rates"
+    
+    base: Mapped[str] = mapped_column(String(3), primary_key=True)
+    quote: Mapped[str] = mapped_column(String(3), primary_key=True)
+    date: Mapped[datetime.date] = mapped_column(primary_key=True)
+    rate: Mapped[Decimal] = mapped_column(DECIMAL(18, 8))
@@ -0,0 +1,40 @@
+import enum
+from datetime import datetime, timezone, date
+from decimal import Decimal
+from sqlalchemy import ForeignKey, Enum as SQLAlchemyEnum, DECIMAL, String, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.database import Base
+from app.models.transaction import TransactionType
+
+class RecurrenceFrequency(str, enum.Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+    YEARLY = "yearly"
+
+class RecurringTransaction(Base):
+    __tablename__ = "recurring_transactions"
+    __table_args__ = (
+        # The scheduler's due scan: active templates ordered by their next occurrence
+        Index("ix_recurring_transactions_active_next", "is_active", "next_occurrence_date"),
+    )
+    
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    category_id: Mapped[int | None] = mapped_column(ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
+    amount: Mapped[Decimal] = mapped_column(DECIMAL(10, 2))
+    # As transactions.currency: NULL means the user's own currency, copied onto each occurrence
+    currency: Mapped[str | None] = mapped_column(String(3), nullable=True)
+    description: Mapped[str | None] = mapped_column(String)
+    transaction_type: Mapped[TransactionType] = mapped_column(SQLAlchemyEnum(TransactionType), nullable=False)
+    frequency: Mapped[RecurrenceFrequency] = mapped_column(SQLAlchemyEnum(RecurrenceFrequency), nullable=False)
+    start_date: Mapped[date] = mapped_column()
+    end_date: Mapped[date | None] = mapped_column(nullable=True)
+    # First occurrence not materialized yet; advanced in the same commit as the inserted transactions
+    next_occurrence_date: Mapped[date] = mapped_column()
+    is_active: Mapped[bool] = mapped_column(default=True)
+    # Using a lambda for default ensures the time is calculated at insertion
+    created_at: Mapped[datetime] = mapped_column(default=lambda: datetime.now(timezone.utc))
+    
+    # Relationship back to User 
+    user = relationship("User", back_populates="recurring_transactions")
@@ -1,10 +1,12 @@
 import enum
 from datetime import datetime, timezone, date
 from decimal import Decimal
-from sqlalchemy import ForeignKey, Enum as SQLAlchemyEnum, DECIMAL, String
+from sqlalchemy import ForeignKey, Enum as SQLAlchemyEnum, DECIMAL, String, Index, UniqueConstraint, DDL, event, func, literal_column, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects import postgresql  # noqa: F401 (registers func.to_tsvector / to_tsquery)
 from app.database import Base
 
+
 # Inheriting from str ensures it works well with Pydantic/JSON
 class TransactionType(str, enum.Enum):
     INCOME = "income"
@@ -12,6 +14,18 @@ class TransactionType(str, enum.Enum):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Backs keyset pagination ordered by (date, id) for a single user
+        Index("ix_transactions_user_date_id", "user_id", "date", "id"),
+        # Covering index for the analytics aggregates (filter by type/date, group by category and currency, sum amount)
+        Index("ix_transactions_user_type_date_category_amount_currency",
+              "user_id", "transaction_type", "date", "category_id", "amount", "currency"),
+        # One transaction per template and occurrence: a template can never be materialized twice
+        UniqueConstraint("recurring_transaction_id", "date", name="uq_transaction_recurring_occurrence"),
+        # List filters: by category (IS NULL for uncategorized) newest first, and by amount range
+        Index("ix_transactions_user_category_date_id", "user_id", "category_id", "date", "id"),
+        Index("ix_transactions_user_amount", "user_id", "amount"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
@@ -19,8 +33,17 @@ class Transaction(Base):
     
     category_id: Mapped[int | None] = mapped_column(ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
     
+    # Template this transaction was generated from, if any
+    recurring_transaction_id: Mapped[int | None] = mapped_column(
+        ForeignKey("recurring_transactions.id", ondelete="SET NULL"), nullable=True
+    )
+    
     amount: Mapped[Decimal] = mapped_column(DECIMAL(10, 2), index=True)
     
+    # ISO 4217 code of the amount; NULL means the user's own currency (so rows written without
+    # one, and every row from before currencies existed, need no conversion)
+    currency: Mapped[str | None] = mapped_column(String(3), nullable=True)
+    
     description: Mapped[str | None] = mapped_column(String)
     
     # The Enum Column
@@ -36,4 +59,31 @@ class Transaction(Base):
     # Relationship back to User 
     user = relationship("User", back_populates="transactions")
     # Relationship to Category (many transactions -> one category)
-    category = relationship("Category", back_populates="transactions")
\ No newline at end of file
+    # lazy="raise": every read path must choose a loader (selectinload/joinedload) instead of
+    # silently firing one SELECT per row while the response is serialized
+    category = relationship("Category", back_populates="transactions", lazy="raise")
+
+
+# Full-text search on description.
+# Postgres: GIN index on the description's tsvector; the search filter must use this same expression
+DESCRIPTION_TSVECTOR = func.to_tsvector(text("'simple'"), func.coalesce(Transaction.__table__.c.description, literal_column("''")))
+Index("ix_transactions_description_tsv", DESCRIPTION_TSVECTOR, postgresql_using="gin").ddl_if(dialect="postgresql")
+
+# SQLite: FTS5 index over description (external content, rowid = transactions.id) kept in sync by triggers
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(description, content='transactions', content_rowid='id')",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF description ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+        INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description);
+    END""",
+]
+for statement in SQLITE_FTS_DDL:
+    event.listen(Transaction.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Transaction.__table__, "before_drop",
+             DDL("DROP TABLE IF EXISTS transactions_fts").execute_if(dialect="sqlite"))
@@ -0,0 +1,32 @@
+import enum
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import ForeignKey, Enum as SQLAlchemyEnum, DECIMAL, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+from app.models.transaction import TransactionType
+
+class RollupGranularity(str, enum.Enum):
+    DAY = "day"
+    MONTH = "month"
+
+class TransactionRollup(Base):
+    """
+    Running totals of a user's transactions per period, category, type and currency.
+    Kept up to date in the same database transaction as every transaction write
+    (see app.services.rollup_service), so summaries read O(periods) rows.
+    """
+    __tablename__ = "transaction_rollups"
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    granularity: Mapped[RollupGranularity] = mapped_column(SQLAlchemyEnum(RollupGranularity), primary_key=True)
+    # First day of the period (the day itself, or the 1st of the month)
+    period: Mapped[date] = mapped_column(primary_key=True)
+    # 0 means uncategorized: keeps NULL out of the key so upserts can target it
+    category_id: Mapped[int] = mapped_column(primary_key=True, default=0)
+    transaction_type: Mapped[TransactionType] = mapped_column(SQLAlchemyEnum(TransactionType), primary_key=True)
+    # Currency of the summed amounts; '' is the user's own currency (transactions.currency NULL)
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True, default="")
+    
+    total: Mapped[Decimal] = mapped_column(DECIMAL(14, 2), default=0)
+    count: Mapped[int] = mapped_column(default=0)
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
-from app.database import Base
+from sqlalchemy import Column, Integer, String, Boolean
+from app.database import Base, UTCDateTime
 from datetime import datetime , timezone
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -12,8 +12,17 @@ class User(Base):
     username: Mapped[str] = mapped_column(unique=True, index=True)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    created_at = Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
+    # ISO 4217 code of the user's own currency: analytics, budgets and exports are in it
+    currency: Mapped[str] = mapped_column(String(3), default="USD", server_default="USD")
+    # May load exchange rates (see app.routers.currencies)
+    is_admin: Mapped[bool] = mapped_column(default=False, server_default="0")
+    # Bumped by every write to the user's profile, transactions or categories; drives the ETags
+    data_version: Mapped[int] = mapped_column(default=0, server_default="0")
     # Relationship back to Transactions and cascade delete in case the user deleted its profile 
     transactions = relationship("Transaction", back_populates="user",cascade="all, delete-orphan")
     # Relationship back to Categories and cascade delete in case the user deleted its profile 
     categories = relationship("Category", back_populates="user", cascade="all, delete-orphan")
+    # Relationship back to Budgets and cascade delete in case the user deleted its profile 
+    budgets = relationship("Budget", back_populates="user", cascade="all, delete-orphan")
+    recurring_transactions = relationship("RecurringTransaction", back_populates="user", cascade="all, delete-orphan")
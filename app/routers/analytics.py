@@ -0,0 +1,99 @@
+from fastapi import APIRouter , HTTPException , status , Depends , Query , Request , Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from app.config import settings
+from app.utils.dependencies import get_current_active_user , CurrentUser , get_read_db
+from app.models.transaction_rollup import RollupGranularity
+from app.schemas.analytics import SpendingResponse , IncomeVsExpenseResponse , PeriodSummary
+from app.schemas.budget import BudgetStatusResponse
+from app.schemas.columnar import PeriodSummaryColumns
+from app.utils.columnar import wants_columnar , period_summary_columns , columnar_response , columnar_openapi
+from app.services import analytics_service , rollup_service , budget_service
+
+router = APIRouter()
+
+
+@router.get("/analytics/spending", response_model=SpendingResponse, status_code=status.HTTP_200_OK)
+async def get_spending(date_from: Optional[datetime] = Query(None, alias="from"),
+                       date_to: Optional[datetime] = Query(None, alias="to"),
+                       current_user : CurrentUser = Depends(get_current_active_user),
+                       db:AsyncSession = Depends(get_read_db)):
+    """Expenses of the current user grouped by category, optionally within a date range."""
+    return await analytics_service.get_spending_by_category(db, current_user.id, current_user.currency, date_from, date_to)
+
+
+@router.get("/analytics/income-vs-expense", response_model=IncomeVsExpenseResponse, status_code=status.HTTP_200_OK)
+async def get_income_vs_expense(date_from: Optional[datetime] = Query(None, alias="from"),
+                                date_to: Optional[datetime] = Query(None, alias="to"),
+                                current_user : CurrentUser = Depends(get_current_active_user),
+                                db:AsyncSession = Depends(get_read_db)):
+    """Total income, expenses and net of the current user, optionally within a date range."""
+    return await analytics_service.get_income_vs_expense(db, current_user.id, current_user.currency, date_from, date_to)
+
+
+@router.get("/analytics/summary", response_model=list[PeriodSummary], status_code=status.HTTP_200_OK,
+            responses=columnar_openapi(PeriodSummaryColumns))
+async def get_summary(request: Request, response: Response,
+                      granularity: RollupGranularity = RollupGranularity.MONTH,
+                      date_from: Optional[date] = Query(None, alias="from"),
+                      date_to: Optional[date] = Query(None, alias="to"),
+                      current_user : CurrentUser = Depends(get_current_active_user),
+                      db:AsyncSession = Depends(get_read_db)):
+    """
+    Income, expenses and net of the current user per day or month, read from the rollup table.
+    With Accept: application/vnd.finance.columnar+json the series comes as parallel arrays
+    (PeriodSummaryColumns): epoch period starts and amounts in minor units.
+    """
+    summaries = await rollup_service.get_period_summary(db, current_user.id, current_user.currency, granularity,
+                                                       date_from, date_to)
+    response.headers["Vary"] = "Accept"
+    if wants_columnar(request):
+        return columnar_response(period_summary_columns(summaries), headers=response.headers)
+    return summaries
+
+
+@router.get("/analytics/timeseries", response_model=list[PeriodSummary], status_code=status.HTTP_200_OK,
+            responses=columnar_openapi(PeriodSummaryColumns))
+async def get_timeseries(request: Request, response: Response,
+                         bucket: analytics_service.TimeseriesBucket = "day",
+                         date_from: Optional[date] = Query(None, alias="from"),
+                         date_to: Optional[date] = Query(None, alias="to"),
+                         current_user : CurrentUser = Depends(get_current_active_user),
+                         db:AsyncSession = Depends(get_read_db)):
+    """
+    Income, expenses and net of the current user per day, week (from Monday) or month between
+    from and to (default: the year up to today), every bucket present with zeros when empty,
+    so a chart needs no client-side summing or gap filling. At most timeseries_max_buckets
+    buckets per request; the columnar Accept works as for /analytics/summary.
+    """
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=365)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="from cannot be after to"
+        )
+    if analytics_service.bucket_count(bucket, date_from, date_to) > settings.timeseries_max_buckets:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"More than {settings.timeseries_max_buckets} {bucket} buckets requested, use a larger bucket"
+        )
+    series = await analytics_service.get_timeseries(db, current_user.id, current_user.currency, bucket,
+                                                    date_from, date_to)
+    response.headers["Vary"] = "Accept"
+    if wants_columnar(request):
+        return columnar_response(period_summary_columns(series), headers=response.headers)
+    return series
+
+
+@router.get("/analytics/budget-status", response_model=list[BudgetStatusResponse], status_code=status.HTTP_200_OK)
+async def get_budget_status(as_of: Optional[date] = None,
+                            current_user : CurrentUser = Depends(get_current_active_user),
+                            db:AsyncSession = Depends(get_read_db)):
+    """
+    Spent, remaining and percentage used of every budget of the current user, for the
+    period containing as_of (default: today). Evaluated with a fixed number of queries.
+    """
+    return await budget_service.get_budget_status(db, current_user.id, current_user.currency,
+                                                  as_of or datetime.now(timezone.utc).date())
@@ -1,48 +1,72 @@
 from fastapi import APIRouter , HTTPException , status , Depends
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db , mark_user_write
 from app.models.user import User
 from app.schemas.user import UserCreate , UserResponse
 from app.schemas.token import Token
-from app.utils.security import verify_password , create_access_token , hash_password
-from sqlalchemy import or_
+from app.utils.dependencies import get_current_active_user , CurrentUser
+from app.utils.security import (create_access_token , hash_password_async , verify_and_update_password_async ,
+                                PasswordHasherBusyError)
+from sqlalchemy import or_ , select
 
 router = APIRouter()
 
+# Returned when the password pool is saturated (e.g. a credential-stuffing burst)
+BUSY_EXCEPTION = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Too many authentication requests, try again shortly",
+    headers={"Retry-After": "1"}
+)
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(user :UserCreate, db:Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == user.email).first()
+async def register_user(user :UserCreate, db:AsyncSession = Depends(get_async_db)):
+    existing_user = await db.scalar(select(User).filter(User.email == user.email))
     if existing_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail="Email already Used")
-    existing_user = db.query(User).filter(User.username == user.username).first()
+    existing_user = await db.scalar(select(User).filter(User.username == user.username))
     if existing_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail="Username already Used")
     
-    hashed_password = hash_password(user.password)
+    # Argon2 is CPU bound: keep it off the event loop
+    try:
+        hashed_password = await hash_password_async(user.password)
+    except PasswordHasherBusyError:
+        raise BUSY_EXCEPTION
     # now we create the new user
     new_user = User(
         email = user.email,
         username = user.username,
-        hashed_password = hashed_password
+        hashed_password = hashed_password,
+        currency = user.currency
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+    # The new user's first reads must not reach a replica that has not seen the row yet
+    mark_user_write(new_user.id)
     
     return new_user
 
 @router.post("/login", response_model=Token , status_code=status.HTTP_200_OK)
-def login(form_data : OAuth2PasswordRequestForm = Depends(), db:Session = Depends(get_db)):
-    existing_user = db.query(User).filter(or_(User.email == form_data.username, User.username == form_data.username )).first()
+async def login(form_data : OAuth2PasswordRequestForm = Depends(), db:AsyncSession = Depends(get_async_db)):
+    existing_user = await db.scalar(select(User).filter(or_(User.email == form_data.username, User.username == form_data.username )))
     
     if existing_user is None:
         raise HTTPException(
     status_code=status.HTTP_401_UNAUTHORIZED,detail="Incorrect email/username or password",headers={"WWW-Authenticate": "Bearer"})
         
-    if not verify_password(form_data.password, str(existing_user.hashed_password)):
+    try:
+        verified, new_hash = await verify_and_update_password_async(form_data.password, str(existing_user.hashed_password))
+    except PasswordHasherBusyError:
+        raise BUSY_EXCEPTION
+    if not verified:
         raise HTTPException(
     status_code=status.HTTP_401_UNAUTHORIZED,detail="Incorrect email/username or password",headers={"WWW-Authenticate": "Bearer"})
+    # The Argon2 cost settings changed since this hash was made: store an upgraded one
+    if new_hash is not None:
+        existing_user.hashed_password = new_hash
+        await db.commit()
     data = {"sub": str(existing_user.id)}
     token = create_access_token(data=data)
     
@@ -51,8 +75,8 @@ def login(form_data : OAuth2PasswordRequestForm = Depends(), db:Session = Depend
 
 
 @router.post("/refresh", status_code=status.HTTP_200_OK , response_model=Token)
-def refresh_token(current_user: User = Depends(get_db)):
+async def refresh_token(current_user: CurrentUser = Depends(get_current_active_user)):
     data = {"sub": str(current_user.id)}
     token = create_access_token(data=data)
     return {"access_token":token, "token_type" : "bearer"}
-     
\ No newline at end of file
+     
@@ -0,0 +1,102 @@
+from fastapi import APIRouter , HTTPException , status , Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime, timezone
+from typing import Optional
+from app.utils.dependencies import get_current_active_user , CurrentUser
+from app.database import get_async_db , mark_user_write
+from app.models.budget import Budget
+from app.schemas.budget import BudgetCreate , BudgetUpdate , BudgetResponse , BudgetStatusResponse
+from app.services import budget_service , category_service
+
+router = APIRouter()
+
+
+async def check_category_owned(db: AsyncSession, user_id: int, category_id: Optional[int]) -> None:
+    """Raise 404 unless category_id is None or one of the user's categories."""
+    if category_id is None:
+        return
+    if not await category_service.is_category_owned(db, user_id, category_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found"
+        )
+
+
+async def get_user_budget(db: AsyncSession, user_id: int, budget_id: int) -> Budget:
+    budget = await db.scalar(select(Budget).filter(Budget.user_id == user_id, Budget.id == budget_id))
+    if not budget:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Budget not found"
+        )
+    return budget
+
+
+@router.post("/budgets", response_model=BudgetResponse, status_code=status.HTTP_201_CREATED)
+async def create_budget(budget: BudgetCreate, db:AsyncSession = Depends(get_async_db),
+                        current_user : CurrentUser = Depends(get_current_active_user)):
+    """Create a budget for the current user (for one category, or all expenses when category_id is empty)."""
+    await check_category_owned(db, current_user.id, budget.category_id)
+    new_budget = Budget(user_id=current_user.id, **budget.model_dump())
+    db.add(new_budget)
+    await db.commit()
+    # Budget status is served from the replica: keep this user on the primary for a while
+    mark_user_write(current_user.id)
+    await db.refresh(new_budget)
+    return new_budget
+
+
+@router.get("/budgets", response_model=list[BudgetResponse], status_code=status.HTTP_200_OK)
+async def get_current_user_budgets(current_user : CurrentUser = Depends(get_current_active_user),
+                                   db:AsyncSession = Depends(get_async_db)):
+    """This end point is to get all budgets of the current user."""
+    return (await db.scalars(select(Budget).filter(Budget.user_id == current_user.id).order_by(Budget.id))).all()
+
+
+@router.get("/budgets/{budget_id}", response_model=BudgetStatusResponse, status_code=status.HTTP_200_OK)
+async def get_current_user_budget(budget_id: int, as_of: Optional[date] = None,
+                                  current_user : CurrentUser = Depends(get_current_active_user),
+                                  db:AsyncSession = Depends(get_async_db)):
+    """Get a budget with its spending in the period containing as_of (default: today)."""
+    statuses = await budget_service.get_budget_status(
+        db, current_user.id, current_user.currency, as_of or datetime.now(timezone.utc).date(), budget_id
+    )
+    if not statuses:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Budget not found"
+        )
+    return statuses[0]
+
+
+@router.put("/budgets/{budget_id}", response_model=BudgetResponse, status_code=status.HTTP_200_OK)
+async def update_budget(budget_id: int, budget_update: BudgetUpdate, db:AsyncSession = Depends(get_async_db),
+                        current_user : CurrentUser = Depends(get_current_active_user)):
+    """This end point is to update a budget of the current user."""
+    budget = await get_user_budget(db, current_user.id, budget_id)
+    update_dict = budget_update.model_dump(exclude_unset=True)
+    if 'category_id' in update_dict:
+        await check_category_owned(db, current_user.id, update_dict['category_id'])
+    end_date = update_dict.get('end_date', budget.end_date)
+    if end_date is not None and end_date < budget.start_date:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="end_date cannot be before start_date"
+        )
+    for key, value in update_dict.items():
+        setattr(budget, key, value)
+    await db.commit()
+    mark_user_write(current_user.id)
+    await db.refresh(budget)
+    return budget
+
+
+@router.delete("/budgets/{budget_id}", status_code=status.HTTP_200_OK)
+async def delete_budget(budget_id: int, current_user : CurrentUser = Depends(get_current_active_user),
+                        db:AsyncSession = Depends(get_async_db)):
+    budget = await get_user_budget(db, current_user.id, budget_id)
+    await db.delete(budget)
+    await db.commit()
+    mark_user_write(current_user.id)
+    return {"message": "Budget deleted successfully"}
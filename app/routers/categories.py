@@ -1,26 +1,32 @@
 from fastapi import APIRouter , HTTPException , status , Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select , update , delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from app.utils.dependencies import get_current_active_user
-from app.database import get_db
-from app.models.user import User
+from app.utils.dependencies import get_current_active_user , CurrentUser , get_read_db
+from app.database import get_async_db
 from app.models.category import Category
+from app.models.transaction import Transaction
+from app.models.budget import Budget
+from app.models.recurring_transaction import RecurringTransaction
+from app.services import rollup_service , category_service
+from app.utils.versioning import user_data_etag , bump_data_version
 from app.schemas.category import CategoryCreate, CategoryResponse , CategoryUpdate
 
 router = APIRouter()
 
 
-@router.get("/categories", response_model = list[CategoryResponse], status_code = status.HTTP_200_OK)
-def get_current_user_categories(current_user : User = Depends(get_current_active_user),db:Session = Depends(get_db)):
+@router.get("/categories", response_model = list[CategoryResponse], status_code = status.HTTP_200_OK,
+            dependencies=[Depends(user_data_etag)])
+async def get_current_user_categories(current_user : CurrentUser = Depends(get_current_active_user),db:AsyncSession = Depends(get_read_db)):
     """This end point is to get all categories of the current user."""      
-    categories = db.query(Category).filter(Category.user_id == current_user.id).all()
+    categories = (await db.scalars(select(Category).filter(Category.user_id == current_user.id))).all()
     return categories   
 
 
 @router.post("/categories", response_model = CategoryResponse, status_code = status.HTTP_201_CREATED)
-def create_new_category(category : CategoryCreate,db:Session = Depends(get_db),
-                        current_user:User = Depends(get_current_active_user) ):
+async def create_new_category(category : CategoryCreate,db:AsyncSession = Depends(get_async_db),
+                        current_user:CurrentUser = Depends(get_current_active_user) ):
     """This end point is to create a new category for the current user."""
     try:
         new_category = Category(
@@ -30,23 +36,26 @@ def create_new_category(category : CategoryCreate,db:Session = Depends(get_db),
             icon = category.icon
         )
         db.add(new_category)
-        db.commit()
-        db.refresh(new_category)
+        await bump_data_version(db, current_user.id)
+        await db.commit()
+        category_service.invalidate_owned_categories(current_user.id)
+        await db.refresh(new_category)
         return new_category
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Category name already exists"
         )
     
-@router.get("/categories/{category_id}", response_model = CategoryResponse, status_code = status.HTTP_200_OK)
-def get_current_user_category(category_id:int, current_user : User = Depends(get_current_active_user),db:Session = Depends(get_db)):
+@router.get("/categories/{category_id}", response_model = CategoryResponse, status_code = status.HTTP_200_OK,
+            dependencies=[Depends(user_data_etag)])
+async def get_current_user_category(category_id:int, current_user : CurrentUser = Depends(get_current_active_user),db:AsyncSession = Depends(get_read_db)):
     """This end point is to get a specific category of the current user."""      
-    category = db.query(Category).filter(
+    category = await db.scalar(select(Category).filter(
         Category.user_id == current_user.id, 
         Category.id == category_id
-    ).first()
+    ))
     
     if not category:
         raise HTTPException(
@@ -57,13 +66,13 @@ def get_current_user_category(category_id:int, current_user : User = Depends(get
 
 
 @router.put("/categories/{category_id}", response_model = CategoryResponse, status_code = status.HTTP_200_OK)
-def update_category(category : CategoryUpdate,category_id:int,db:Session = Depends(get_db),
-                        current_user:User = Depends(get_current_active_user) ):
+async def update_category(category : CategoryUpdate,category_id:int,db:AsyncSession = Depends(get_async_db),
+                        current_user:CurrentUser = Depends(get_current_active_user) ):
     """This end point is to update a category's information for the current user."""
-    db_category = db.query(Category).filter(
+    db_category = await db.scalar(select(Category).filter(
         Category.user_id == current_user.id, 
         Category.id == category_id
-    ).first()
+    ))
     
     if not db_category:
         raise HTTPException(
@@ -76,11 +85,13 @@ def update_category(category : CategoryUpdate,category_id:int,db:Session = Depen
         update_dict = category.model_dump(exclude_unset=True)
         for key, value in update_dict.items():
             setattr(db_category, key, value)
-        db.commit()
-        db.refresh(db_category)
+        await bump_data_version(db, current_user.id)
+        await db.commit()
+        category_service.invalidate_owned_categories(current_user.id)
+        await db.refresh(db_category)
         return db_category
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Category name already exists"
@@ -88,14 +99,14 @@ def update_category(category : CategoryUpdate,category_id:int,db:Session = Depen
 
 
 @router.delete("/categories/{category_id}", status_code = status.HTTP_200_OK)
-def delete_category(category_id:int,current_user : User = Depends(get_current_active_user),
-                                  db:Session = Depends(get_db)):
+async def delete_category(category_id:int,current_user : CurrentUser = Depends(get_current_active_user),
+                                  db:AsyncSession = Depends(get_async_db)):
     """Delete a category and set all its transactions' category_id to NULL. (
     this function was declared in the SQLAlchemy ORM model)"""
-    category = db.query(Category).filter(
+    category = await db.scalar(select(Category).filter(
         Category.user_id == current_user.id, 
         Category.id == category_id
-    ).first()
+    ))
     
     if not category:
         raise HTTPException(
@@ -103,8 +114,22 @@ def delete_category(category_id:int,current_user : User = Depends(get_current_ac
             detail="Category not found"
         )
     
-    db.delete(category)
-    db.commit()
+    # Done explicitly too, so it does not depend on the database enforcing ON DELETE SET NULL
+    await db.execute(update(Transaction).where(
+        Transaction.user_id == current_user.id,
+        Transaction.category_id == category_id
+    ).values(category_id=None))
+    await db.execute(update(RecurringTransaction).where(
+        RecurringTransaction.user_id == current_user.id,
+        RecurringTransaction.category_id == category_id
+    ).values(category_id=None))
+    await rollup_service.move_category_rollups_to_uncategorized(db, current_user.id, category_id)
+    # A category budget means nothing without its category
+    await db.execute(delete(Budget).where(Budget.user_id == current_user.id, Budget.category_id == category_id))
+    await db.delete(category)
+    await bump_data_version(db, current_user.id)
+    await db.commit()
+    category_service.invalidate_owned_categories(current_user.id)
     return {"message": "Category deleted successfully"}
 
 
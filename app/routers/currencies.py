@@ -0,0 +1,81 @@
+from fastapi import APIRouter , HTTPException , status , Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime, timezone
+from typing import Optional
+from app.utils.dependencies import get_current_active_user , get_current_admin_user , CurrentUser , get_read_db
+from app.database import get_async_db
+from app.schemas.currency import (CurrenciesResponse , ExchangeRateCreate , ExchangeRateResponse ,
+                                  ExchangeRateLoadResponse , ConversionRequest , ConversionResponse , CurrencyCode)
+from app.services import currency_service
+from app.services.exchange_rate_provider import (ExchangeRateProvider , ExchangeRateProviderError ,
+                                                 get_exchange_rate_provider)
+
+router = APIRouter()
+
+
+@router.get("/currencies", response_model=CurrenciesResponse, status_code=status.HTTP_200_OK)
+async def list_currencies(current_user : CurrentUser = Depends(get_current_active_user),
+                          db:AsyncSession = Depends(get_read_db)):
+    """The current user's currency and every currency of the rate table (served from memory)."""
+    rates = await currency_service.get_rate_table(db)
+    return CurrenciesResponse(base=current_user.currency,
+                              currencies=sorted(rates.currencies | {current_user.currency}))
+
+
+@router.get("/exchange-rates", response_model=ExchangeRateResponse, status_code=status.HTTP_200_OK)
+async def get_exchange_rate(base: CurrencyCode, quote: CurrencyCode, on: Optional[date] = None,
+                            current_user : CurrentUser = Depends(get_current_active_user),
+                            db:AsyncSession = Depends(get_read_db)):
+    """The rate used to convert base to quote on a day (default: today)."""
+    on = on or datetime.now(timezone.utc).date()
+    rates = await currency_service.get_rate_table(db)
+    rate = rates.rate(base, quote, on).quantize(currency_service.RATE_QUANTUM)
+    return ExchangeRateResponse(base=base, quote=quote, date=on, rate=rate)
+
+
+@router.post("/exchange-rates", response_model=ExchangeRateLoadResponse, status_code=status.HTTP_200_OK)
+async def load_exchange_rates(rates: list[ExchangeRateCreate], db:AsyncSession = Depends(get_async_db),
+                              current_user : CurrentUser = Depends(get_current_admin_user)):
+    """
+    Insert or replace historical rates (admins only). Other workers pick them up within
+    exchange_rate_reload_seconds. Files can be loaded with: python -m app.services.currency_service
+    """
+    loaded = await currency_service.store_rates(db, ((rate.base, rate.quote, rate.date, rate.rate) for rate in rates))
+    return ExchangeRateLoadResponse(loaded=loaded)
+
+
+@router.post("/exchange-rates/fetch", response_model=ExchangeRateLoadResponse, status_code=status.HTTP_200_OK)
+async def fetch_exchange_rates(base: CurrencyCode, on: Optional[date] = None,
+                               db:AsyncSession = Depends(get_async_db),
+                               provider: Optional[ExchangeRateProvider] = Depends(get_exchange_rate_provider),
+                               current_user : CurrentUser = Depends(get_current_admin_user)):
+    """Store the rates of base on a day (default: today) from the external provider (admins only)."""
+    if provider is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="No exchange rate provider configured"
+        )
+    on = on or datetime.now(timezone.utc).date()
+    try:
+        fetched = await provider.fetch(base, on)
+    except ExchangeRateProviderError as e:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
+    loaded = await currency_service.store_rates(db, ((base, quote, on, rate) for quote, rate in fetched.items()))
+    return ExchangeRateLoadResponse(loaded=loaded)
+
+
+@router.post("/transactions/convert", response_model=ConversionResponse, status_code=status.HTTP_200_OK)
+async def convert_amount(conversion: ConversionRequest, current_user : CurrentUser = Depends(get_current_active_user),
+                         db:AsyncSession = Depends(get_read_db)):
+    """Convert an amount to the current user's currency at the rate of a day (default: today)."""
+    on = conversion.date or datetime.now(timezone.utc).date()
+    rates = await currency_service.get_rate_table(db)
+    rate = rates.rate(conversion.currency, current_user.currency, on).quantize(currency_service.RATE_QUANTUM)
+    return ConversionResponse(
+        amount=conversion.amount,
+        currency=conversion.currency,
+        converted_amount=rates.convert_many([(conversion.amount, conversion.currency, on)], current_user.currency)[0],
+        converted_currency=current_user.currency,
+        rate=rate,
+        date=on,
+    )
@@ -0,0 +1,36 @@
+from fastapi import APIRouter , status , Depends , Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Literal, Optional
+from app.utils.dependencies import get_current_active_user , CurrentUser
+from app.database import get_async_db
+from app.services.export_service import stream_transactions_csv , stream_transactions_ndjson
+
+router = APIRouter()
+
+EXPORT_FORMATS = {
+    "csv": (stream_transactions_csv, "text/csv", "transactions.csv"),
+    "ndjson": (stream_transactions_ndjson, "application/x-ndjson", "transactions.ndjson"),
+}
+
+
+@router.get("/export/transactions", status_code=status.HTTP_200_OK, response_class=StreamingResponse)
+async def export_transactions(export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+                              date_from: Optional[datetime] = Query(None, alias="from"),
+                              date_to: Optional[datetime] = Query(None, alias="to"),
+                              current_user : CurrentUser = Depends(get_current_active_user),
+                              db:AsyncSession = Depends(get_async_db)):
+    """
+    Stream all transactions of the current user (optionally within a date range) as CSV or NDJSON,
+    each with its amount converted to the user's currency.
+    Rows are read from a server-side cursor and written batch by batch, so memory stays flat
+    whatever the history size. The session from get_async_db stays open until the response
+    has been fully sent.
+    """
+    stream, media_type, filename = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        stream(db, current_user.id, current_user.currency, date_from, date_to),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,32 @@
+import io
+from fastapi import APIRouter , HTTPException , status , Depends , UploadFile , File
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.utils.dependencies import get_current_active_user , CurrentUser
+from app.database import get_async_db
+from app.schemas.transaction import TransactionImportResponse
+from app.services.import_service import import_transactions_csv , InvalidImportFileError
+
+router = APIRouter()
+
+
+@router.post("/import/transactions", response_model=TransactionImportResponse, status_code=status.HTTP_200_OK)
+async def import_transactions(file: UploadFile = File(...),
+                              current_user : CurrentUser = Depends(get_current_active_user),
+                              db:AsyncSession = Depends(get_async_db)):
+    """
+    Import transactions from an uploaded CSV file (amount, transaction_type and optionally
+    description, category_id, date columns; a CSV export can be re-imported as is).
+    Invalid rows are skipped and listed in the report with their line number.
+    Batches committed before a fatal file error are kept.
+    """
+    # Large uploads are spooled to disk by Starlette, so this reads the file line by line
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return await import_transactions_csv(db, current_user.id, lines)
+    except InvalidImportFileError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail="Database error")
+    finally:
+        lines.detach()
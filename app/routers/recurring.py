@@ -0,0 +1,126 @@
+from fastapi import APIRouter , HTTPException , status , Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from app.utils.dependencies import get_current_active_user , CurrentUser
+from app.database import get_async_db
+from app.models.recurring_transaction import RecurringTransaction
+from app.schemas.recurring_transaction import (RecurringTransactionCreate , RecurringTransactionUpdate ,
+                                               RecurringTransactionResponse , RecurringProcessResponse)
+from app.routers.budgets import check_category_owned
+from app.services import currency_service , recurring_service
+
+router = APIRouter()
+
+
+async def get_user_recurring_transaction(db: AsyncSession, user_id: int, id: int,
+                                         for_update: bool = False) -> RecurringTransaction:
+    query = select(RecurringTransaction).filter(RecurringTransaction.user_id == user_id, RecurringTransaction.id == id)
+    if for_update:
+        # Waits for the scheduler if it is processing this template right now
+        query = query.with_for_update()
+    template = await db.scalar(query)
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recurring transaction not found"
+        )
+    return template
+
+
+@router.post("/recurring", response_model=RecurringTransactionResponse, status_code=status.HTTP_201_CREATED)
+async def create_recurring_transaction(template: RecurringTransactionCreate, db:AsyncSession = Depends(get_async_db),
+                                       current_user : CurrentUser = Depends(get_current_active_user)):
+    """Create a recurring transaction template; its first occurrence is on start_date."""
+    await check_category_owned(db, current_user.id, template.category_id)
+    new_template = RecurringTransaction(
+        user_id=current_user.id,
+        next_occurrence_date=template.start_date,
+        **template.model_dump(exclude={"currency"}),
+        currency=await currency_service.check_currency(db, template.currency, current_user.id)
+    )
+    db.add(new_template)
+    await db.commit()
+    await db.refresh(new_template)
+    recurring_service.schedule_template(new_template)
+    return new_template
+
+
+@router.get("/recurring", response_model=list[RecurringTransactionResponse], status_code=status.HTTP_200_OK)
+async def get_current_user_recurring_transactions(current_user : CurrentUser = Depends(get_current_active_user),
+                                                  db:AsyncSession = Depends(get_async_db)):
+    """This end point is to get all recurring transaction templates of the current user."""
+    return (await db.scalars(
+        select(RecurringTransaction)
+        .filter(RecurringTransaction.user_id == current_user.id)
+        .order_by(RecurringTransaction.id)
+    )).all()
+
+
+@router.put("/recurring/{id}", response_model=RecurringTransactionResponse, status_code=status.HTTP_200_OK)
+async def update_recurring_transaction(id: int, template_update: RecurringTransactionUpdate,
+                                       db:AsyncSession = Depends(get_async_db),
+                                       current_user : CurrentUser = Depends(get_current_active_user)):
+    """
+    Update a template. Future occurrences use the new values, already created transactions are kept.
+    Re-activating a template resumes it from today instead of back-filling the paused period.
+    """
+    template = await get_user_recurring_transaction(db, current_user.id, id, for_update=True)
+    update_dict = template_update.model_dump(exclude_unset=True)
+    if 'category_id' in update_dict:
+        await check_category_owned(db, current_user.id, update_dict['category_id'])
+    if 'currency' in update_dict:
+        update_dict['currency'] = await currency_service.check_currency(db, update_dict['currency'], current_user.id)
+    end_date = update_dict.get('end_date', template.end_date)
+    if end_date is not None and end_date < template.start_date:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="end_date cannot be before start_date"
+        )
+    resumed = update_dict.get('is_active') and not template.is_active
+    for key, value in update_dict.items():
+        setattr(template, key, value)
+    if resumed:
+        template.next_occurrence_date = recurring_service.first_occurrence_on_or_after(
+            template, recurring_service.today_utc()
+        )
+    await db.commit()
+    await db.refresh(template)
+    recurring_service.schedule_template(template)
+    return template
+
+
+@router.delete("/recurring/{id}", response_model=RecurringTransactionResponse, status_code=status.HTTP_200_OK)
+async def deactivate_recurring_transaction(id: int, current_user : CurrentUser = Depends(get_current_active_user),
+                                           db:AsyncSession = Depends(get_async_db)):
+    """Deactivate a template: no more occurrences are created, existing transactions are kept."""
+    template = await get_user_recurring_transaction(db, current_user.id, id, for_update=True)
+    template.is_active = False
+    await db.commit()
+    recurring_service.schedule_template(template)
+    return template
+
+
+@router.post("/recurring/{id}/process", response_model=RecurringProcessResponse, status_code=status.HTTP_200_OK)
+async def process_recurring_transaction(id: int, current_user : CurrentUser = Depends(get_current_active_user),
+                                        db:AsyncSession = Depends(get_async_db)):
+    """
+    Create the transactions of every occurrence of the template due up to today right away,
+    instead of waiting for the scheduler. Nothing is created twice: the template row is locked
+    and advanced in the same commit as the new transactions.
+    """
+    template = await get_user_recurring_transaction(db, current_user.id, id, for_update=True)
+    if not template.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Recurring transaction is not active"
+        )
+    try:
+        result = await recurring_service.materialize_occurrences(db, [template], recurring_service.today_utc())
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Database error")
+    await db.refresh(template)
+    recurring_service.schedule_template(template)
+    return RecurringProcessResponse(created=result.created, recurring_transaction=template)
@@ -1,68 +1,273 @@
-from fastapi import APIRouter , HTTPException , status , Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter , HTTPException , status , Depends , Query , Request , Response
+from sqlalchemy import select , tuple_ , insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import Optional
+from decimal import Decimal
 from datetime import datetime, timezone
-from sqlalchemy.exc import SQLAlchemyError
-from app.utils.dependencies import get_current_active_user
-from app.database import get_db
-from app.models.transaction import Transaction
-from app.models.user import User
-from app.schemas.transaction import  TransactionResponse , TransactionCreate , TransactionUpdate
+from sqlalchemy.exc import SQLAlchemyError , IntegrityError
+from app.utils.dependencies import get_current_active_user , CurrentUser , get_read_db
+from app.config import settings
+from app.database import get_async_db
+from app.models.transaction import Transaction , TransactionType
 from app.models.category import Category
+from app.schemas.transaction import  (TransactionResponse , TransactionCreate , TransactionUpdate ,
+                                      TransactionBulkCreate , TransactionBulkResponse , TransactionBulkItemResult ,
+                                      TransactionRow , CategoryRow , transaction_list_adapter)
+from app.schemas.columnar import TransactionColumns
+from app.utils.pagination import encode_cursor , decode_cursor , InvalidCursorError
+from app.utils.columnar import wants_columnar , transaction_columns , columnar_response , columnar_openapi
+from app.services import rollup_service , category_service , currency_service
+from app.services.search_service import TransactionFilters , apply_transaction_filters
+from app.utils.versioning import user_data_etag , negotiated_data_etag , bump_data_version
 router = APIRouter()
 
-@router.get("/transactions", response_model = list[TransactionResponse], status_code = status.HTTP_200_OK)
-def get_current_user_transactions(skip:int=0,limit:int=100,current_user : User = Depends(get_current_active_user),db:Session = Depends(get_db)):
+CATEGORY_NOT_FOUND = HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
+
+# List fast path: one row per transaction, its columns in TransactionRow field order with the
+# category's columns (CategoryRow order) in place of the "category" field
+TRANSACTION_ROW_FIELDS = list(TransactionRow.__annotations__)
+CATEGORY_ROW_FIELDS = list(CategoryRow.__annotations__)
+CATEGORY_START = TRANSACTION_ROW_FIELDS.index("category")
+CATEGORY_END = CATEGORY_START + len(CATEGORY_ROW_FIELDS)
+TRANSACTION_LIST_COLUMNS = (
+    [getattr(Transaction, field) for field in TRANSACTION_ROW_FIELDS[:CATEGORY_START]]
+    + [getattr(Category, field) for field in CATEGORY_ROW_FIELDS]
+    + [getattr(Transaction, field) for field in TRANSACTION_ROW_FIELDS[CATEGORY_START + 1:]]
+)
+
+
+def transaction_row(row) -> TransactionRow:
+    """
+    Build the response dict of one TRANSACTION_LIST_COLUMNS row. Keys come in TransactionResponse
+    order, which the serializer keeps (it follows the dict, not the TypedDict).
+    """
+    values = tuple(row)
+    # Outer join: no category when its id column is NULL
+    category = (dict(zip(CATEGORY_ROW_FIELDS, values[CATEGORY_START:CATEGORY_END]))
+                if values[CATEGORY_START] is not None else None)
+    return dict(zip(TRANSACTION_ROW_FIELDS, (*values[:CATEGORY_START], category, *values[CATEGORY_END:])))
+
+
+# Columnar representation: the columns transaction_columns() takes, no join needed
+TRANSACTION_COLUMNAR_COLUMNS = [Transaction.id, Transaction.amount, Transaction.currency, Transaction.date,
+                                Transaction.transaction_type, Transaction.category_id]
+
+
+async def category_write_failed(db: AsyncSession, user_id: int) -> HTTPException:
+    """
+    Backstop of the cached ownership check: a write rejected by the database (the category
+    was deleted by another worker since it was cached) rolls back, drops the stale cache
+    entry and is reported as a missing category.
+    """
+    await db.rollback()
+    category_service.invalidate_owned_categories(user_id)
+    return CATEGORY_NOT_FOUND
+
+
+def get_transaction_filters(date_from: Optional[datetime] = Query(None, alias="from"),
+                            date_to: Optional[datetime] = Query(None, alias="to"),
+                            transaction_type: Optional[TransactionType] = None,
+                            category_id: Optional[int] = None,
+                            uncategorized: bool = False,
+                            min_amount: Optional[Decimal] = Query(None, ge=0),
+                            max_amount: Optional[Decimal] = Query(None, ge=0),
+                            q: Optional[str] = Query(None, max_length=200)) -> TransactionFilters:
+    """Query parameters filtering the transaction list (q searches the description)."""
+    if category_id is not None and uncategorized:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="category_id and uncategorized cannot be combined"
+        )
+    if min_amount is not None and max_amount is not None and min_amount > max_amount:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="min_amount cannot be greater than max_amount"
+        )
+    return TransactionFilters(date_from=date_from, date_to=date_to, transaction_type=transaction_type,
+                              category_id=category_id, uncategorized=uncategorized,
+                              min_amount=min_amount, max_amount=max_amount, search=q)
+
+
+async def load_user_transaction(db: AsyncSession, user_id: int, id: int) -> Optional[Transaction]:
+    """
+    Load one transaction of a user together with its category.
+    The category is joined into the same SELECT (one row, so no duplication to pay for),
+    and populate_existing makes it safe to call again after a commit to get fresh values.
+    """
+    return await db.scalar(
+        select(Transaction)
+        .options(joinedload(Transaction.category))
+        .filter(Transaction.user_id == user_id, Transaction.id == id)
+        .execution_options(populate_existing=True)
+    )
+
+@router.get("/transactions", response_model = list[TransactionResponse], status_code = status.HTTP_200_OK,
+            dependencies=[Depends(negotiated_data_etag)], responses=columnar_openapi(TransactionColumns))
+async def get_current_user_transactions(request: Request, response: Response, skip:int = Query(0, ge=0),
+                                  limit:int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+                                  cursor: Optional[str] = None,
+                                  filters: TransactionFilters = Depends(get_transaction_filters),
+                                  current_user : CurrentUser = Depends(get_current_active_user),db:AsyncSession = Depends(get_read_db)):
     """
     Get current_user from the dependency 
-    filter transactions by user_id.
-    and then return the transactions of the user.
+    filter transactions by user_id, newest first (ordered by date then id).
+    Pass the X-Next-Cursor header of a page back as `cursor` to get the next one:
+    cursor pages seek on the (user_id, date, id) index so every page costs the same,
+    while `skip` (offset) is still accepted for old clients.
+    Optional filters (from/to, transaction_type, category_id or uncategorized, min_amount/max_amount,
+    q for a description search) are applied in SQL and combine with the cursor.
+    Answers 304 when If-None-Match carries the user's current ETag (one per representation).
+    The page is read as plain rows (category joined in) and serialized straight to JSON bytes
+    by transaction_list_adapter; the response model only documents the shape.
+    Clients preferring application/vnd.finance.columnar+json (Accept header) get the page as
+    parallel arrays instead (TransactionColumns): ids, amounts in minor units, epoch dates,
+    type codes and category ids, several times smaller and faster to parse.
     """
-    transactions = db.query(Transaction).filter(Transaction.user_id == current_user.id).offset(skip).limit(limit).all()
-    return transactions
+    columnar = wants_columnar(request)
+    if columnar:
+        query = select(*TRANSACTION_COLUMNAR_COLUMNS)
+    else:
+        query = select(*TRANSACTION_LIST_COLUMNS).outerjoin(Category, Category.id == Transaction.category_id)
+    query = (
+        query
+        .filter(Transaction.user_id == current_user.id)
+        .order_by(Transaction.date.desc(), Transaction.id.desc())
+    )
+    query = apply_transaction_filters(query, filters, db.bind.dialect.name)
+    if cursor is not None:
+        try:
+            last_date, last_id = decode_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.filter(tuple_(Transaction.date, Transaction.id) < (last_date, last_id))
+    else:
+        query = query.offset(skip)
+    rows = (await db.execute(query.limit(limit))).all()
+    # A full page means there may be more rows: hand out the cursor of the last one
+    if len(rows) == limit:
+        last = rows[-1]._mapping
+        response.headers["X-Next-Cursor"] = encode_cursor(last[Transaction.date], last[Transaction.id])
+    # A returned Response skips FastAPI's serialization, and the headers set on `response` with it
+    if columnar:
+        return columnar_response(transaction_columns(rows), headers=response.headers)
+    return Response(transaction_list_adapter.dump_json([transaction_row(row) for row in rows]),
+                    media_type="application/json", headers=response.headers)
 
 @router.post("/transactions", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
-def create_transaction(transaction :TransactionCreate, db:Session = Depends(get_db),current_user : User = Depends(get_current_active_user)):
+async def create_transaction(transaction :TransactionCreate, db:AsyncSession = Depends(get_async_db),current_user : CurrentUser = Depends(get_current_active_user)):
     """
     Check for the current_user from the dependency (no user no new transaction)
     check for the fields needed
     and then return the added transaction of the user.
     """
-    # Validate category if provided
+    # Validate category if provided (against the cached ids of the user's categories)
     if transaction.category_id is not None:
-        category = db.query(Category).filter(
-            Category.id == transaction.category_id,
-            Category.user_id == current_user.id
-        ).first()
-        
-        if not category:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Category not found"
-            )
+        if not await category_service.is_category_owned(db, current_user.id, transaction.category_id):
+            raise CATEGORY_NOT_FOUND
+    currency = await currency_service.check_currency(db, transaction.currency, current_user.id)
     new_transaction = Transaction(
        user_id = current_user.id,
        amount = transaction.amount,
+       currency = currency,
        description = transaction.description,
        transaction_type = transaction.transaction_type,
        date = transaction.date,
        category_id=transaction.category_id 
     )
     db.add(new_transaction)
-    db.commit()
-    db.refresh(new_transaction)
+    try:
+        await db.flush()
+    except IntegrityError:
+        raise await category_write_failed(db, current_user.id)
+    await rollup_service.apply_rollup_deltas(db, [rollup_service.transaction_added(new_transaction)])
+    await bump_data_version(db, current_user.id)
+    await db.commit()
     
-    return new_transaction
+    return await load_user_transaction(db, current_user.id, new_transaction.id)
 
 
-@router.get("/transactions/{id}", response_model = TransactionResponse, status_code = status.HTTP_200_OK)
-def get_current_user_transaction_by_id(id: int, current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
+@router.post("/transactions/bulk", response_model=TransactionBulkResponse, status_code=status.HTTP_201_CREATED)
+async def create_transactions_bulk(payload: TransactionBulkCreate, db:AsyncSession = Depends(get_async_db),
+                                   current_user : CurrentUser = Depends(get_current_active_user)):
+    """
+    Create many transactions in one request (e.g. offline-captured ones).
+    All referenced categories are checked with a single query, then every valid item is
+    inserted with one multi-row INSERT ... RETURNING inside a single database transaction.
+    Items pointing at a category the user does not own, or in a currency without exchange
+    rates to the user's, are reported and skipped.
+    """
+    category_ids = {item.category_id for item in payload.items if item.category_id is not None}
+    owned_category_ids = frozenset()
+    if category_ids:
+        owned_category_ids = await category_service.owned_category_ids(db, current_user.id, category_ids)
+    # Items in the user's currency are stored as NULL: read it from the database (not the cached
+    # user) when an item names a currency
+    user_currency = current_user.currency
+    if any(item.currency is not None for item in payload.items):
+        user_currency = await currency_service.lock_user_currency(db, current_user.id)
+    currencies = {item.currency for item in payload.items} - {None, user_currency}
+    supported_currencies = set()
+    if currencies:
+        rates = await currency_service.get_rate_table(db)
+        supported_currencies = {currency for currency in currencies if rates.supports(currency, user_currency)}
+    
+    results = [TransactionBulkItemResult(index=index) for index in range(len(payload.items))]
+    rows = []
+    row_indexes = []
+    for index, item in enumerate(payload.items):
+        if item.category_id is not None and item.category_id not in owned_category_ids:
+            results[index].error = "Category not found"
+            continue
+        currency = item.currency if item.currency != user_currency else None
+        if currency is not None and currency not in supported_currencies:
+            results[index].error = f"No exchange rate from {currency} to {user_currency}"
+            continue
+        rows.append({
+            "user_id": current_user.id,
+            "amount": item.amount,
+            "currency": currency,
+            "description": item.description,
+            "transaction_type": item.transaction_type,
+            "date": item.date,
+            "category_id": item.category_id,
+        })
+        row_indexes.append(index)
+    
+    if rows:
+        try:
+            new_ids = (await db.scalars(
+                insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+                rows
+            )).all()
+            await rollup_service.apply_rollup_deltas(db, (
+                rollup_service.added(row["user_id"], row["date"], row["category_id"], row["transaction_type"],
+                                     row["amount"], row["currency"])
+                for row in rows
+            ))
+            await bump_data_version(db, current_user.id)
+            await db.commit()
+        except IntegrityError:
+            raise await category_write_failed(db, current_user.id)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            raise HTTPException(status_code=500, detail="Database error")
+        for index, new_id in zip(row_indexes, new_ids):
+            results[index].id = new_id
+    
+    return TransactionBulkResponse(created=len(rows), failed=len(results) - len(rows), results=results)
+
+
+@router.get("/transactions/{id}", response_model = TransactionResponse, status_code = status.HTTP_200_OK,
+            dependencies=[Depends(user_data_etag)])
+async def get_current_user_transaction_by_id(id: int, current_user: CurrentUser = Depends(get_current_active_user), db: AsyncSession = Depends(get_read_db)):
     """
     Get current_user from the dependency 
     filter transactions by user_id.
     and then return the transaction with the provided id of the current user.
     """
     try:
-        transaction = db.query(Transaction).filter(Transaction.user_id == current_user.id, Transaction.id == id).first()
+        transaction = await load_user_transaction(db, current_user.id, id)
         if not transaction:
             raise HTTPException(status_code=404, detail="Not found")
         return transaction
@@ -72,17 +277,17 @@ def get_current_user_transaction_by_id(id: int, current_user: User = Depends(get
     
 
 @router.put("/transactions/{id}", response_model=TransactionResponse, status_code=status.HTTP_200_OK)
-def update_current_user_transaction_by_id(
+async def update_current_user_transaction_by_id(
     id: int,
     transaction_update: TransactionUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        transaction = db.query(Transaction).filter(
+        transaction = await db.scalar(select(Transaction).filter(
             Transaction.user_id == current_user.id,
             Transaction.id == id
-        ).first()
+        ))
         
         if not transaction:
             raise HTTPException(status_code=404, detail="Transaction not found")
@@ -92,45 +297,47 @@ def update_current_user_transaction_by_id(
         update_dict = transaction_update.model_dump(exclude_unset=True)
         # Validate category if being updated
         if 'category_id' in update_dict and update_dict['category_id'] is not None:
-            category = db.query(Category).filter(
-                Category.id == update_dict['category_id'],
-                Category.user_id == current_user.id
-            ).first()
-            
-            if not category:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Category not found"
-                )
+            if not await category_service.is_category_owned(db, current_user.id, update_dict['category_id']):
+                raise CATEGORY_NOT_FOUND
+        if 'currency' in update_dict:
+            update_dict['currency'] = await currency_service.check_currency(db, update_dict['currency'],
+                                                                            current_user.id)
         
+        # Move the old values out of the rollups and the new ones in
+        old_values = rollup_service.transaction_removed(transaction)
         for key, value in update_dict.items():
             setattr(transaction, key, value)
-        db.commit()
-        db.refresh(transaction)
+        await rollup_service.apply_rollup_deltas(db, [old_values, rollup_service.transaction_added(transaction)])
+        await bump_data_version(db, current_user.id)
+        await db.commit()
         
-        return transaction
+        return await load_user_transaction(db, current_user.id, id)
         
+    except IntegrityError:
+        raise await category_write_failed(db, current_user.id)
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error")
 
 
     
 
 @router.delete("/transactions/{id}", status_code = status.HTTP_200_OK)
-def delete_transaction(id:int,current_user : User = Depends(get_current_active_user),
-                                  db:Session = Depends(get_db)):
+async def delete_transaction(id:int,current_user : CurrentUser = Depends(get_current_active_user),
+                                  db:AsyncSession = Depends(get_async_db)):
     """
     Get current_user from the dependency 
     filter transactions by user_id.
     and then delete the transactions of the user.
     """
     try:
-        transaction_to_delete = db.query(Transaction).filter(Transaction.user_id == current_user.id, Transaction.id == id).first()
+        transaction_to_delete = await db.scalar(select(Transaction).filter(Transaction.user_id == current_user.id, Transaction.id == id))
         if not transaction_to_delete:
             raise HTTPException(status_code=404, detail="Not found")
-        db.delete(transaction_to_delete)
-        db.commit()
+        await db.delete(transaction_to_delete)
+        await rollup_service.apply_rollup_deltas(db, [rollup_service.transaction_removed(transaction_to_delete)])
+        await bump_data_version(db, current_user.id)
+        await db.commit()
         return {"message": "Transaction was deleted successfully"}
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail="Database error")
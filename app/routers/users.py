@@ -1,37 +1,64 @@
-from fastapi import APIRouter , HTTPException , status , Depends
-from sqlalchemy.orm import Session
-from app.utils.dependencies import get_current_active_user
-from app.database import get_db
+from fastapi import APIRouter , HTTPException , status , Depends , Request , Response
+from sqlalchemy import select , delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.utils.dependencies import get_current_active_user , CurrentUser , invalidate_cached_user , get_read_db
+from app.database import get_async_db
 from app.models.user import User
+from app.models.transaction_rollup import TransactionRollup
 from app.schemas.user import  UserResponse , UserUpdate
+from app.utils.versioning import check_not_modified , bump_data_version
+from app.services import category_service , currency_service , rollup_service
 
 users_router = APIRouter()
 
 @users_router.get("/me", response_model = UserResponse, status_code = status.HTTP_200_OK)
-def get_current_user_profile(current_user : User = Depends(get_current_active_user)):
+async def get_current_user_profile(request: Request, response: Response,
+                                   current_user : CurrentUser = Depends(get_current_active_user),
+                                   db: AsyncSession = Depends(get_read_db)):
     """
     Get current authenticated user's profile.
     Requires valid JWT token in Authorization header.
+    The profile and its data version are read fresh in one query (a cached profile could
+    be older than the version it would be tagged with), and 304 is returned when
+    If-None-Match carries that version.
     """
-    return current_user
+    user = await db.get(User, current_user.id)
+    if user is None:
+        invalidate_cached_user(current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    check_not_modified(request, response, user.id, user.data_version)
+    return user
 
 @users_router.put("/me", response_model=UserResponse, status_code=status.HTTP_200_OK)
-def update_current_user_profile(
+async def update_current_user_profile(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update current authenticated user's profile.
-    Can update email and/or username.
+    Can update email, username and/or currency. After a currency change the stored transactions
+    and recurring templates keep their amounts (those in the old currency are marked with it)
+    and the rollups are rebuilt, so analytics are converted to the new currency from then on.
+    Budget amounts are not converted: they are read in the new currency.
     """
+    user = await db.get(User, current_user.id)
+    if user is None:
+        invalidate_cached_user(current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
     
     # Check if new email is taken by another user
     if user_update.email is not None:
-        existing = db.query(User).filter(
+        existing = await db.scalar(select(User).filter(
             User.email == user_update.email,
             User.id != current_user.id
-        ).first()
+        ))
         
         if existing:
             raise HTTPException(
@@ -40,14 +67,14 @@ def update_current_user_profile(
             )
         
         # Update the email
-        current_user.email = user_update.email
+        user.email = user_update.email
     
     # Check if new username is taken by another user
     if user_update.username is not None:
-        existing = db.query(User).filter(
+        existing = await db.scalar(select(User).filter(
             User.username == user_update.username,
             User.id != current_user.id
-        ).first()
+        ))
         
         if existing:
             raise HTTPException(
@@ -56,19 +83,47 @@ def update_current_user_profile(
             )
         
         # Update the username
-        current_user.username = user_update.username
+        user.username = user_update.username
+    
+    currency_changed = user_update.currency is not None and user_update.currency != user.currency
+    if currency_changed:
+        rates = await currency_service.get_rate_table(db)
+        if not rates.supports(user.currency, user_update.currency):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"No exchange rate from {user.currency} to {user_update.currency}"
+            )
+        await currency_service.change_user_currency(db, user.id, user.currency, user_update.currency)
+        user.currency = user_update.currency
     
     # Commit all changes at once
-    db.commit()
-    db.refresh(current_user)
+    await bump_data_version(db, current_user.id)
+    if currency_changed:
+        # Commits everything together with the recomputed rollups
+        await rollup_service.rebuild_rollups(db, current_user.id)
+    else:
+        await db.commit()
+    await db.refresh(user)
+    # The cached snapshot still holds the old email/username
+    invalidate_cached_user(current_user.id)
     
-    return current_user
+    return user
 
 
 @users_router.delete("/me", status_code=status.HTTP_200_OK)
-def delete_current_user_account(current_user: User = Depends(get_current_active_user), 
-                                db: Session = Depends(get_db)):
-    db.delete(current_user)
-    db.commit()
+async def delete_current_user_account(current_user: CurrentUser = Depends(get_current_active_user), 
+                                db: AsyncSession = Depends(get_async_db)):
+    user = await db.get(User, current_user.id)
+    if user is None:
+        invalidate_cached_user(current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    await db.execute(delete(TransactionRollup).where(TransactionRollup.user_id == current_user.id))
+    await db.delete(user)
+    await db.commit()
+    invalidate_cached_user(current_user.id)
+    category_service.invalidate_owned_categories(current_user.id)
     return {"message": "Account deleted successfully"}
     
\ No newline at end of file
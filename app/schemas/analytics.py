@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+from decimal import Decimal
+
+
+# Expense total of one category (category_id None = uncategorized)
+class CategorySpending(BaseModel):
+    category_id: Optional[int] = None
+    category_name: Optional[str] = None
+    total: Decimal
+    count: int
+
+# For GET /analytics/spending
+class SpendingResponse(BaseModel):
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    total: Decimal
+    categories: list[CategorySpending]
+
+# For GET /analytics/income-vs-expense
+class IncomeVsExpenseResponse(BaseModel):
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    income: Decimal
+    expense: Decimal
+    net: Decimal
+    income_count: int
+    expense_count: int
+
+# Totals of one period, for GET /analytics/summary
+class PeriodSummary(BaseModel):
+    period: date
+    income: Decimal
+    expense: Decimal
+    net: Decimal
@@ -0,0 +1,72 @@
+from pydantic import BaseModel, ConfigDict, field_validator , model_validator
+from typing import Optional
+from datetime import datetime, date, timezone
+from decimal import Decimal
+from pydantic import Field
+from app.models.budget import BudgetPeriod
+
+# For Creating a new budget
+class BudgetCreate(BaseModel):
+    amount: Decimal
+    period: BudgetPeriod
+    category_id: Optional[int] = None
+    start_date: date = Field(default_factory=lambda: datetime.now(timezone.utc).date())
+    end_date: Optional[date] = None
+    
+    @field_validator('amount')
+    @classmethod
+    def validate_amount(cls, v):
+        if v <= 0:
+            raise ValueError('Amount must be greater than 0')
+        return v
+    
+    @model_validator(mode='after')
+    def check_dates(self):
+        if self.end_date is not None and self.end_date < self.start_date:
+            raise ValueError('end_date cannot be before start_date')
+        return self
+
+# For updating a budget (an explicit null clears category_id or end_date)
+class BudgetUpdate(BaseModel):
+    amount: Optional[Decimal] = None
+    period: Optional[BudgetPeriod] = None
+    category_id: Optional[int] = None
+    end_date: Optional[date] = None
+    
+    @field_validator('amount')
+    @classmethod
+    def validate_amount(cls, v):
+        if v is not None and v <= 0:
+            raise ValueError('Amount must be greater than 0')
+        return v
+    
+    @model_validator(mode='after')
+    def check_at_least_one_field(self):
+        if not self.model_fields_set:
+            raise ValueError('Must provide at least one field to update')
+        for field in ('amount', 'period'):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f'{field} cannot be null')
+        return self
+
+# For API responses
+class BudgetResponse(BaseModel):
+    id: int
+    user_id: int
+    category_id: Optional[int] = None
+    amount: Decimal
+    period: BudgetPeriod
+    start_date: date
+    end_date: Optional[date] = None
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+# A budget with its spending in the current period
+class BudgetStatusResponse(BudgetResponse):
+    period_start: date
+    period_end: date  # inclusive
+    spent: Decimal
+    remaining: Decimal
+    percentage_used: float
+    is_over_budget: bool
@@ -0,0 +1,33 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.models.transaction import TransactionType
+
+# Amounts travel as integers in minor units: amount = amount_minor / 10 ** AMOUNT_SCALE
+AMOUNT_SCALE = 2
+# transaction_type codes of the columnar arrays: index in this list
+TRANSACTION_TYPE_CODES = [transaction_type.value for transaction_type in TransactionType]
+
+
+# Columnar page of GET /transactions: item i of every array belongs to the same transaction
+class TransactionColumns(BaseModel):
+    count: int
+    amount_scale: int = AMOUNT_SCALE
+    transaction_types: list[str] = Field(TRANSACTION_TYPE_CODES, description="Name of each transaction_type code")
+    id: list[int]
+    amount_minor: list[int]
+    currency: list[Optional[str]] = Field(description="ISO 4217 code, null for the user's currency")
+    date: list[int] = Field(description="Milliseconds since the Unix epoch (UTC)")
+    transaction_type: list[int]
+    category_id: list[Optional[int]]
+
+
+# Columnar GET /analytics/summary: item i of every array belongs to the same period
+class PeriodSummaryColumns(BaseModel):
+    count: int
+    amount_scale: int = AMOUNT_SCALE
+    period: list[int] = Field(description="Start of the period, in milliseconds since the Unix epoch (UTC)")
+    income_minor: list[int]
+    expense_minor: list[int]
+    net_minor: list[int]
@@ -0,0 +1,47 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Annotated, Optional
+import datetime
+from decimal import Decimal
+
+# ISO 4217 code, e.g. "EUR"
+CurrencyCode = Annotated[str, Field(pattern=r"^[A-Z]{3}$")]
+
+# For GET /currencies
+class CurrenciesResponse(BaseModel):
+    base: CurrencyCode
+    currencies: list[CurrencyCode]
+
+# For loading rates (1 base = rate quote, from date on); the field named date shadows the type,
+# hence datetime.date
+class ExchangeRateCreate(BaseModel):
+    base: CurrencyCode
+    quote: CurrencyCode
+    date: datetime.date
+    rate: Decimal = Field(gt=0, max_digits=18, decimal_places=8)
+
+class ExchangeRateResponse(ExchangeRateCreate):
+    pass
+
+class ExchangeRateLoadResponse(BaseModel):
+    loaded: int
+
+# For POST /transactions/convert
+class ConversionRequest(BaseModel):
+    amount: Decimal
+    currency: CurrencyCode
+    date: Optional[datetime.date] = None
+
+    @field_validator('amount')
+    @classmethod
+    def validate_amount(cls, v):
+        if v <= 0:
+            raise ValueError('Amount must be greater than 0')
+        return v
+
+class ConversionResponse(BaseModel):
+    amount: Decimal
+    currency: CurrencyCode
+    converted_amount: Decimal
+    converted_currency: CurrencyCode
+    rate: Decimal
+    date: datetime.date
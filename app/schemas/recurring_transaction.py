@@ -0,0 +1,81 @@
+from pydantic import BaseModel, ConfigDict, field_validator , model_validator
+from typing import Optional
+from datetime import datetime, date, timezone
+from decimal import Decimal
+from pydantic import Field
+from app.models.recurring_transaction import RecurrenceFrequency
+from app.models.transaction import TransactionType
+from app.schemas.currency import CurrencyCode
+
+# For Creating a new recurring transaction template
+class RecurringTransactionCreate(BaseModel):
+    amount: Decimal
+    # Defaults to the user's currency
+    currency: Optional[CurrencyCode] = None
+    description: Optional[str] = Field(None, max_length=500)
+    transaction_type: TransactionType
+    category_id: Optional[int] = None
+    frequency: RecurrenceFrequency
+    start_date: date = Field(default_factory=lambda: datetime.now(timezone.utc).date())
+    end_date: Optional[date] = None
+    
+    @field_validator('amount')
+    @classmethod
+    def validate_amount(cls, v):
+        if v <= 0:
+            raise ValueError('Amount must be greater than 0')
+        return v
+    
+    @model_validator(mode='after')
+    def check_dates(self):
+        if self.end_date is not None and self.end_date < self.start_date:
+            raise ValueError('end_date cannot be before start_date')
+        return self
+
+# For updating a recurring transaction template
+class RecurringTransactionUpdate(BaseModel):
+    amount: Optional[Decimal] = None
+    currency: Optional[CurrencyCode] = None
+    description: Optional[str] = Field(None, max_length=500)
+    transaction_type: Optional[TransactionType] = None
+    category_id: Optional[int] = None
+    frequency: Optional[RecurrenceFrequency] = None
+    end_date: Optional[date] = None
+    is_active: Optional[bool] = None
+    
+    @field_validator('amount')
+    @classmethod
+    def validate_amount(cls, v):
+        if v is not None and v <= 0:
+            raise ValueError('Amount must be greater than 0')
+        return v
+    
+    @model_validator(mode='after')
+    def check_at_least_one_field(self):
+        if not self.model_fields_set:
+            raise ValueError('Must provide at least one field to update')
+        return self
+
+# For API responses
+class RecurringTransactionResponse(BaseModel):
+    id: int
+    user_id: int
+    amount: Decimal
+    # None: the user's currency
+    currency: Optional[str] = None
+    description: Optional[str] = None
+    transaction_type: TransactionType
+    category_id: Optional[int] = None
+    frequency: RecurrenceFrequency
+    start_date: date
+    end_date: Optional[date] = None
+    next_occurrence_date: date
+    is_active: bool
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+# Outcome of processing a template by hand
+class RecurringProcessResponse(BaseModel):
+    created: int
+    recurring_transaction: RecurringTransactionResponse
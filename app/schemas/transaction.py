@@ -1,15 +1,20 @@
-from pydantic import BaseModel, ConfigDict, field_validator , model_validator
+from pydantic import BaseModel, ConfigDict, TypeAdapter, field_validator , model_validator
 from typing import Optional
+from typing_extensions import TypedDict
 from datetime import datetime, timedelta
 from decimal import Decimal
 from datetime import timezone
 from pydantic import Field
+from app.config import settings
 from app.schemas.category import CategoryResponse
+from app.schemas.currency import CurrencyCode
 from app.models.transaction import TransactionType
 
 # For Creating a new transaction
 class TransactionCreate(BaseModel):
     amount: Decimal
+    # Defaults to the user's currency
+    currency: Optional[CurrencyCode] = None
     description: Optional[str] = Field(None, max_length=500)
     transaction_type: TransactionType
     category_id: Optional[int] = None
@@ -36,6 +41,7 @@ class TransactionCreate(BaseModel):
 # For updating a transaction
 class TransactionUpdate(BaseModel):
     amount: Optional[Decimal] = None
+    currency: Optional[CurrencyCode] = None
     description: Optional[str] = Field(None, max_length=500)
     transaction_type: Optional[TransactionType] = None
     category_id: Optional[int | None] = None
@@ -50,6 +56,7 @@ class TransactionUpdate(BaseModel):
     @model_validator(mode='after')
     def check_at_least_one_field(self):
         if (self.amount is None and 
+            self.currency is None and
             self.description is None and 
             self.transaction_type is None and
             self.category_id is None):  # Add this line
@@ -61,11 +68,73 @@ class TransactionResponse(BaseModel):
     id: int
     user_id: int
     amount: Decimal
+    # None: the user's currency
+    currency: Optional[str] = None
     description: Optional[str] = None
     transaction_type: TransactionType
     date: datetime 
     created_at: datetime
     category_id: Optional[int] = None
     category: Optional[CategoryResponse] = None
+    recurring_transaction_id: Optional[int] = None
     
-    model_config = ConfigDict(from_attributes=True)  # Allows SQLAlchemy model conversion
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)  # Allows SQLAlchemy model conversion
+
+
+# Plain-dict mirrors of CategoryResponse / TransactionResponse (same fields, types and order) for the
+# list fast path: rows are serialized straight to JSON bytes, skipping ORM objects and model validation.
+# The published schema stays TransactionResponse; tests check both produce the same JSON.
+class CategoryRow(TypedDict):
+    id: int
+    name: str
+    user_id: int
+    color: Optional[str]
+    icon: Optional[str]
+    created_at: datetime
+
+
+class TransactionRow(TypedDict):
+    id: int
+    user_id: int
+    amount: Decimal
+    currency: Optional[str]
+    description: Optional[str]
+    transaction_type: TransactionType
+    date: datetime
+    created_at: datetime
+    category_id: Optional[int]
+    category: Optional[CategoryRow]
+    recurring_transaction_id: Optional[int]
+
+
+# Built once: the serializer is compiled with the adapter
+transaction_list_adapter = TypeAdapter(list[TransactionRow])
+
+
+# For creating many transactions at once (offline sync)
+class TransactionBulkCreate(BaseModel):
+    items: list[TransactionCreate] = Field(min_length=1, max_length=settings.bulk_create_max_items)
+
+# Outcome of one item of a bulk create, in request order
+class TransactionBulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class TransactionBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[TransactionBulkItemResult]
+
+
+# One rejected line of a CSV import
+class TransactionImportError(BaseModel):
+    line: int
+    error: str
+
+class TransactionImportResponse(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: list[TransactionImportError]
+    errors_truncated: bool = False
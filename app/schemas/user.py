@@ -1,6 +1,7 @@
 from pydantic import BaseModel, ConfigDict, EmailStr, field_validator , model_validator
 from typing import Optional
 from datetime import datetime
+from app.schemas.currency import CurrencyCode
 
 # Base schema with common fields
 class UserBase(BaseModel):
@@ -10,6 +11,7 @@ class UserBase(BaseModel):
 # For registration
 class UserCreate(UserBase):
     password: str
+    currency: CurrencyCode = "USD"
 
 # For login
 class UserLogin(BaseModel):
@@ -29,17 +31,19 @@ class UserLogin(BaseModel):
 class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     username: Optional[str] = None
+    currency: Optional[CurrencyCode] = None
     
     @model_validator(mode='after')
     def check_at_least_one_field(self):
         # At least one must be provided
-        if self.email is None and self.username is None:
+        if self.email is None and self.username is None and self.currency is None:
             raise ValueError('Must provide at least one field to update')
         return self
 
 # For API responses
 class UserResponse(UserBase):
     id: int
+    currency: str
     is_active: bool
     created_at: datetime
     
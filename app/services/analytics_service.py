@@ -0,0 +1,214 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Literal, Optional, Sequence
+
+from sqlalchemy import Date, DateTime, Interval, case, cast, func, literal, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.category import Category
+from app.models.transaction import Transaction, TransactionType
+from app.models.transaction_rollup import RollupGranularity
+from app.schemas.analytics import CategorySpending, IncomeVsExpenseResponse, PeriodSummary, SpendingResponse
+from app.services import currency_service
+from app.services.rollup_service import inline, period_start_expr
+
+
+def _filter_date_range(query, date_from: Optional[datetime], date_to: Optional[datetime]):
+    if date_from is not None:
+        query = query.filter(Transaction.date >= date_from)
+    if date_to is not None:
+        query = query.filter(Transaction.date <= date_to)
+    return query
+
+
+def _foreign_day(dialect_name: str):
+    """Day of foreign-currency rows (NULL for the user's own currency): their rate depends on it."""
+    day = type_coerce(period_start_expr(dialect_name, RollupGranularity.DAY, Transaction.date), Date)
+    return case((Transaction.currency.is_not(None), day), else_=None)
+
+
+async def _amounts(db: AsyncSession, currency: str, rows: Sequence, amount_index: int,
+                   currency_index: int, day_index: int) -> list[Decimal]:
+    """The amount of every row in the user's currency, foreign rows converted in one batch."""
+    converted = iter(await currency_service.convert_to(db, currency, [
+        (row[amount_index], row[currency_index], currency_service.day_of(row[day_index]))
+        for row in rows if row[currency_index] is not None
+    ]))
+    return [next(converted) if row[currency_index] is not None else row[amount_index] for row in rows]
+
+
+async def get_spending_by_category(db: AsyncSession, user_id: int, currency: str, date_from: Optional[datetime] = None,
+                                   date_to: Optional[datetime] = None) -> SpendingResponse:
+    """
+    Sum a user's expenses per category in the database (one GROUP BY query).
+    The (user_id, transaction_type, date, category_id, amount, currency) index covers the scan.
+    Expenses in other currencies are summed per currency and day, then converted to the
+    user's currency at each day's rate.
+    """
+    foreign_day = _foreign_day(db.bind.dialect.name)
+    query = (
+        select(Transaction.category_id, Category.name, func.sum(Transaction.amount), func.count(),
+               Transaction.currency, foreign_day)
+        .outerjoin(Category, Transaction.category_id == Category.id)
+        .filter(Transaction.user_id == user_id, Transaction.transaction_type == TransactionType.EXPENSE)
+        .group_by(Transaction.category_id, Category.name, Transaction.currency, foreign_day)
+    )
+    rows = (await db.execute(_filter_date_range(query, date_from, date_to))).all()
+    by_category: dict[Optional[int], CategorySpending] = {}
+    for (category_id, name, _, count, *_), amount in zip(rows, await _amounts(db, currency, rows, 2, 4, 5)):
+        spending = by_category.setdefault(category_id, CategorySpending(category_id=category_id, category_name=name,
+                                                                         total=Decimal("0"), count=0))
+        spending.total += amount
+        spending.count += count
+    categories = sorted(by_category.values(), key=lambda spending: spending.total, reverse=True)
+    return SpendingResponse(
+        date_from=date_from,
+        date_to=date_to,
+        total=sum((c.total for c in categories), Decimal("0")),
+        categories=categories,
+    )
+
+
+async def get_income_vs_expense(db: AsyncSession, user_id: int, currency: str, date_from: Optional[datetime] = None,
+                                date_to: Optional[datetime] = None) -> IncomeVsExpenseResponse:
+    """
+    Sum a user's income and expenses in the database (one GROUP BY transaction_type query),
+    converting the totals in other currencies per day like get_spending_by_category.
+    """
+    foreign_day = _foreign_day(db.bind.dialect.name)
+    query = (
+        select(Transaction.transaction_type, func.sum(Transaction.amount), func.count(),
+               Transaction.currency, foreign_day)
+        .filter(Transaction.user_id == user_id)
+        .group_by(Transaction.transaction_type, Transaction.currency, foreign_day)
+    )
+    rows = (await db.execute(_filter_date_range(query, date_from, date_to))).all()
+    totals = {transaction_type: [Decimal("0"), 0] for transaction_type in TransactionType}
+    for (transaction_type, _, count, *_), amount in zip(rows, await _amounts(db, currency, rows, 1, 3, 4)):
+        totals[transaction_type][0] += amount
+        totals[transaction_type][1] += count
+    income, income_count = totals[TransactionType.INCOME]
+    expense, expense_count = totals[TransactionType.EXPENSE]
+    return IncomeVsExpenseResponse(
+        date_from=date_from,
+        date_to=date_to,
+        income=income,
+        expense=expense,
+        net=income - expense,
+        income_count=income_count,
+        expense_count=expense_count,
+    )
+
+
+TimeseriesBucket = Literal["day", "week", "month"]
+
+
+def bucket_start(bucket: TimeseriesBucket, day: date) -> date:
+    """First day of the bucket containing day (weeks start on Monday, as date_trunc('week'))."""
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_bucket_start(bucket: TimeseriesBucket, start: date) -> date:
+    if bucket == "day":
+        return start + timedelta(days=1)
+    if bucket == "week":
+        return start + timedelta(days=7)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def bucket_count(bucket: TimeseriesBucket, date_from: date, date_to: date) -> int:
+    """Buckets from the one containing date_from to the one containing date_to."""
+    first, last = bucket_start(bucket, date_from), bucket_start(bucket, date_to)
+    if bucket == "month":
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    return (last - first).days // (7 if bucket == "week" else 1) + 1
+
+
+def bucket_starts(bucket: TimeseriesBucket, date_from: date, date_to: date) -> list[date]:
+    starts = [bucket_start(bucket, date_from)]
+    for _ in range(bucket_count(bucket, date_from, date_to) - 1):
+        starts.append(next_bucket_start(bucket, starts[-1]))
+    return starts
+
+
+async def _postgresql_bucket_totals(db: AsyncSession, user_id: int, currency: str, bucket: TimeseriesBucket,
+                                    first: date, last: date, window: tuple[datetime, datetime]) -> list[tuple]:
+    """
+    Totals per bucket, type and (foreign) currency and day, left joined to generate_series so
+    every bucket comes back, empty ones as a row without type.
+    """
+    bucket_expr = func.date_trunc(inline(bucket), Transaction.date)
+    foreign_day = _foreign_day("postgresql")
+    totals = (
+        select(bucket_expr.label("bucket"), Transaction.transaction_type, Transaction.currency,
+               foreign_day.label("day"), func.sum(Transaction.amount).label("total"))
+        .filter(Transaction.user_id == user_id, Transaction.date >= window[0], Transaction.date < window[1])
+        .group_by(bucket_expr, Transaction.transaction_type, Transaction.currency, foreign_day)
+        .subquery()
+    )
+    series = func.generate_series(
+        cast(literal(first), DateTime), cast(literal(last), DateTime), cast(literal(f"1 {bucket}"), Interval)
+    ).table_valued("bucket").render_derived()
+    query = (
+        select(cast(series.c.bucket, Date), totals.c.transaction_type, totals.c.currency, totals.c.day, totals.c.total)
+        .select_from(series)
+        .outerjoin(totals, totals.c.bucket == series.c.bucket)
+        .order_by(series.c.bucket)
+    )
+    rows = (await db.execute(query)).all()
+    return [(period, transaction_type, amount)
+            for (period, transaction_type, *_), amount in zip(rows, await _amounts(db, currency, rows, 4, 2, 3))]
+
+
+async def _portable_bucket_totals(db: AsyncSession, user_id: int, currency: str,
+                                  window: tuple[datetime, datetime]) -> list[tuple]:
+    """Totals per day, type and currency: the rows are bucketed (and the gaps filled) by the caller."""
+    day = type_coerce(period_start_expr(db.bind.dialect.name, RollupGranularity.DAY, Transaction.date), Date)
+    query = (
+        select(day, Transaction.transaction_type, Transaction.currency, func.sum(Transaction.amount))
+        .filter(Transaction.user_id == user_id, Transaction.date >= window[0], Transaction.date < window[1])
+        .group_by(day, Transaction.transaction_type, Transaction.currency)
+    )
+    rows = (await db.execute(query)).all()
+    return [(period, transaction_type, amount)
+            for (period, transaction_type, *_), amount in zip(rows, await _amounts(db, currency, rows, 3, 2, 0))]
+
+
+def _empty_period(period: date) -> PeriodSummary:
+    return PeriodSummary(period=period, income=Decimal("0"), expense=Decimal("0"), net=Decimal("0"))
+
+
+async def get_timeseries(db: AsyncSession, user_id: int, currency: str, bucket: TimeseriesBucket,
+                         date_from: date, date_to: date) -> list[PeriodSummary]:
+    """
+    Income, expense and net per day, week or month of [date_from, date_to] in the user's
+    currency, every bucket present (zero when empty) and counted whole. One query: on PostgreSQL
+    date_trunc buckets the rows and generate_series fills the gaps; elsewhere the database sums
+    per day and the days are added to a zero-filled series here. Foreign-currency totals are
+    converted per day in one batch, as in get_spending_by_category.
+    """
+    first, last = bucket_start(bucket, date_from), bucket_start(bucket, date_to)
+    window = (datetime.combine(first, time()), datetime.combine(next_bucket_start(bucket, last), time()))
+    if db.bind.dialect.name == "postgresql":
+        totals = await _postgresql_bucket_totals(db, user_id, currency, bucket, first, last, window)
+        # generate_series returned every bucket, in order
+        series: dict[date, PeriodSummary] = {}
+    else:
+        totals = await _portable_bucket_totals(db, user_id, currency, window)
+        series = {start: _empty_period(start) for start in bucket_starts(bucket, date_from, date_to)}
+    for period, transaction_type, amount in totals:
+        period = bucket_start(bucket, period)
+        summary = series.get(period)
+        if summary is None:
+            summary = series[period] = _empty_period(period)
+        if transaction_type == TransactionType.INCOME:
+            summary.income += amount
+        elif transaction_type == TransactionType.EXPENSE:
+            summary.expense += amount
+    for summary in series.values():
+        summary.net = summary.income - summary.expense
+    return list(series.values())
@@ -0,0 +1,113 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.budget import Budget, BudgetPeriod
+from app.models.transaction import TransactionType
+from app.models.transaction_rollup import RollupGranularity, TransactionRollup
+from app.schemas.budget import BudgetResponse, BudgetStatusResponse
+from app.services import currency_service
+from app.services.rollup_service import inline
+
+
+def current_window(budget: Budget, as_of: date) -> Tuple[date, date]:
+    """
+    Calendar period of the budget containing as_of, as [start, end) dates.
+    Weeks start on Monday. The window is clipped to the budget's start_date/end_date.
+    """
+    if budget.period == BudgetPeriod.DAILY:
+        start, end = as_of, as_of + timedelta(days=1)
+    elif budget.period == BudgetPeriod.WEEKLY:
+        start = as_of - timedelta(days=as_of.weekday())
+        end = start + timedelta(days=7)
+    elif budget.period == BudgetPeriod.MONTHLY:
+        start = as_of.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+    else:
+        start = as_of.replace(month=1, day=1)
+        end = start.replace(year=start.year + 1)
+    start = max(start, budget.start_date)
+    if budget.end_date is not None:
+        end = min(end, budget.end_date + timedelta(days=1))
+    return start, max(start, end)
+
+
+async def evaluate_budgets(db: AsyncSession, user_id: int, currency: str, budgets: Sequence[Budget],
+                           as_of: date) -> list[BudgetStatusResponse]:
+    """
+    Compute spent/remaining/percentage used of every budget with a single aggregate query.
+    The query reads the user's daily expense rollups (not the transactions) and has one
+    SUM(CASE ...) column per distinct budget window, grouped by category, so its cost depends
+    on the number of days and categories covered, not on the number of budgets or transactions.
+    Expenses in other currencies than the user's are grouped per day too, and converted at
+    each day's rate in one batch.
+    """
+    windows = {budget.id: current_window(budget, as_of) for budget in budgets}
+    distinct_windows = sorted(set(windows.values()))
+    # spent[window][category_id] (category 0 = uncategorized)
+    spent: dict[Tuple[date, date], dict[int, Decimal]] = {window: {} for window in distinct_windows}
+
+    if distinct_windows:
+        columns = [
+            func.sum(case(
+                (and_(TransactionRollup.period >= start, TransactionRollup.period < end), TransactionRollup.total),
+                else_=0
+            ))
+            for start, end in distinct_windows
+        ]
+        # The day matters only for the rates of foreign-currency rows
+        foreign_day = case((TransactionRollup.currency != inline(""), TransactionRollup.period), else_=None)
+        query = (
+            select(TransactionRollup.category_id, TransactionRollup.currency, foreign_day, *columns)
+            .filter(
+                TransactionRollup.user_id == user_id,
+                TransactionRollup.granularity == RollupGranularity.DAY,
+                TransactionRollup.transaction_type == TransactionType.EXPENSE,
+                TransactionRollup.period >= min(start for start, _ in distinct_windows),
+                TransactionRollup.period < max(end for _, end in distinct_windows),
+            )
+            .group_by(TransactionRollup.category_id, TransactionRollup.currency, foreign_day)
+        )
+        rows = (await db.execute(query)).all()
+        converted = iter(await currency_service.convert_to(db, currency, [
+            (total, row_currency, day)
+            for _, row_currency, day, *totals in rows if row_currency
+            for total in totals if total
+        ]))
+        for category_id, row_currency, _, *totals in rows:
+            for window, total in zip(distinct_windows, totals):
+                if row_currency and total:
+                    total = next(converted)
+                spent[window][category_id] = spent[window].get(category_id, Decimal("0")) + Decimal(total or 0)
+
+    statuses = []
+    for budget in budgets:
+        window = windows[budget.id]
+        by_category = spent[window]
+        if budget.category_id is None:
+            budget_spent = sum(by_category.values(), Decimal("0"))
+        else:
+            budget_spent = by_category.get(budget.category_id, Decimal("0"))
+        statuses.append(BudgetStatusResponse(
+            **BudgetResponse.model_validate(budget).model_dump(),
+            period_start=window[0],
+            period_end=max(window[0], window[1] - timedelta(days=1)),
+            spent=budget_spent,
+            remaining=budget.amount - budget_spent,
+            percentage_used=round(float(budget_spent / budget.amount * 100), 2),
+            is_over_budget=budget_spent > budget.amount,
+        ))
+    return statuses
+
+
+async def get_budget_status(db: AsyncSession, user_id: int, currency: str, as_of: date,
+                            budget_id: Optional[int] = None) -> list[BudgetStatusResponse]:
+    """Load the user's budgets (or one of them) and evaluate them: two queries in total."""
+    query = select(Budget).filter(Budget.user_id == user_id).order_by(Budget.id)
+    if budget_id is not None:
+        query = query.filter(Budget.id == budget_id)
+    budgets = (await db.scalars(query)).all()
+    return await evaluate_budgets(db, user_id, currency, budgets, as_of)
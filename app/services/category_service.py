@@ -0,0 +1,43 @@
+from typing import FrozenSet, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.category import Category
+from app.utils.cache import TTLCache
+
+# Ids of each user's categories, keyed by user id, so write paths skip the ownership SELECT
+category_cache: TTLCache[int, FrozenSet[int]] = TTLCache(
+    max_size=settings.category_cache_max_size,
+    ttl=settings.category_cache_ttl_seconds
+)
+
+
+def invalidate_owned_categories(user_id: int) -> None:
+    """Forget the cached category ids of a user. Call it after the user's categories change."""
+    category_cache.invalidate(user_id)
+
+
+async def load_owned_category_ids(db: AsyncSession, user_id: int) -> FrozenSet[int]:
+    """Read the user's category ids from the database and cache them."""
+    category_ids = frozenset((await db.scalars(select(Category.id).filter(Category.user_id == user_id))).all())
+    category_cache.set(user_id, category_ids)
+    return category_ids
+
+
+async def owned_category_ids(db: AsyncSession, user_id: int, wanted: Iterable[int] = ()) -> FrozenSet[int]:
+    """
+    Ids of the user's categories, from the cache when possible.
+    The cache is reloaded once when it is missing or lacks one of the wanted ids (e.g. a category
+    just created by another worker). A cached id whose category was deleted elsewhere is not
+    caught here: the foreign key rejects the write, and the caller invalidates the cache.
+    """
+    category_ids = category_cache.get(user_id)
+    if category_ids is None or not category_ids.issuperset(wanted):
+        category_ids = await load_owned_category_ids(db, user_id)
+    return category_ids
+
+
+async def is_category_owned(db: AsyncSession, user_id: int, category_id: int) -> bool:
+    return category_id in await owned_category_ids(db, user_id, (category_id,))
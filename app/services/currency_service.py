@@ -0,0 +1,221 @@
+import argparse
+import asyncio
+import csv
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.exchange_rate import ExchangeRate
+from app.models.recurring_transaction import RecurringTransaction
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+ONE = Decimal("1")
+CENT = Decimal("0.01")
+# Precision of stored rates (exchange_rates.rate), also used to report crossed/inverted rates
+RATE_QUANTUM = Decimal("0.00000001")
+RATE_TABLE_KEY = "rates"
+
+
+class ExchangeRateError(LookupError):
+    """Raised when no rate is known to convert between two currencies."""
+
+
+class RateTable:
+    """
+    Every historical rate, held in memory as one pair of aligned arrays per (base, quote):
+    dates sorted ascending and their rates. A lookup bisects the dates for the last rate on or
+    before the day (the first known rate for earlier days), using the inverse pair when only
+    that one is stored and crossing through settings.exchange_rate_pivot otherwise.
+    Immutable once built: a reload builds a new table and swaps it in.
+    """
+
+    def __init__(self, rows: Iterable[tuple[str, str, date, Decimal]]):
+        pairs: dict[tuple[str, str], tuple[list[date], list[Decimal]]] = defaultdict(lambda: ([], []))
+        for base, quote, day, rate in sorted(rows):
+            dates, rates = pairs[(base, quote)]
+            dates.append(day)
+            rates.append(Decimal(rate))
+        self.pairs = dict(pairs)
+        self.currencies = frozenset(currency for pair in self.pairs for currency in pair)
+
+    def _pair_rate(self, base: str, quote: str, day: date) -> Optional[Decimal]:
+        series = self.pairs.get((base, quote))
+        if series is not None:
+            dates, rates = series
+            return rates[max(bisect_right(dates, day) - 1, 0)]
+        series = self.pairs.get((quote, base))
+        if series is not None:
+            dates, rates = series
+            return ONE / rates[max(bisect_right(dates, day) - 1, 0)]
+        return None
+
+    def rate(self, base: str, quote: str, day: date) -> Decimal:
+        """Units of quote one unit of base is worth on day."""
+        if base == quote:
+            return ONE
+        rate = self._pair_rate(base, quote, day)
+        if rate is not None:
+            return rate
+        pivot = settings.exchange_rate_pivot
+        to_pivot = self._pair_rate(base, pivot, day) if base != pivot else ONE
+        from_pivot = self._pair_rate(pivot, quote, day) if quote != pivot else ONE
+        if to_pivot is None or from_pivot is None:
+            raise ExchangeRateError(f"No exchange rate from {base} to {quote}")
+        return to_pivot * from_pivot
+
+    def supports(self, base: str, quote: str) -> bool:
+        try:
+            self.rate(base, quote, date.min)
+        except ExchangeRateError:
+            return False
+        return True
+
+    def convert_many(self, items: Iterable[tuple[Decimal, str, date]], quote: str) -> list[Decimal]:
+        """
+        Convert (amount, currency, day) items to quote, rounded to cents. The whole batch goes
+        through one pass: each distinct (currency, day) is looked up once, however many rows share it.
+        """
+        rates: dict[tuple[str, date], Decimal] = {}
+        converted = []
+        for amount, currency, day in items:
+            rate = rates.get((currency, day))
+            if rate is None:
+                rate = rates[(currency, day)] = self.rate(currency, quote, day)
+            converted.append((Decimal(amount) * rate).quantize(CENT))
+        return converted
+
+
+# The process-wide rate table: reloaded after exchange_rate_reload_seconds (rates loaded through
+# another worker), and dropped at once when rates are loaded through this one
+rate_table_cache: TTLCache[str, RateTable] = TTLCache(max_size=1, ttl=settings.exchange_rate_reload_seconds)
+
+
+def invalidate_rate_table() -> None:
+    rate_table_cache.invalidate(RATE_TABLE_KEY)
+
+
+async def get_rate_table(db: AsyncSession) -> RateTable:
+    """The in-memory rate table, read whole (one query) when missing or expired."""
+    table = rate_table_cache.get(RATE_TABLE_KEY)
+    if table is None:
+        rows = (await db.execute(
+            select(ExchangeRate.base, ExchangeRate.quote, ExchangeRate.date, ExchangeRate.rate)
+        )).all()
+        table = RateTable(rows)
+        rate_table_cache.set(RATE_TABLE_KEY, table)
+    return table
+
+
+def day_of(value) -> date:
+    """UTC day of a datetime, as UTCDateTime stores it (naive values are already UTC)."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.date()
+    return value
+
+
+async def convert_to(db: AsyncSession, quote: str, items: Sequence[tuple[Decimal, str, date]]) -> list[Decimal]:
+    """Convert a batch of (amount, currency, day) to quote; the rate table is only loaded when needed."""
+    if not items:
+        return []
+    return (await get_rate_table(db)).convert_many(items, quote)
+
+
+async def lock_user_currency(db: AsyncSession, user_id: int) -> str:
+    """
+    The user's currency as committed, with the user row locked until the caller commits.
+    Writes deciding what a stored currency of NULL means read it here rather than from the
+    cached CurrentUser: another worker may have changed the currency since it was cached, and
+    the lock keeps a change (which rewrites the user's rows) from committing in between.
+    """
+    return await db.scalar(select(User.currency).filter(User.id == user_id).with_for_update())
+
+
+async def check_currency(db: AsyncSession, currency: Optional[str], user_id: int) -> Optional[str]:
+    """
+    Value to store as transactions.currency: None when omitted or the user's own currency
+    (read with lock_user_currency), otherwise the code, once a rate to the user's currency is known.
+    Raises:
+        ExchangeRateError: if the currency cannot be converted to the user's currency
+    """
+    if currency is None:
+        return None
+    user_currency = await lock_user_currency(db, user_id)
+    if currency == user_currency:
+        return None
+    if not (await get_rate_table(db)).supports(currency, user_currency):
+        raise ExchangeRateError(f"No exchange rate from {currency} to {user_currency}")
+    return currency
+
+
+async def store_rates(db: AsyncSession, rates: Iterable[tuple[str, str, date, Decimal]]) -> int:
+    """Insert or replace rates (one executemany upsert) and commit; this worker's table is reloaded on next use."""
+    rows = [{"base": base, "quote": quote, "date": day, "rate": rate} for base, quote, day, rate in rates]
+    if rows:
+        upsert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+        stmt = upsert(ExchangeRate)
+        await db.execute(
+            stmt.on_conflict_do_update(index_elements=["base", "quote", "date"], set_={"rate": stmt.excluded.rate}),
+            rows
+        )
+        await db.commit()
+    invalidate_rate_table()
+    return len(rows)
+
+
+async def change_user_currency(db: AsyncSession, user_id: int, old: str, new: str) -> None:
+    """
+    Keep the user's transactions and recurring templates meaning the same amounts when their
+    currency changes, without committing: rows in the old currency (NULL) get it spelled out,
+    rows already in the new one become NULL. The rollups must then be rebuilt for the user.
+    Budget amounts have no currency column and are not converted: they are read as amounts
+    in the new currency.
+    """
+    for model in (Transaction, RecurringTransaction):
+        await db.execute(
+            update(model).where(model.user_id == user_id, model.currency.is_(None))
+            .values(currency=old).execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            update(model).where(model.user_id == user_id, model.currency == new)
+            .values(currency=None).execution_options(synchronize_session=False)
+        )
+
+
+def read_rates_csv(lines: Iterable[str]) -> list[tuple[str, str, date, Decimal]]:
+    """Rates of a CSV file with date, base, quote and rate columns (ISO dates, codes in any case)."""
+    return [
+        (row["base"].strip().upper(), row["quote"].strip().upper(), date.fromisoformat(row["date"].strip()),
+         Decimal(row["rate"]))
+        for row in csv.DictReader(lines)
+    ]
+
+
+async def _main() -> None:
+    from app.database import AsyncSessionLocal, async_engine
+
+    parser = argparse.ArgumentParser(description="Load exchange rates from a CSV file (date,base,quote,rate).")
+    parser.add_argument("path", help="CSV file to load")
+    args = parser.parse_args()
+    with open(args.path, newline="", encoding="utf-8") as file:
+        rates = read_rates_csv(file)
+    try:
+        async with AsyncSessionLocal() as db:
+            print(f"Loaded {await store_rates(db, rates)} exchange rates")
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
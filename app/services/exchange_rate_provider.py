@@ -0,0 +1,63 @@
+from datetime import date
+from decimal import Decimal
+from typing import Mapping, Optional, Protocol
+
+import httpx
+from fastapi import Request
+
+from app.config import settings
+
+
+class ExchangeRateProviderError(Exception):
+    """Raised when the rate provider cannot be reached or answers something unusable."""
+
+
+class ExchangeRateProvider(Protocol):
+    async def fetch(self, base: str, day: date) -> dict[str, Decimal]:
+        """Rates of one unit of base in every quote currency the provider knows, on day."""
+        ...
+
+
+class HttpExchangeRateProvider:
+    """
+    Historical rates from an HTTP API in the exchangerate-api.com style: the URL template is
+    filled with {base}, {year}, {month} and {day}, and the JSON answer carries the rates under
+    "conversion_rates" (or "rates").
+    """
+
+    def __init__(self, client: httpx.AsyncClient, url: str):
+        self.client = client
+        self.url = url
+
+    async def fetch(self, base: str, day: date) -> dict[str, Decimal]:
+        url = self.url.format(base=base, year=day.year, month=day.month, day=day.day)
+        try:
+            response = await self.client.get(url)
+            response.raise_for_status()
+            payload = response.json(parse_float=Decimal)
+        except (httpx.HTTPError, ValueError) as e:
+            raise ExchangeRateProviderError(f"Exchange rate provider failed: {e}") from e
+        rates = payload.get("conversion_rates", payload.get("rates"))
+        if not isinstance(rates, dict):
+            raise ExchangeRateProviderError("Exchange rate provider answered without rates")
+        return {quote.upper(): Decimal(rate) for quote, rate in rates.items() if quote.upper() != base}
+
+
+class StaticExchangeRateProvider:
+    """Local stand-in for the external provider: the same fixed rates every day."""
+
+    def __init__(self, rates: Mapping[str, Mapping[str, Decimal]]):
+        self.rates = rates
+
+    async def fetch(self, base: str, day: date) -> dict[str, Decimal]:
+        return {quote: Decimal(rate) for quote, rate in self.rates.get(base, {}).items()}
+
+
+def get_exchange_rate_provider(request: Request) -> Optional[ExchangeRateProvider]:
+    """
+    Dependency returning the configured provider, or None without exchange_rate_provider_url.
+    Override it (app.dependency_overrides) to plug in another provider or a local stub.
+    """
+    if not settings.exchange_rate_provider_url:
+        return None
+    return HttpExchangeRateProvider(request.app.state.http_client, settings.exchange_rate_provider_url)
@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.category import Category
+from app.models.transaction import Transaction
+from app.services import currency_service
+
+# amount is in currency; converted_amount is the amount in the user's currency
+EXPORT_COLUMNS = ["id", "date", "transaction_type", "amount", "currency", "category_id", "category", "description",
+                  "converted_amount"]
+
+
+def build_export_query(user_id: int, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None):
+    """
+    Select the exported columns of a user's transactions, oldest first.
+    Plain columns (no ORM objects) keep per-row overhead low, and the category
+    name comes from an outer join instead of one lookup per row.
+    """
+    query = (
+        select(
+            Transaction.id,
+            Transaction.date,
+            Transaction.transaction_type,
+            Transaction.amount,
+            Transaction.currency,
+            Transaction.category_id,
+            Category.name,
+            Transaction.description,
+        )
+        .outerjoin(Category, Transaction.category_id == Category.id)
+        .filter(Transaction.user_id == user_id)
+        .order_by(Transaction.date, Transaction.id)
+    )
+    if date_from is not None:
+        query = query.filter(Transaction.date >= date_from)
+    if date_to is not None:
+        query = query.filter(Transaction.date <= date_to)
+    return query
+
+
+async def _stream_rows(db: AsyncSession, query) -> AsyncIterator[list]:
+    """Yield the query results in partitions of export_batch_size rows from a server-side cursor."""
+    result = await db.stream(query.execution_options(yield_per=settings.export_batch_size))
+    async for partition in result.partitions():
+        yield partition
+
+
+async def _converted_partitions(db: AsyncSession, query, currency: str) -> AsyncIterator[list[tuple]]:
+    """
+    Yield (row, amount in the user's currency) partitions. The rate table is fetched before the
+    cursor is opened, and each partition's foreign-currency rows are converted in one batch.
+    """
+    rates = await currency_service.get_rate_table(db)
+    async for partition in _stream_rows(db, query):
+        converted = iter(rates.convert_many(
+            [(row.amount, row.currency, row.date.date()) for row in partition if row.currency is not None], currency
+        ))
+        yield [(row, next(converted) if row.currency is not None else row.amount) for row in partition]
+
+
+def _row_values(row, converted_amount, user_currency: str) -> list:
+    id, date, transaction_type, amount, currency, category_id, category, description = row
+    return [id, date.isoformat(), transaction_type.value, str(amount), currency or user_currency, category_id,
+            category, description, str(converted_amount)]
+
+
+async def stream_transactions_csv(db: AsyncSession, user_id: int, currency: str, date_from: Optional[datetime] = None,
+                                  date_to: Optional[datetime] = None) -> AsyncIterator[str]:
+    """Yield a CSV export (header first) one chunk per batch of rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    # The header goes out straight away, before the first batch is fetched
+    yield buffer.getvalue()
+    async for partition in _converted_partitions(db, build_export_query(user_id, date_from, date_to), currency):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_row_values(row, converted, currency) for row, converted in partition)
+        yield buffer.getvalue()
+
+
+async def stream_transactions_ndjson(db: AsyncSession, user_id: int, currency: str,
+                                     date_from: Optional[datetime] = None,
+                                     date_to: Optional[datetime] = None) -> AsyncIterator[str]:
+    """Yield an NDJSON export (one JSON object per line) one chunk per batch of rows."""
+    async for partition in _converted_partitions(db, build_export_query(user_id, date_from, date_to), currency):
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, _row_values(row, converted, currency))), separators=(",", ":")) + "\n"
+            for row, converted in partition
+        )
@@ -0,0 +1,132 @@
+import csv
+from itertools import islice
+from typing import Iterable, Union
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.transaction import Transaction
+from app.services import category_service, currency_service, rollup_service
+from app.utils.versioning import bump_data_version
+from app.schemas.transaction import TransactionCreate, TransactionImportError, TransactionImportResponse
+
+REQUIRED_COLUMNS = {"amount", "transaction_type"}
+IMPORT_COLUMNS = ("amount", "currency", "description", "transaction_type", "category_id", "date")
+
+
+class InvalidImportFileError(ValueError):
+    """Raised when the uploaded file is not a usable transactions CSV."""
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    first = error.errors()[0]
+    field = ".".join(str(part) for part in first["loc"])
+    return f"{field}: {first['msg']}" if field else first["msg"]
+
+
+def _parse_rows(reader: csv.DictReader, count: int) -> list[tuple[int, Union[TransactionCreate, str]]]:
+    """Read and validate the next count rows: (line, transaction or error message) pairs. Blocking."""
+    parsed = []
+    for row in islice(reader, count):
+        # Empty cells mean "not provided" so the schema defaults apply
+        data = {column: row[column] for column in IMPORT_COLUMNS if row.get(column) not in (None, "")}
+        try:
+            parsed.append((reader.line_num, TransactionCreate.model_validate(data)))
+        except ValidationError as e:
+            parsed.append((reader.line_num, _format_validation_error(e)))
+    return parsed
+
+
+async def import_transactions_csv(db: AsyncSession, user_id: int, lines: Iterable[str]) -> TransactionImportResponse:
+    """
+    Import transactions from CSV lines (the columns of the CSV export are accepted).
+    The file is read row by row, each row is validated with the TransactionCreate rules plus
+    category ownership and a known exchange rate for other currencies than the user's (empty:
+    the user's currency), and valid rows are inserted import_batch_size at a time, each batch in
+    its own database transaction. Memory use depends on the batch size, not on the file size.
+    Reading and validating run in the threadpool, a batch of rows at a time.
+    Raises:
+        InvalidImportFileError: if the header is missing required columns or the file is not text
+        SQLAlchemyError: if inserting a batch fails (it is rolled back, earlier batches are kept)
+    """
+    # Read fresh (one query per file) rather than trusting the cache for a whole import
+    owned_category_ids = await category_service.load_owned_category_ids(db, user_id)
+    currency = await currency_service.lock_user_currency(db, user_id)
+
+    report = TransactionImportResponse(total_rows=0, imported=0, failed=0, errors=[])
+    batch = []
+
+    def reject(line: int, message: str) -> None:
+        report.failed += 1
+        if len(report.errors) < settings.import_max_errors:
+            report.errors.append(TransactionImportError(line=line, error=message))
+        else:
+            report.errors_truncated = True
+
+    async def flush() -> None:
+        nonlocal currency
+        try:
+            # Locked until the batch commits; a currency change committed since the rows were
+            # checked rewrote the stored rows, so spell this batch the same way
+            current = await currency_service.lock_user_currency(db, user_id)
+            if current != currency:
+                for row in batch:
+                    row_currency = row["currency"] or currency
+                    row["currency"] = row_currency if row_currency != current else None
+                currency = current
+            await db.execute(insert(Transaction), batch)
+            await rollup_service.apply_rollup_deltas(db, (
+                rollup_service.added(row["user_id"], row["date"], row["category_id"], row["transaction_type"],
+                                     row["amount"], row["currency"])
+                for row in batch
+            ))
+            await bump_data_version(db, user_id)
+            await db.commit()
+        except SQLAlchemyError:
+            await db.rollback()
+            raise
+        report.imported += len(batch)
+        batch.clear()
+
+    try:
+        reader = csv.DictReader(lines)
+        fieldnames = await run_in_threadpool(lambda: reader.fieldnames)
+        missing = REQUIRED_COLUMNS - set(fieldnames or [])
+        if missing:
+            raise InvalidImportFileError(f"Missing required columns: {', '.join(sorted(missing))}")
+
+        while rows := await run_in_threadpool(_parse_rows, reader, settings.import_batch_size):
+            for line, transaction in rows:
+                report.total_rows += 1
+                if isinstance(transaction, str):
+                    reject(line, transaction)
+                    continue
+                if transaction.category_id is not None and transaction.category_id not in owned_category_ids:
+                    reject(line, "category_id: Category not found")
+                    continue
+                row_currency = transaction.currency if transaction.currency != currency else None
+                if row_currency is not None and not (await currency_service.get_rate_table(db)).supports(row_currency, currency):
+                    reject(line, f"currency: No exchange rate from {row_currency} to {currency}")
+                    continue
+
+                batch.append({
+                    "user_id": user_id,
+                    "amount": transaction.amount,
+                    "currency": row_currency,
+                    "description": transaction.description,
+                    "transaction_type": transaction.transaction_type,
+                    "date": transaction.date,
+                    "category_id": transaction.category_id,
+                })
+                if len(batch) >= settings.import_batch_size:
+                    await flush()
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise InvalidImportFileError(f"Unreadable CSV file: {e}")
+
+    if batch:
+        await flush()
+    return report
@@ -0,0 +1,298 @@
+import asyncio
+import heapq
+import logging
+import time
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Iterable, NamedTuple, Optional, Sequence
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.recurring_transaction import RecurrenceFrequency, RecurringTransaction
+from app.models.transaction import Transaction
+from app.services import rollup_service
+from app.utils.versioning import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+# Columns needed to materialize a template
+TEMPLATE_COLUMNS = ["id", "user_id", "amount", "currency", "description", "transaction_type", "category_id",
+                    "frequency", "start_date", "end_date", "next_occurrence_date"]
+# Executed many times per batch (one parameter set per template), compiled once
+ADVANCE_TEMPLATE = (
+    update(RecurringTransaction.__table__)
+    .where(RecurringTransaction.__table__.c.id == bindparam("template_id"))
+    .values(next_occurrence_date=bindparam("next_occurrence_date"), is_active=bindparam("is_active"))
+)
+
+
+def today_utc() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def next_occurrence(frequency: RecurrenceFrequency, anchor: date, current: date) -> date:
+    """
+    Occurrence following current.
+    Monthly and yearly occurrences keep the anchor's day of month, clamped to the month's
+    length (Jan 31 -> Feb 29 -> Mar 31), so short months do not make the schedule drift.
+    """
+    if frequency == RecurrenceFrequency.DAILY:
+        return current + timedelta(days=1)
+    if frequency == RecurrenceFrequency.WEEKLY:
+        return current + timedelta(days=7)
+    months = 1 if frequency == RecurrenceFrequency.MONTHLY else 12
+    year, month = divmod(current.year * 12 + current.month - 1 + months, 12)
+    month += 1
+    return date(year, month, min(anchor.day, monthrange(year, month)[1]))
+
+
+def first_occurrence_on_or_after(template: RecurringTransaction, day: date) -> date:
+    """First occurrence of the template's schedule that is not before day."""
+    current = template.next_occurrence_date
+    if current >= day:
+        return current
+    if template.frequency in (RecurrenceFrequency.DAILY, RecurrenceFrequency.WEEKLY):
+        step = 1 if template.frequency == RecurrenceFrequency.DAILY else 7
+        return current + timedelta(days=-((current - day).days // step) * step)
+    while current < day:
+        current = next_occurrence(template.frequency, template.start_date, current)
+    return current
+
+
+def due_occurrences(template: RecurringTransaction, through: date) -> list[date]:
+    """Occurrences from next_occurrence_date up to through (and end_date), oldest first."""
+    occurrences = []
+    current = template.next_occurrence_date
+    last = through if template.end_date is None else min(through, template.end_date)
+    while current <= last:
+        occurrences.append(current)
+        current = next_occurrence(template.frequency, template.start_date, current)
+    return occurrences
+
+
+class MaterializeResult(NamedTuple):
+    """Transactions created, and the new next_occurrence_date/is_active of each advanced template."""
+    created: int
+    advanced: list[dict]
+
+
+async def materialize_occurrences(db: AsyncSession, templates: Iterable[RecurringTransaction],
+                                  through: date) -> MaterializeResult:
+    """
+    Insert one transaction per due occurrence of the (already locked) templates and advance
+    their next_occurrence_date, without committing. Templates may be ORM objects or rows
+    with the same attributes (the scheduler reads plain rows to skip the ORM bookkeeping).
+    Inserts and template updates each go out as one executemany statement; the caller's
+    commit covers them and the rollups together, so an occurrence is either materialized
+    and skipped from then on, or neither. Templates past their end_date are deactivated.
+    """
+    rows = []
+    advanced = []
+    for template in templates:
+        occurrences = due_occurrences(template, through)
+        if not occurrences:
+            continue
+        for occurrence in occurrences:
+            rows.append({
+                "user_id": template.user_id,
+                "recurring_transaction_id": template.id,
+                "amount": template.amount,
+                "currency": template.currency,
+                "description": template.description,
+                "transaction_type": template.transaction_type,
+                "category_id": template.category_id,
+                "date": datetime.combine(occurrence, dt_time(), tzinfo=timezone.utc),
+            })
+        next_occurrence_date = next_occurrence(template.frequency, template.start_date, occurrences[-1])
+        advanced.append({
+            "template_id": template.id,
+            "next_occurrence_date": next_occurrence_date,
+            "is_active": template.end_date is None or next_occurrence_date <= template.end_date,
+        })
+
+    if rows:
+        await db.execute(insert(Transaction.__table__), rows)
+        await db.execute(ADVANCE_TEMPLATE, advanced)
+        # Many templates share a day: one delta per (user, day, category, type, currency) instead of per row
+        totals = defaultdict(lambda: [Decimal("0"), 0])
+        for row in rows:
+            total = totals[(row["user_id"], row["date"], row["category_id"], row["transaction_type"], row["currency"])]
+            total[0] += row["amount"]
+            total[1] += 1
+        await rollup_service.apply_rollup_deltas(db, (
+            rollup_service.RollupDelta(*key[:4], amount, count, key[4]) for key, (amount, count) in totals.items()
+        ))
+        await bump_data_version(db, *{row["user_id"] for row in rows})
+    return MaterializeResult(len(rows), advanced)
+
+
+async def process_due_templates(db: AsyncSession, template_ids: Sequence[int], today: date) -> dict[int, date]:
+    """
+    Materialize every occurrence up to today of the given templates, and commit.
+    Rows are locked with SELECT ... FOR UPDATE SKIP LOCKED and re-checked for being due, so
+    when several workers pick the same template only one of them processes it (the others skip
+    it, or find it already advanced). Returns the new next_occurrence_date of each template
+    processed here that is still active.
+    """
+    templates = (await db.execute(
+        select(*[RecurringTransaction.__table__.c[name] for name in TEMPLATE_COLUMNS])
+        .filter(
+            RecurringTransaction.id.in_(template_ids),
+            RecurringTransaction.is_active.is_(True),
+            RecurringTransaction.next_occurrence_date <= today,
+        )
+        .with_for_update(skip_locked=True)
+    )).all()
+    result = await materialize_occurrences(db, templates, today)
+    await db.commit()
+    return {row["template_id"]: row["next_occurrence_date"] for row in result.advanced if row["is_active"]}
+
+
+class RecurringScheduler:
+    """
+    Background job materializing due recurring transactions.
+    Due templates are kept in a min-heap of (next_occurrence_date, id), so each wake-up only
+    pops what is due instead of scanning the table. The heap is filled from the database on
+    start and every reload_seconds (templates created by other workers), and fed directly by
+    schedule() for templates created or changed in this process.
+    Args:
+        session_factory: Callable returning a new AsyncSession
+        batch_size: Templates locked and materialized per commit
+        poll_seconds: Longest sleep between two due checks
+        reload_seconds: Interval between two rebuilds of the heap from the database
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], batch_size: int = 1000,
+                 poll_seconds: float = 60, reload_seconds: float = 600):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.reload_seconds = reload_seconds
+        self._heap: list[tuple[date, int]] = []
+        # Latest date pushed per template: older heap entries for it are stale and skipped
+        self._scheduled: dict[int, date] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    def schedule(self, template_id: int, next_occurrence_date: Optional[date]) -> None:
+        """Queue a template for its next occurrence (None removes it from the queue)."""
+        if next_occurrence_date is None:
+            self._scheduled.pop(template_id, None)
+            return
+        if self._scheduled.get(template_id) == next_occurrence_date:
+            return
+        self._scheduled[template_id] = next_occurrence_date
+        heapq.heappush(self._heap, (next_occurrence_date, template_id))
+        if self._wakeup is not None and self._heap[0] == (next_occurrence_date, template_id):
+            self._wakeup.set()
+
+    def pop_due(self, today: date) -> list[int]:
+        """Remove and return the ids of the templates due on or before today."""
+        due = []
+        while self._heap and self._heap[0][0] <= today:
+            next_occurrence_date, template_id = heapq.heappop(self._heap)
+            if self._scheduled.get(template_id) == next_occurrence_date:
+                del self._scheduled[template_id]
+                due.append(template_id)
+        return due
+
+    async def load(self) -> None:
+        """Rebuild the heap from the active templates in the database."""
+        async with self.session_factory() as db:
+            result = await db.stream(
+                select(RecurringTransaction.next_occurrence_date, RecurringTransaction.id)
+                .filter(RecurringTransaction.is_active.is_(True))
+                .execution_options(yield_per=10000)
+            )
+            heap = [(next_occurrence_date, template_id) async for next_occurrence_date, template_id in result]
+        heapq.heapify(heap)
+        self._heap = heap
+        self._scheduled = {template_id: next_occurrence_date for next_occurrence_date, template_id in heap}
+
+    async def run_once(self, today: Optional[date] = None) -> int:
+        """Process every template due on or before today, batch by batch. Returns the templates processed."""
+        today = today or today_utc()
+        due = self.pop_due(today)
+        processed = 0
+        for start in range(0, len(due), self.batch_size):
+            async with self.session_factory() as db:
+                advanced = await process_due_templates(db, due[start:start + self.batch_size], today)
+            processed += len(advanced)
+            for template_id, next_occurrence_date in advanced.items():
+                self.schedule(template_id, next_occurrence_date)
+        return processed
+
+    def _seconds_until_next_due(self) -> float:
+        if not self._heap:
+            return self.poll_seconds
+        if self._heap[0][0] <= today_utc():
+            return 0
+        tomorrow = datetime.combine(today_utc() + timedelta(days=1), dt_time(), tzinfo=timezone.utc)
+        return min(self.poll_seconds, (tomorrow - datetime.now(timezone.utc)).total_seconds())
+
+    async def _run(self) -> None:
+        next_reload = 0.0
+        while True:
+            try:
+                if time.monotonic() >= next_reload:
+                    await self.load()
+                    next_reload = time.monotonic() + self.reload_seconds
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Keep the scheduler alive; what was popped comes back with the next reload
+                logger.exception("Recurring transaction scheduler run failed")
+                next_reload = 0.0
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(self._seconds_until_next_due(), 1))
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Start the scheduler loop on the running event loop."""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the scheduler loop and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._wakeup = None
+        self._heap.clear()
+        self._scheduled.clear()
+
+
+def schedule_template(template: RecurringTransaction) -> None:
+    """Tell the running scheduler (if any) about a template created or changed in this process."""
+    if recurring_scheduler.running:
+        recurring_scheduler.schedule(template.id, template.next_occurrence_date if template.is_active else None)
+
+
+recurring_scheduler = RecurringScheduler(
+    AsyncSessionLocal,
+    batch_size=settings.recurring_batch_size,
+    poll_seconds=settings.recurring_poll_seconds,
+    reload_seconds=settings.recurring_reload_seconds,
+)
@@ -0,0 +1,226 @@
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import Date, and_, cast, delete, func, insert, literal, or_, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.transaction import Transaction, TransactionType
+from app.models.transaction_rollup import RollupGranularity, TransactionRollup
+from app.schemas.analytics import PeriodSummary
+from app.services import currency_service
+
+ROLLUP_KEY = ["user_id", "granularity", "period", "category_id", "transaction_type", "currency"]
+
+
+class RollupDelta(NamedTuple):
+    """Signed change of one transaction to apply to the rollups."""
+    user_id: int
+    date: datetime
+    category_id: Optional[int]
+    transaction_type: TransactionType
+    amount: Decimal
+    count: int
+    # None: the user's own currency
+    currency: Optional[str] = None
+
+
+def added(user_id: int, date: datetime, category_id: Optional[int], transaction_type: TransactionType,
+          amount: Decimal, currency: Optional[str] = None) -> RollupDelta:
+    """Delta for a transaction that now exists."""
+    return RollupDelta(user_id, date, category_id, transaction_type, Decimal(amount), 1, currency)
+
+
+def removed(user_id: int, date: datetime, category_id: Optional[int], transaction_type: TransactionType,
+            amount: Decimal, currency: Optional[str] = None) -> RollupDelta:
+    """Delta for a transaction that no longer exists (or no longer has these values)."""
+    return RollupDelta(user_id, date, category_id, transaction_type, -Decimal(amount), -1, currency)
+
+
+def transaction_added(transaction: Transaction) -> RollupDelta:
+    return added(transaction.user_id, transaction.date, transaction.category_id,
+                 transaction.transaction_type, transaction.amount, transaction.currency)
+
+
+def transaction_removed(transaction: Transaction) -> RollupDelta:
+    return removed(transaction.user_id, transaction.date, transaction.category_id,
+                   transaction.transaction_type, transaction.amount, transaction.currency)
+
+
+def period_start(granularity: RollupGranularity, value: datetime) -> date:
+    day = currency_service.day_of(value)
+    return day if granularity == RollupGranularity.DAY else day.replace(day=1)
+
+
+def inline(value):
+    """
+    Constant rendered in the SQL text. Use it in expressions that are both selected and grouped
+    by: asyncpg sends bound values separately, and date_trunc($1, date) in SELECT is not the
+    date_trunc($4, date) of GROUP BY for PostgreSQL.
+    """
+    return literal(value, literal_execute=True)
+
+
+def period_start_expr(dialect_name: str, granularity: RollupGranularity, column):
+    """SQL expression truncating a datetime column to the first day of its period."""
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc(inline(granularity.value), column), Date)
+    if granularity == RollupGranularity.DAY:
+        return func.date(column)
+    return func.date(column, "start of month")
+
+
+def _upsert(db: AsyncSession):
+    return postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+
+async def apply_rollup_deltas(db: AsyncSession, deltas: Iterable[RollupDelta]) -> None:
+    """
+    Add signed deltas to the day and month rollups, without committing.
+    Deltas sharing a key are merged first, then applied with one executemany
+    INSERT ... ON CONFLICT DO UPDATE, so the caller's commit covers both
+    the transaction write and its rollups.
+    """
+    merged = defaultdict(lambda: [Decimal("0"), 0])
+    for delta in deltas:
+        for granularity in RollupGranularity:
+            key = (delta.user_id, granularity, period_start(granularity, delta.date),
+                   delta.category_id or 0, delta.transaction_type, delta.currency or "")
+            merged[key][0] += delta.amount
+            merged[key][1] += delta.count
+    rows = [
+        dict(zip(ROLLUP_KEY, key), total=total, count=count)
+        for key, (total, count) in merged.items()
+        if total or count
+    ]
+    if not rows:
+        return
+
+    table = TransactionRollup.__table__
+    stmt = _upsert(db)(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=ROLLUP_KEY,
+        set_={"total": table.c.total + stmt.excluded.total, "count": table.c.count + stmt.excluded.count},
+    )
+    # executemany of one cached statement, instead of compiling a new multi-row VALUES each call
+    await db.execute(stmt, rows)
+
+
+async def move_category_rollups_to_uncategorized(db: AsyncSession, user_id: int, category_id: int) -> None:
+    """Fold the rollups of a deleted category into the uncategorized ones, without committing."""
+    rows = (await db.execute(
+        delete(TransactionRollup)
+        .where(TransactionRollup.user_id == user_id, TransactionRollup.category_id == category_id)
+        .returning(TransactionRollup.granularity, TransactionRollup.period, TransactionRollup.transaction_type,
+                   TransactionRollup.total, TransactionRollup.count, TransactionRollup.currency)
+    )).all()
+    # Only the day rows are replayed: each one also feeds its month
+    await apply_rollup_deltas(db, (
+        RollupDelta(user_id, period, None, transaction_type, total, count, currency)
+        for granularity, period, transaction_type, total, count, currency in rows
+        if granularity == RollupGranularity.DAY
+    ))
+
+
+async def rebuild_rollups(db: AsyncSession, user_id: Optional[int] = None) -> None:
+    """
+    Recompute the rollups from the transactions table (for one user or everyone) and commit.
+    Use it to repair drift, e.g. after writes that bypassed the API.
+    """
+    clear = delete(TransactionRollup)
+    if user_id is not None:
+        clear = clear.where(TransactionRollup.user_id == user_id)
+    await db.execute(clear)
+
+    dialect_name = db.bind.dialect.name
+    for granularity in RollupGranularity:
+        period = period_start_expr(dialect_name, granularity, Transaction.date)
+        category_id = func.coalesce(Transaction.category_id, inline(0))
+        currency = func.coalesce(Transaction.currency, inline(""))
+        source = (
+            select(
+                Transaction.user_id,
+                literal(granularity, TransactionRollup.granularity.type),
+                period,
+                category_id,
+                Transaction.transaction_type,
+                currency,
+                func.sum(Transaction.amount),
+                func.count(Transaction.id),
+            )
+            .group_by(Transaction.user_id, period, category_id, Transaction.transaction_type, currency)
+        )
+        if user_id is not None:
+            source = source.filter(Transaction.user_id == user_id)
+        await db.execute(insert(TransactionRollup).from_select(ROLLUP_KEY + ["total", "count"], source))
+    await db.commit()
+
+
+def period_end(granularity: RollupGranularity, value: date) -> date:
+    """Last day of the period containing value."""
+    if granularity == RollupGranularity.DAY:
+        return value
+    return (value.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+async def get_period_summary(db: AsyncSession, user_id: int, currency: str, granularity: RollupGranularity,
+                             date_from: Optional[date] = None, date_to: Optional[date] = None) -> list[PeriodSummary]:
+    """
+    Income, expense and net per period in the user's currency, read from the rollups (no scan
+    of transactions). Totals in other currencies come from the day rollups in the same query and
+    are converted at each day's rate in one batch before being added to their period.
+    """
+    query = (
+        select(TransactionRollup.period, TransactionRollup.transaction_type, TransactionRollup.currency,
+               func.sum(TransactionRollup.total))
+        .filter(
+            TransactionRollup.user_id == user_id,
+            or_(
+                and_(TransactionRollup.granularity == granularity, TransactionRollup.currency == ""),
+                and_(TransactionRollup.granularity == RollupGranularity.DAY, TransactionRollup.currency != ""),
+            ),
+        )
+        .group_by(TransactionRollup.period, TransactionRollup.transaction_type, TransactionRollup.currency)
+    )
+    if date_from is not None:
+        query = query.filter(TransactionRollup.period >= period_start(granularity, date_from))
+    if date_to is not None:
+        query = query.filter(TransactionRollup.period <= period_end(granularity, date_to))
+    rows = (await db.execute(query)).all()
+
+    foreign = [(total, row_currency, period) for period, _, row_currency, total in rows if row_currency]
+    converted = iter(await currency_service.convert_to(db, currency, foreign))
+    summaries: dict[date, PeriodSummary] = {}
+    for period, transaction_type, row_currency, total in rows:
+        if row_currency:
+            period, total = period_start(granularity, period), next(converted)
+        summary = summaries.setdefault(period, PeriodSummary(period=period, income=Decimal("0"), expense=Decimal("0"),
+                                                             net=Decimal("0")))
+        if transaction_type == TransactionType.INCOME:
+            summary.income += total
+        else:
+            summary.expense += total
+        summary.net = summary.income - summary.expense
+    return [summaries[period] for period in sorted(summaries)]
+
+
+async def _main() -> None:
+    from app.database import AsyncSessionLocal, async_engine
+
+    parser = argparse.ArgumentParser(description="Rebuild the transaction rollups from the transactions table.")
+    parser.add_argument("--user-id", type=int, default=None, help="only rebuild this user's rollups")
+    args = parser.parse_args()
+    try:
+        async with AsyncSessionLocal() as db:
+            await rebuild_rollups(db, args.user_id)
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,82 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import Select, column, func, literal_column, select, table, text
+
+from app.models.transaction import DESCRIPTION_TSVECTOR, Transaction, TransactionType
+
+# FTS5 index of the SQLite schema (see app.models.transaction)
+transactions_fts = table("transactions_fts", column("rowid"))
+
+
+@dataclass(frozen=True)
+class TransactionFilters:
+    """Optional filters of the transaction list; None (or False) means "do not filter"."""
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    transaction_type: Optional[TransactionType] = None
+    category_id: Optional[int] = None
+    uncategorized: bool = False
+    min_amount: Optional[Decimal] = None
+    max_amount: Optional[Decimal] = None
+    search: Optional[str] = None
+
+
+def search_terms(search: str) -> list[str]:
+    """
+    Words of a search string, lowercased. Only word characters are kept, so the terms
+    can be put in a tsquery / FTS5 query without escaping (and user input never reaches
+    the query syntax).
+    """
+    return re.findall(r"\w+", search.lower())
+
+
+def description_search_condition(dialect_name: str, search: str):
+    """
+    WHERE clause matching descriptions containing every word of search (the last one as a prefix,
+    so it works while typing). Uses the GIN tsvector index on Postgres and the FTS5 table on SQLite,
+    and falls back to LIKE elsewhere.
+    """
+    terms = search_terms(search)
+    if not terms:
+        return None
+    if dialect_name == "postgresql":
+        tsquery = " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+        return DESCRIPTION_TSVECTOR.op("@@")(func.to_tsquery(text("'simple'"), tsquery))
+    if dialect_name == "sqlite":
+        fts_query = " ".join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+        return Transaction.id.in_(
+            select(transactions_fts.c.rowid).where(literal_column("transactions_fts").match(fts_query))
+        )
+    return func.lower(Transaction.description).contains(search.lower())
+
+
+def apply_transaction_filters(query: Select, filters: TransactionFilters, dialect_name: str) -> Select:
+    """
+    Add the filters to a query on Transaction that is already restricted to one user.
+    Each filter maps onto a (user_id, ...) index: date -> (user_id, date, id),
+    category -> (user_id, category_id, date, id), type -> (user_id, transaction_type, date, ...),
+    amount -> (user_id, amount), text -> tsvector GIN / FTS5.
+    """
+    if filters.date_from is not None:
+        query = query.filter(Transaction.date >= filters.date_from)
+    if filters.date_to is not None:
+        query = query.filter(Transaction.date <= filters.date_to)
+    if filters.transaction_type is not None:
+        query = query.filter(Transaction.transaction_type == filters.transaction_type)
+    if filters.uncategorized:
+        query = query.filter(Transaction.category_id.is_(None))
+    elif filters.category_id is not None:
+        query = query.filter(Transaction.category_id == filters.category_id)
+    if filters.min_amount is not None:
+        query = query.filter(Transaction.amount >= filters.min_amount)
+    if filters.max_amount is not None:
+        query = query.filter(Transaction.amount <= filters.max_amount)
+    if filters.search:
+        condition = description_search_condition(dialect_name, filters.search)
+        if condition is not None:
+            query = query.filter(condition)
+    return query
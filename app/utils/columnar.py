@@ -0,0 +1,115 @@
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Iterable, Optional, Sequence
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.models.transaction import TransactionType
+from app.schemas.analytics import PeriodSummary
+from app.schemas.columnar import AMOUNT_SCALE, TRANSACTION_TYPE_CODES, PeriodSummaryColumns, TransactionColumns
+
+JSON_MEDIA_TYPE = "application/json"
+# Parallel arrays instead of one object per row (see app.schemas.columnar)
+COLUMNAR_MEDIA_TYPE = "application/vnd.finance.columnar+json"
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ONE_MILLISECOND = timedelta(milliseconds=1)
+TYPE_CODE = {TransactionType(name): code for code, name in enumerate(TRANSACTION_TYPE_CODES)}
+
+
+def _accept_ranges(accept: str) -> list[tuple[str, float]]:
+    ranges = []
+    for part in accept.split(","):
+        media_range, *params = [piece.strip() for piece in part.split(";")]
+        if not media_range:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges.append((media_range.lower(), quality))
+    return ranges
+
+
+def preferred_media_type(accept: Optional[str], offered: Sequence[str]) -> str:
+    """
+    The offered media type the Accept header ranks highest. Each offer takes the quality of the
+    most specific range matching it (type/subtype, then type/*, then */*); ties, a missing
+    header, or nothing acceptable fall back to the first offer.
+    """
+    if not accept:
+        return offered[0]
+    ranges = dict(_accept_ranges(accept))
+    best, best_quality = offered[0], 0.0
+    for media_type in offered:
+        main_type = media_type.split("/")[0]
+        for media_range in (media_type, f"{main_type}/*", "*/*"):
+            if media_range in ranges:
+                if ranges[media_range] > best_quality:
+                    best, best_quality = media_type, ranges[media_range]
+                break
+    return best
+
+
+def negotiated_media_type(request: Request) -> str:
+    """The representation (JSON or columnar) the request's Accept header selects."""
+    return preferred_media_type(request.headers.get("accept"), (JSON_MEDIA_TYPE, COLUMNAR_MEDIA_TYPE))
+
+
+def wants_columnar(request: Request) -> bool:
+    return negotiated_media_type(request) == COLUMNAR_MEDIA_TYPE
+
+
+def to_minor_units(amount: Decimal) -> int:
+    return int(amount.scaleb(AMOUNT_SCALE).to_integral_value())
+
+
+def to_epoch_ms(value: date) -> int:
+    """Milliseconds since the epoch; naive datetimes are UTC (as stored), dates start at UTC midnight."""
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time(), tzinfo=timezone.utc)
+    elif value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // ONE_MILLISECOND
+
+
+def transaction_columns(rows: Iterable[tuple[int, Decimal, Optional[str], datetime, TransactionType, Optional[int]]]) -> TransactionColumns:
+    """Columns of (id, amount, currency, date, transaction_type, category_id) rows."""
+    ids, amounts, currencies, dates, types, category_ids = list(zip(*rows)) or [()] * 6
+    return TransactionColumns.model_construct(
+        count=len(ids),
+        amount_scale=AMOUNT_SCALE,
+        transaction_types=TRANSACTION_TYPE_CODES,
+        id=list(ids),
+        amount_minor=[to_minor_units(amount) for amount in amounts],
+        currency=list(currencies),
+        date=[to_epoch_ms(value) for value in dates],
+        transaction_type=[TYPE_CODE[transaction_type] for transaction_type in types],
+        category_id=list(category_ids),
+    )
+
+
+def period_summary_columns(summaries: Sequence[PeriodSummary]) -> PeriodSummaryColumns:
+    return PeriodSummaryColumns.model_construct(
+        count=len(summaries),
+        amount_scale=AMOUNT_SCALE,
+        period=[to_epoch_ms(summary.period) for summary in summaries],
+        income_minor=[to_minor_units(summary.income) for summary in summaries],
+        expense_minor=[to_minor_units(summary.expense) for summary in summaries],
+        net_minor=[to_minor_units(summary.net) for summary in summaries],
+    )
+
+
+def columnar_response(columns: BaseModel, headers=None) -> Response:
+    """Serialize columns straight to bytes (model_construct skipped validation, the arrays are already typed)."""
+    return Response(columns.model_dump_json(), media_type=COLUMNAR_MEDIA_TYPE, headers=headers)
+
+
+def columnar_openapi(model: type[BaseModel]) -> dict:
+    """`responses=` entry documenting the columnar representation of a 200 response."""
+    return {200: {"content": {COLUMNAR_MEDIA_TYPE: {"schema": model.model_json_schema()}}}}
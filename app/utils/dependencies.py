@@ -1,20 +1,64 @@
+from dataclasses import dataclass
+from datetime import datetime
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app import database
+from app.database import get_async_db
 from app.models.user import User
+from .cache import TTLCache
 from .security import decode_access_token
 from app.schemas.token import TokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """Lightweight snapshot of the authenticated user, safe to share between requests."""
+    id: int
+    email: str
+    username: str
+    is_active: bool
+    created_at: datetime
+    currency: str
+    is_admin: bool
+
+    @classmethod
+    def from_model(cls, user: User) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            is_active=bool(user.is_active),
+            created_at=user.created_at,  # type: ignore
+            currency=user.currency,
+            is_admin=bool(user.is_admin),
+        )
+
+
+# Authenticated users keyed by id, so hot users skip the SELECT on every request
+user_cache: TTLCache[int, CurrentUser] = TTLCache(
+    max_size=settings.user_cache_max_size,
+    ttl=settings.user_cache_ttl_seconds
+)
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    """Forget the cached snapshot of a user. Call it after the user row changes."""
+    user_cache.invalidate(user_id)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> CurrentUser:
     """Dependency to get current authenticated user from JWT token.
+    The user is served from user_cache when possible and only read from the database on a miss.
     Args:
         token: JWT token from Authorization header
         db: Database session
     Returns:
-        User: Current authenticated user
+        CurrentUser: Snapshot of the current authenticated user
     Raises:
         HTTPException: 401 if token is invalid or user not found """
     # Decode the token
@@ -47,8 +91,12 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             headers={"WWW-Authenticate": "Bearer"}
         )
     
+    current_user = user_cache.get(user_id)
+    if current_user is not None:
+        return current_user
+    
     # Query database for user using the id extracted from the JWT token 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).filter(User.id == user_id))
 
     if user is None:
         raise HTTPException(
@@ -56,15 +104,17 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"}
         )
-        
-    return user
+    
+    current_user = CurrentUser.from_model(user)
+    user_cache.set(user_id, current_user)
+    return current_user
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Dependency to ensure current user is active.
     Args:
         current_user: User from get_current_user dependency
     Returns:
-        User: Active user    
+        CurrentUser: Active user    
     Raises:
         HTTPException: 400 if user is inactive"""
     if current_user is None:
@@ -78,4 +128,37 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
             detail="Inactive user"
         )
     
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+async def get_current_admin_user(current_user: CurrentUser = Depends(get_current_active_user)) -> CurrentUser:
+    """Dependency to ensure current user is an admin.
+    Args:
+        current_user: User from get_current_active_user dependency
+    Returns:
+        CurrentUser: Admin user
+    Raises:
+        HTTPException: 403 if user is not an admin"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
+
+
+async def get_read_db(current_user: CurrentUser = Depends(get_current_active_user),
+                      db: AsyncSession = Depends(get_async_db)):
+    """Dependency to get a DB session for read-only endpoints.
+    Reads go to the replica when one is configured, except for users who wrote within the last
+    replica_sticky_seconds: they read from the primary so they always see their own writes.
+    Args:
+        current_user: User from get_current_active_user dependency
+        db: Primary session (shared with the auth dependency; no connection is taken until it is used)
+    Yields:
+        AsyncSession: Replica or primary session"""
+    if database.reads_from_primary(current_user.id):
+        yield db
+        return
+    async with database.ReplicaSessionLocal() as replica_db:
+        yield replica_db
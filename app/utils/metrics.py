@@ -0,0 +1,182 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implied
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+# Route label of requests that matched no route (keeps the label set bounded)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed buckets.
+    Args:
+        buckets: Sorted upper bounds of the buckets (+Inf is added)
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # One count per bucket plus +Inf, not cumulative (summed up when rendering)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _render_histogram(name: str, histogram: Histogram, labels: dict[str, str]) -> Iterable[str]:
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else _number(bound)
+        yield f"{name}_bucket{_labels(**labels, le=le)} {cumulative}"
+    suffix = _labels(**labels) if labels else ""
+    yield f"{name}_sum{suffix} {_number(histogram.sum)}"
+    yield f"{name}_count{suffix} {histogram.count}"
+
+
+class RequestMetrics:
+    """
+    Per-route request counters, latency histograms and the in-flight gauge.
+    Only the event loop thread records (the middleware runs there even for sync endpoints),
+    so updates are plain dict and int operations with no lock on the request path.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.in_flight = 0
+        # (method, route, status) -> requests
+        self.requests: dict[tuple[str, str, str], int] = defaultdict(int)
+        # (method, route) -> latency histogram
+        self.latency: dict[tuple[str, str], Histogram] = {}
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float) -> None:
+        self.requests[(method, route, str(status_code))] += 1
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def clear(self) -> None:
+        self.in_flight = 0
+        self.requests.clear()
+        self.latency.clear()
+
+    def render(self) -> Iterable[str]:
+        yield "# HELP http_requests_total Requests answered, by method, route and status code."
+        yield "# TYPE http_requests_total counter"
+        for (method, route, status_code), count in sorted(self.requests.items()):
+            yield f"http_requests_total{_labels(method=method, route=route, status=status_code)} {count}"
+        yield "# HELP http_request_duration_seconds Request latency, by method and route."
+        yield "# TYPE http_request_duration_seconds histogram"
+        for (method, route), histogram in sorted(self.latency.items()):
+            yield from _render_histogram("http_request_duration_seconds", histogram,
+                                         {"method": method, "route": route})
+        yield "# HELP http_requests_in_flight Requests being processed."
+        yield "# TYPE http_requests_in_flight gauge"
+        yield f"http_requests_in_flight {self.in_flight}"
+
+
+class PoolMetrics:
+    """Time spent waiting for a pooled connection, fed by InstrumentedAsyncQueuePool."""
+
+    def __init__(self, buckets: tuple[float, ...] = POOL_WAIT_BUCKETS):
+        self.wait = Histogram(buckets)
+
+    def clear(self) -> None:
+        self.wait = Histogram(self.wait.buckets)
+
+    def render(self, pool: Optional[Pool]) -> Iterable[str]:
+        # Gauges are read from the pool at scrape time, so checkouts cost nothing extra
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            gauges = {
+                "db_pool_size": ("Connections the pool keeps open.", pool.size()),
+                "db_pool_checked_out": ("Connections currently checked out.", pool.checkedout()),
+                "db_pool_checked_in": ("Idle connections in the pool.", pool.checkedin()),
+                "db_pool_overflow": ("Connections open beyond pool_size (negative: not opened yet).", pool.overflow()),
+            }
+            for name, (help_text, value) in gauges.items():
+                yield f"# HELP {name} {help_text}"
+                yield f"# TYPE {name} gauge"
+                yield f"{name} {value}"
+        yield "# HELP db_pool_wait_seconds Time to get a connection from the pool (includes opening one)."
+        yield "# TYPE db_pool_wait_seconds histogram"
+        yield from _render_histogram("db_pool_wait_seconds", self.wait, {})
+
+
+request_metrics = RequestMetrics()
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool recording how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_metrics.wait.observe(time.perf_counter() - start)
+
+
+def render_metrics(pool: Optional[Pool] = None) -> str:
+    """All metrics in the Prometheus text format."""
+    return "\n".join([*request_metrics.render(), *pool_metrics.render(pool)]) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware feeding request_metrics.
+    Requests are labelled with their route template (/transactions/{id}), read from the scope
+    once routing has run, so the label set stays bounded whatever the URLs are.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        request_metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_metrics.in_flight -= 1
+            route = scope.get("route")
+            request_metrics.observe(scope["method"], getattr(route, "path", UNMATCHED_ROUTE),
+                                    status_code, time.perf_counter() - start)
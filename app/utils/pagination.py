@@ -0,0 +1,41 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(date: datetime, id: int) -> str:
+    """
+    Build an opaque cursor pointing at the last row of a page.
+    Args:
+        date: Date of the last transaction returned
+        id: Id of the last transaction returned
+    Returns:
+        str: URL-safe cursor string
+    """
+    raw = json.dumps({"d": date.isoformat(), "i": id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+    Args:
+        cursor: Cursor string sent by the client
+    Returns:
+        Tuple of (date, id) of the last row already seen
+    Raises:
+        InvalidCursorError: if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["d"]), int(data["i"])
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError,
+            KeyError, TypeError, ValueError):
+        raise InvalidCursorError("Invalid cursor")
@@ -0,0 +1,144 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# A parenthesized list of bind placeholders (qmark, numeric, pyformat or named style),
+# as rendered by expanding IN parameters: collapsed so IN lists of any length share a shape
+_PLACEHOLDER_LIST = re.compile(
+    r"\(\s*(?:\?|\$\d+|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|\$\d+|%\(\w+\)s|:\w+))*\s*\)"
+)
+
+
+class RepeatedStatementError(Exception):
+    """Raised in strict mode when one request runs the same statement shape too many times (N+1)."""
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with whitespace normalized and placeholder lists collapsed."""
+    return _PLACEHOLDER_LIST.sub("(...)", " ".join(statement.split()))
+
+
+class QueryStats:
+    """
+    Statements run and time spent in the database during one request.
+    Args:
+        strict: Count statements per shape and raise RepeatedStatementError when one
+            shape runs more than settings.sql_repeated_statement_limit times
+    """
+
+    __slots__ = ("count", "seconds", "shapes")
+
+    def __init__(self, strict: bool = False):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Optional[Counter[str]] = Counter() if strict else None
+
+    def record(self, statement: str, seconds: float, executemany: bool) -> None:
+        self.count += 1
+        self.seconds += seconds
+        # executemany is batched already, repeating it per chunk is not an N+1
+        if self.shapes is None or executemany:
+            return
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+        if self.shapes[shape] > settings.sql_repeated_statement_limit:
+            raise RepeatedStatementError(
+                f"Statement ran {self.shapes[shape]} times in one request (N+1?): {shape}"
+            )
+
+
+# Stats of the request being served; None outside requests (scripts, background jobs)
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(strict: Optional[bool] = None) -> Iterator[QueryStats]:
+    """Collect the statements run by this context (and the tasks and greenlets it starts)."""
+    stats = QueryStats(settings.sql_strict_mode if strict is None else strict)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        context._query_stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    start = getattr(context, "_query_stats_start", None)
+    if stats is not None and start is not None:
+        stats.record(statement, time.perf_counter() - start, executemany)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Feed the current request's QueryStats from this (sync, or async.sync_engine) engine."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def server_timing(stats: QueryStats, total_seconds: float) -> str:
+    return (f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} queries", '
+            f"app;dur={total_seconds * 1000:.2f}")
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware tracking the SQL of each request.
+    The statement count and database time go out in the Server-Timing header (as of the
+    response start: statements run while streaming a body only reach the log) and in one
+    log record per request, with the numbers also attached as record attributes for
+    structured log handlers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+        with track_queries() as stats:
+            async def send_with_timing(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    MutableHeaders(scope=message).append("Server-Timing",
+                                                         server_timing(stats, time.perf_counter() - start))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                total_ms = (time.perf_counter() - start) * 1000
+                route = getattr(scope.get("route"), "path", scope["path"])
+                logger.info(
+                    "%s %s %s: %d queries, %.2f ms db, %.2f ms total",
+                    scope["method"], route, status_code, stats.count, stats.seconds * 1000, total_ms,
+                    extra={"method": scope["method"], "route": route, "status_code": status_code,
+                           "db_queries": stats.count, "db_ms": round(stats.seconds * 1000, 2),
+                           "duration_ms": round(total_ms, 2)},
+                )
@@ -1,15 +1,43 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, datetime, timezone
 from passlib.context import CryptContext
 from app.config import settings
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from jose import jwt, JWTError
+from .cache import TTLCache
 
 # Our secret key and algorithm (from .env)
 SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
 
 # Configure the password hashing context
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Hashes made with other cost parameters are reported as needing a rehash by verify_and_update
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.argon2_time_cost,
+    argon2__memory_cost=settings.argon2_memory_cost,
+    argon2__parallelism=settings.argon2_parallelism,
+)
+
+# Argon2 releases the GIL, so a small dedicated thread pool keeps it off the event loop
+# without competing with the default threadpool that serves the other endpoints
+_password_executor: Optional[ThreadPoolExecutor] = None
+_pending_password_jobs = 0
+
+
+# Verified token payloads keyed by the token's SHA-256 digest; entries expire with the token
+token_cache: TTLCache[bytes, Dict[str, Any]] = TTLCache(
+    max_size=settings.token_cache_max_size,
+    ttl=settings.access_token_expire_minutes * 60
+)
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when too many password hashing jobs are already queued."""
 
 def hash_password(password: str) -> str:
     """
@@ -32,6 +60,58 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if it was hashed with outdated parameters.
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Previously hashed password from database
+    Returns:
+        Tuple of (matches, new_hash); new_hash is None unless the stored hash should be replaced
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def get_password_executor() -> ThreadPoolExecutor:
+    """Return the password hashing pool, creating it on first use."""
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(
+            max_workers=settings.password_hash_workers,
+            thread_name_prefix="password-hash"
+        )
+    return _password_executor
+
+def shutdown_password_executor() -> None:
+    """Stop the password hashing pool (it is recreated on next use)."""
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=False)
+        _password_executor = None
+
+async def _run_password_job(func, *args):
+    """
+    Run a password function on the password pool.
+    Raises:
+        PasswordHasherBusyError: if password_hash_max_pending jobs are already waiting
+    """
+    global _pending_password_jobs
+    if _pending_password_jobs >= settings.password_hash_max_pending:
+        raise PasswordHasherBusyError()
+    _pending_password_jobs += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_password_executor(), func, *args)
+    finally:
+        _pending_password_jobs -= 1
+
+async def hash_password_async(password: str) -> str:
+    """Async version of hash_password that runs on the password pool."""
+    return await _run_password_job(hash_password, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Async version of verify_and_update_password that runs on the password pool."""
+    return await _run_password_job(verify_and_update_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -58,13 +138,33 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Decode and verify a JWT token.
+    Tokens that already passed verification are served from token_cache until their exp.
     Args:
         token: JWT token string
     Returns:
         Dict with token payload if valid, None if invalid/expired
     """
+    if not settings.token_cache_enabled:
+        try:
+            return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            return None
+    
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        # The cache TTL follows exp, but never trust it past the wall-clock expiry
+        if payload["exp"] > time.time():
+            return dict(payload)
+        token_cache.invalidate(key)
+        return None
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+    # Only tokens with an expiry are cached, and only for the time they have left
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        token_cache.set(key, dict(payload), ttl=exp - time.time())
+    return payload
\ No newline at end of file
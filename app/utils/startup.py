@@ -0,0 +1,87 @@
+import asyncio
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from fastapi import FastAPI
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+class SchemaRevisionError(RuntimeError):
+    """Raised at startup when the database is not at the Alembic head revision."""
+
+
+def alembic_heads(config_path: Path = ALEMBIC_INI) -> set[str]:
+    """Head revision(s) of the migration scripts shipped with the app."""
+    return set(ScriptDirectory.from_config(Config(str(config_path))).get_heads())
+
+
+async def database_revisions(engine: AsyncEngine) -> set[str]:
+    """Revision(s) stamped in the database's alembic_version table (empty without one)."""
+    async with engine.connect() as conn:
+        return set(await conn.run_sync(lambda sync_conn: MigrationContext.configure(sync_conn).get_current_heads()))
+
+
+async def verify_schema_revision(engine: AsyncEngine) -> None:
+    """
+    Check the database was migrated to the head revision, in one small query: cheaper than
+    reflecting every table with create_all, and it never changes the schema behind Alembic's back.
+    """
+    expected, current = alembic_heads(), await database_revisions(engine)
+    if current != expected:
+        raise SchemaRevisionError(
+            f"Database is at revision {', '.join(sorted(current)) or '<none>'}, the app expects "
+            f"{', '.join(sorted(expected))}: run `alembic upgrade head` before starting it"
+        )
+
+
+async def prewarm_pool(engine: AsyncEngine, connections: int) -> int:
+    """
+    Open up to `connections` pool connections at once and check them back in, so the first
+    requests after a (re)start do not pay for connecting. Capped at the pool size (overflow
+    connections are closed on checkin); pools that keep nothing (NullPool, in-memory SQLite)
+    are left alone. Returns the number of connections opened.
+    """
+    if not isinstance(engine.pool, QueuePool):
+        return 0
+    connections = min(connections, engine.pool.size())
+    if connections <= 0:
+        return 0
+    results = await asyncio.gather(*(engine.connect().start() for _ in range(connections)),
+                                   return_exceptions=True)
+    opened = [result for result in results if not isinstance(result, BaseException)]
+    for conn in opened:
+        await conn.close()
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return len(opened)
+
+
+def _subclasses(cls: type) -> list[type]:
+    found = []
+    for subclass in cls.__subclasses__():
+        found.append(subclass)
+        found.extend(_subclasses(subclass))
+    return found
+
+
+def precompile_schemas(app: FastAPI) -> int:
+    """
+    Build the validators and serializers still pending (models with unresolved forward
+    references are completed on first use), and the OpenAPI document, which FastAPI
+    otherwise generates on the first /docs or /openapi.json request.
+    Returns the number of models rebuilt.
+    """
+    rebuilt = 0
+    for model in _subclasses(BaseModel):
+        if model.__module__.startswith("app.") and not model.__pydantic_complete__:
+            model.model_rebuild()
+            rebuilt += 1
+    app.openapi()
+    return rebuilt
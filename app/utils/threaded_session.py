@@ -0,0 +1,86 @@
+from typing import Any, AsyncIterator, Optional
+
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+
+class ThreadedResult:
+    """AsyncResult stand-in over a sync streaming Result: every fetch runs in the threadpool."""
+
+    def __init__(self, result: Result):
+        self.result = result
+
+    async def partitions(self, size: Optional[int] = None) -> AsyncIterator[list]:
+        partitions = self.result.partitions(size)
+        while True:
+            partition = await run_in_threadpool(next, partitions, None)
+            if partition is None:
+                return
+            yield partition
+
+    async def __aiter__(self) -> AsyncIterator:
+        async for partition in self.partitions():
+            for row in partition:
+                yield row
+
+
+class ThreadedSession:
+    """
+    AsyncSession stand-in over a sync Session, for database_async=False: the awaitable methods
+    the routers and services use, each database round-trip run in Starlette's threadpool with
+    the sync driver of DATABASE_URL.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    @property
+    def bind(self):
+        return self.sync_session.bind
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances) -> None:
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None, **kwargs) -> Result:
+        return await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs) -> Any:
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, params, **kwargs)
+
+    async def stream(self, statement, params=None, **kwargs) -> ThreadedResult:
+        statement = statement.execution_options(stream_results=True)
+        return ThreadedResult(await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs))
+
+    async def get(self, entity, ident, **kwargs) -> Any:
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def refresh(self, instance, attribute_names=None) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def delete(self, instance) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self, objects=None) -> None:
+        await run_in_threadpool(self.sync_session.flush, objects)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+    async def __aenter__(self) -> "ThreadedSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
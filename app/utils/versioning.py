@@ -0,0 +1,102 @@
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import mark_user_write
+from app.models.user import User
+from app.utils.columnar import JSON_MEDIA_TYPE, negotiated_media_type
+from app.utils.dependencies import CurrentUser, get_current_active_user, get_read_db, invalidate_cached_user
+
+# Clients may keep the response but must revalidate it (with If-None-Match) before reuse
+CACHE_CONTROL = "private, no-cache"
+
+
+async def bump_data_version(db: AsyncSession, *user_ids: int) -> None:
+    """
+    Increment the data version of the given users, without committing.
+    Call it in every write that changes what the conditional GETs return, so the new
+    version is committed together with the change it stands for. The users' reads also
+    stick to the primary for a while (see get_read_db), so they see the change at once.
+    """
+    if not user_ids:
+        return
+    for user_id in set(user_ids):
+        mark_user_write(user_id)
+    await db.execute(
+        update(User)
+        .where(User.id.in_(set(user_ids)))
+        .values(data_version=User.data_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def make_etag(user_id: int, version: int, media_type: str = JSON_MEDIA_TYPE) -> str:
+    """ETag of a user's data version in one representation (JSON ETags carry no media type)."""
+    if media_type == JSON_MEDIA_TYPE:
+        return f'W/"{user_id}-{version}"'
+    return f'W/"{user_id}-{version}-{media_type}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against etag (RFC 9110)."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    return any(candidate.removeprefix("W/") == etag.removeprefix("W/") for candidate in candidates)
+
+
+def check_not_modified(request: Request, response: Response, user_id: int, version: int,
+                       media_type: Optional[str] = None) -> None:
+    """
+    Answer 304 Not Modified if the client already has this version, otherwise
+    attach the ETag to the response about to be built.
+    With media_type (a negotiated representation) the ETag is that representation's and
+    both answers vary on Accept.
+    """
+    etag = make_etag(user_id, version, media_type or JSON_MEDIA_TYPE)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if media_type is not None:
+        headers["Vary"] = "Accept"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        # Starlette sends 304 without a body
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+
+async def read_data_version(db: AsyncSession, user_id: int) -> int:
+    """The user's data version (a primary key lookup); 401 if the user is gone."""
+    version = await db.scalar(select(User.data_version).filter(User.id == user_id))
+    if version is None:
+        invalidate_cached_user(user_id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    return version
+
+
+async def user_data_etag(request: Request, response: Response,
+                         current_user: CurrentUser = Depends(get_current_active_user),
+                         db: AsyncSession = Depends(get_read_db)) -> None:
+    """
+    Dependency for GET endpoints returning the current user's data: reads the user's data
+    version and answers 304 before the endpoint runs its queries when If-None-Match already
+    carries it. Uses the endpoint's read session, so the version comes from the same
+    database (replica or primary) as the data it tags.
+    """
+    check_not_modified(request, response, current_user.id, await read_data_version(db, current_user.id))
+
+
+async def negotiated_data_etag(request: Request, response: Response,
+                               current_user: CurrentUser = Depends(get_current_active_user),
+                               db: AsyncSession = Depends(get_read_db)) -> None:
+    """
+    user_data_etag for endpoints that also answer in the columnar representation: the ETag
+    is the one of the representation Accept selects, and the 304 varies on Accept too.
+    """
+    check_not_modified(request, response, current_user.id, await read_data_version(db, current_user.id),
+                       negotiated_media_type(request))
@@ -0,0 +1,66 @@
+"""
+Benchmark POST /transactions (one item per request) against POST /transactions/bulk.
+
+Runs the app in process against a throwaway SQLite database and prints the
+throughput of both paths as JSON.
+
+Usage:
+    python -m benchmarks.bench_bulk_create [items]
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.database import Base, get_async_db
+from app.main import app
+
+USER = {"email": "bench@example.com", "username": "bench", "password": "benchpass123"}
+ITEM = {"amount": 12.5, "description": "Coffee", "transaction_type": "expense"}
+
+
+def run(items: int = 1000) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        Base.metadata.create_all(bind=create_engine(f"sqlite:///{db_path}"))
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        session_factory = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with session_factory() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        try:
+            with TestClient(app) as client:
+                client.post("/api/v1/auth/register", json=USER)
+                token = client.post("/api/v1/auth/login", data={"username": USER["email"],
+                                                                 "password": USER["password"]}).json()["access_token"]
+                client.headers["Authorization"] = f"Bearer {token}"
+
+                start = time.perf_counter()
+                for _ in range(items):
+                    client.post("/api/v1/transactions", json=ITEM)
+                single = time.perf_counter() - start
+
+                start = time.perf_counter()
+                client.post("/api/v1/transactions/bulk", json={"items": [ITEM] * items})
+                bulk = time.perf_counter() - start
+        finally:
+            app.dependency_overrides.clear()
+
+    return {
+        "items": items,
+        "single": {"seconds": round(single, 3), "items_per_second": round(items / single)},
+        "bulk": {"seconds": round(bulk, 3), "items_per_second": round(items / bulk)},
+        "speedup": round(single / bulk, 1),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000), indent=2))
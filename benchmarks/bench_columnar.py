@@ -0,0 +1,98 @@
+"""
+Benchmark the columnar representation of GET /transactions against the JSON list:
+payload size (raw and gzip-compressed) and client parse time, measured as json.loads
+of the body plus turning it into per-transaction values a client would use.
+
+Seeds a throwaway SQLite database, renders one page in both representations the way the
+endpoint does, and prints the numbers as JSON.
+
+Usage:
+    python -m benchmarks.bench_columnar [page_size]
+"""
+import asyncio
+import gzip
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.category import Category
+from app.models.transaction import Transaction
+from app.routers.transactions import TRANSACTION_COLUMNAR_COLUMNS, TRANSACTION_LIST_COLUMNS, transaction_row
+from app.schemas.transaction import transaction_list_adapter
+from app.utils.columnar import transaction_columns
+from benchmarks.seed import seed
+
+ROUNDS = 50
+
+
+def page_query(columns, user_id: int, limit: int):
+    query = select(*columns)
+    if columns is TRANSACTION_LIST_COLUMNS:
+        query = query.outerjoin(Category, Category.id == Transaction.category_id)
+    return (query.filter(Transaction.user_id == user_id)
+            .order_by(Transaction.date.desc(), Transaction.id.desc()).limit(limit))
+
+
+def parse_json_list(body: bytes) -> list:
+    # Amounts come as decimal strings and dates as ISO strings
+    return [(item["id"], Decimal(item["amount"]), datetime.fromisoformat(item["date"]),
+             item["transaction_type"], item["category_id"]) for item in json.loads(body)]
+
+
+def parse_columnar(body: bytes) -> list:
+    columns = json.loads(body)
+    types = columns["transaction_types"]
+    return list(zip(columns["id"], columns["amount_minor"], columns["date"],
+                    (types[code] for code in columns["transaction_type"]), columns["category_id"]))
+
+
+def timed_us(function, body: bytes) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        function(body)
+    return round((time.perf_counter() - start) / ROUNDS * 1e6, 1)
+
+
+async def run_async(page_size: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        await seed(engine, users=1, categories_per_user=10, transactions_per_user=page_size)
+        try:
+            async with async_sessionmaker(bind=engine)() as db:
+                rows = (await db.execute(page_query(TRANSACTION_LIST_COLUMNS, 1, page_size))).all()
+                json_body = transaction_list_adapter.dump_json([transaction_row(row) for row in rows])
+                rows = (await db.execute(page_query(TRANSACTION_COLUMNAR_COLUMNS, 1, page_size))).all()
+                columnar_body = transaction_columns(rows).model_dump_json().encode()
+        finally:
+            await engine.dispose()
+
+    results = {}
+    for name, body, parse in (("json", json_body, parse_json_list), ("columnar", columnar_body, parse_columnar)):
+        results[name] = {
+            "bytes": len(body),
+            "gzip_bytes": len(gzip.compress(body)),
+            "parse_us": timed_us(parse, body),
+        }
+    before, after = results["json"], results["columnar"]
+    return {
+        "page_size": page_size,
+        **results,
+        "size_reduction": round(before["bytes"] / after["bytes"], 1),
+        "gzip_size_reduction": round(before["gzip_bytes"] / after["gzip_bytes"], 1),
+        "parse_speedup": round(before["parse_us"] / after["parse_us"], 1),
+    }
+
+
+def run(page_size: int = 500) -> dict:
+    return asyncio.run(run_async(page_size))
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(int(sys.argv[1]) if len(sys.argv) > 1 else 500), indent=2))
@@ -0,0 +1,103 @@
+"""
+Benchmark converting transactions to the user's currency: the in-memory rate table
+(RateTable.convert_many, one batch per partition) against one exchange_rates query per row.
+
+Seeds a throwaway SQLite database with a daily rate per currency for two years, converts
+the same random (amount, currency, day) rows both ways, checks they agree and prints the
+numbers as JSON.
+
+Usage:
+    python -m benchmarks.bench_currency [rows]
+"""
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.exchange_rate import ExchangeRate
+from app.services.currency_service import CENT, RateTable
+
+CURRENCIES = ["EUR", "GBP", "JPY", "CHF", "CAD", "AUD", "SEK", "NOK", "PLN", "MXN"]
+DAYS = 730
+FIRST_DAY = date(2024, 1, 1)
+
+
+def seed_rates() -> list[tuple[str, str, date, Decimal]]:
+    rng = random.Random(7)
+    return [
+        (currency, settings.exchange_rate_pivot, FIRST_DAY + timedelta(days=offset),
+         Decimal(rng.uniform(0.5, 1.5)).quantize(Decimal("0.00000001")))
+        for currency in CURRENCIES for offset in range(DAYS)
+    ]
+
+
+def seed_rows(count: int) -> list[tuple[Decimal, str, date]]:
+    rng = random.Random(11)
+    return [
+        (Decimal(rng.randint(100, 100000)) / 100, rng.choice(CURRENCIES), FIRST_DAY + timedelta(days=rng.randrange(DAYS)))
+        for _ in range(count)
+    ]
+
+
+def convert_per_row(db: Session, rows, quote: str) -> list[Decimal]:
+    converted = []
+    for amount, currency, day in rows:
+        rate = db.execute(
+            select(ExchangeRate.rate)
+            .filter(ExchangeRate.base == currency, ExchangeRate.quote == quote, ExchangeRate.date <= day)
+            .order_by(ExchangeRate.date.desc()).limit(1)
+        ).scalar_one()
+        converted.append((amount * rate).quantize(CENT))
+    return converted
+
+
+def run(rows: int = 5000) -> dict:
+    rates = seed_rates()
+    items = seed_rows(rows)
+    quote = settings.exchange_rate_pivot
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        ExchangeRate.__table__.create(engine)
+        try:
+            with Session(engine) as db:
+                db.execute(ExchangeRate.__table__.insert(),
+                           [{"base": base, "quote": q, "date": day, "rate": rate} for base, q, day, rate in rates])
+                db.commit()
+
+                start = time.perf_counter()
+                per_row = convert_per_row(db, items, quote)
+                per_row_seconds = time.perf_counter() - start
+
+                start = time.perf_counter()
+                table = RateTable(db.execute(
+                    select(ExchangeRate.base, ExchangeRate.quote, ExchangeRate.date, ExchangeRate.rate)
+                ).all())
+                load_seconds = time.perf_counter() - start
+                start = time.perf_counter()
+                batched = table.convert_many(items, quote)
+                batch_seconds = time.perf_counter() - start
+        finally:
+            engine.dispose()
+
+    assert batched == per_row
+    return {
+        "rows": rows,
+        "rates": len(rates),
+        "per_row_query_ms": round(per_row_seconds * 1000, 1),
+        "rate_table_load_ms": round(load_seconds * 1000, 1),
+        "batch_convert_ms": round(batch_seconds * 1000, 1),
+        "batch_rows_per_second": round(rows / batch_seconds),
+        "speedup": round(per_row_seconds / batch_seconds, 1),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000), indent=2))
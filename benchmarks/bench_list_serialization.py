@@ -0,0 +1,112 @@
+"""
+Benchmark serializing a page of GET /transactions: ORM objects validated into
+TransactionResponse and JSON-encoded (FastAPI's response_model path) against plain
+rows dumped to JSON bytes by transaction_list_adapter (the list fast path).
+
+Seeds a throwaway SQLite database, then times each path with and without the query,
+and prints the cost per row as JSON.
+
+Usage:
+    python -m benchmarks.bench_list_serialization [page_size]
+"""
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from app.models.category import Category
+from app.models.transaction import Transaction
+from app.routers.transactions import TRANSACTION_LIST_COLUMNS, transaction_row
+from app.schemas.transaction import TransactionResponse, transaction_list_adapter
+from benchmarks.seed import seed
+
+ROUNDS = 20
+response_model_adapter = TypeAdapter(list[TransactionResponse])
+
+
+def orm_query(user_id: int, limit: int):
+    return (select(Transaction).options(selectinload(Transaction.category))
+            .filter(Transaction.user_id == user_id)
+            .order_by(Transaction.date.desc(), Transaction.id.desc()).limit(limit))
+
+
+def rows_query(user_id: int, limit: int):
+    return (select(*TRANSACTION_LIST_COLUMNS)
+            .outerjoin(Category, Category.id == Transaction.category_id)
+            .filter(Transaction.user_id == user_id)
+            .order_by(Transaction.date.desc(), Transaction.id.desc()).limit(limit))
+
+
+def response_model_json(transactions) -> bytes:
+    # What FastAPI does with a response_model: validate, dump to JSON-able Python, json.dumps
+    content = response_model_adapter.dump_python(
+        response_model_adapter.validate_python(transactions, from_attributes=True), mode="json"
+    )
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def fast_path_json(rows) -> bytes:
+    return transaction_list_adapter.dump_json([transaction_row(row) for row in rows])
+
+
+def per_row_us(seconds: float, rows: int) -> float:
+    return round(seconds / ROUNDS / rows * 1e6, 2)
+
+
+async def run_async(page_size: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        await seed(engine, users=1, categories_per_user=10, transactions_per_user=page_size * 4)
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        results = {}
+        try:
+            for name, query, serialize in (
+                ("response_model", orm_query(1, page_size), response_model_json),
+                ("fast_path", rows_query(1, page_size), fast_path_json),
+            ):
+                async with session_factory() as db:
+                    fetch = db.scalars if name == "response_model" else db.execute
+                    data = (await fetch(query)).all()
+                    assert serialize(data) == response_model_json((await db.scalars(orm_query(1, page_size))).all())
+
+                    start = time.perf_counter()
+                    for _ in range(ROUNDS):
+                        serialize(data)
+                    serialize_seconds = time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    for _ in range(ROUNDS):
+                        db.expunge_all()
+                        serialize((await fetch(query)).all())
+                    total_seconds = time.perf_counter() - start
+                results[name] = {
+                    "serialize_us_per_row": per_row_us(serialize_seconds, len(data)),
+                    "query_and_serialize_us_per_row": per_row_us(total_seconds, len(data)),
+                }
+        finally:
+            await engine.dispose()
+
+    before, after = results["response_model"], results["fast_path"]
+    return {
+        "page_size": page_size,
+        **results,
+        "serialize_speedup": round(before["serialize_us_per_row"] / after["serialize_us_per_row"], 1),
+        "query_and_serialize_speedup": round(
+            before["query_and_serialize_us_per_row"] / after["query_and_serialize_us_per_row"], 1
+        ),
+    }
+
+
+def run(page_size: int = 500) -> dict:
+    return asyncio.run(run_async(page_size))
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(int(sys.argv[1]) if len(sys.argv) > 1 else 500), indent=2))
@@ -0,0 +1,74 @@
+"""
+Benchmark the recurring-transaction scheduler catching up on many due templates.
+
+Seeds a throwaway SQLite database with templates that each have one occurrence due
+today, then times loading the due queue and materializing everything, and prints
+the result as JSON.
+
+Usage:
+    python -m benchmarks.bench_recurring [templates]
+"""
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.database import Base
+from app.models.recurring_transaction import RecurrenceFrequency, RecurringTransaction
+from app.models.transaction import Transaction, TransactionType
+from app.models.user import User
+from app.services.recurring_service import RecurringScheduler
+
+USERS = 100
+
+
+def seed(db_path: Path, templates: int, today: date) -> None:
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"email": f"bench{i}@example.com", "username": f"bench{i}", "hashed_password": "x"}
+            for i in range(USERS)
+        ])
+        conn.execute(insert(RecurringTransaction), [
+            {"user_id": i % USERS + 1, "amount": 10, "description": "Subscription",
+             "transaction_type": TransactionType.EXPENSE, "frequency": RecurrenceFrequency.MONTHLY,
+             "start_date": today, "next_occurrence_date": today}
+            for i in range(templates)
+        ])
+    engine.dispose()
+
+
+async def materialize(db_path: Path, today: date) -> dict:
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    scheduler = RecurringScheduler(async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False))
+    try:
+        start = time.perf_counter()
+        await scheduler.load()
+        loaded = time.perf_counter() - start
+        processed = await scheduler.run_once(today)
+        total = time.perf_counter() - start
+        async with async_engine.connect() as conn:
+            created = await conn.scalar(select(func.count(Transaction.id)))
+    finally:
+        await async_engine.dispose()
+    return {"processed": processed, "created": created, "load_seconds": round(loaded, 3),
+            "total_seconds": round(total, 3), "templates_per_second": round(processed / total)}
+
+
+def run(templates: int = 100_000) -> dict:
+    today = date.today()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        seed(db_path, templates, today)
+        return {"templates": templates, **asyncio.run(materialize(db_path, today))}
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000), indent=2))
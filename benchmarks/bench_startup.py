@@ -0,0 +1,78 @@
+"""
+Benchmark cold start: a fresh interpreter importing the app and running its lifespan until
+/ready would answer 200 (schema revision check, pool prewarm, schema precompilation), against
+a throwaway SQLite database stamped at the Alembic head. Also times Base.metadata.create_all
+on the same database, the reflection the app used to do on every boot.
+
+Each round runs in a new subprocess so nothing is already imported or cached.
+
+Usage:
+    python -m benchmarks.bench_startup [rounds]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Runs in the subprocess: prints the phases of one cold start as JSON
+COLD_START = """
+import asyncio, json, time
+start = time.perf_counter()
+from app.main import app, lifespan
+imported = time.perf_counter()
+
+async def main():
+    async with lifespan(app):
+        assert app.state.ready
+        ready = time.perf_counter()
+        from app.database import Base, async_engine
+        async with async_engine.begin() as conn:
+            create_all_start = time.perf_counter()
+            await conn.run_sync(Base.metadata.create_all)
+            create_all = time.perf_counter() - create_all_start
+    return ready, create_all
+
+ready, create_all = asyncio.run(main())
+print(json.dumps({"import_ms": (imported - start) * 1000, "lifespan_ms": (ready - imported) * 1000,
+                  "cold_start_ms": (ready - start) * 1000, "create_all_ms": create_all * 1000}))
+"""
+
+# Builds the database once: tables from the models, stamped at the head revision
+SETUP = """
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from app.database import Base, engine
+from app.utils.startup import ALEMBIC_INI
+
+Base.metadata.create_all(engine)
+with engine.begin() as conn:
+    MigrationContext.configure(conn).stamp(ScriptDirectory.from_config(Config(str(ALEMBIC_INI))), "head")
+"""
+
+
+def python(code: str, env: dict) -> str:
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True,
+                          capture_output=True, text=True).stdout
+
+
+def run(rounds: int = 5) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{Path(tmp) / 'startup.db'}",
+               "SECRET_KEY": os.environ.get("SECRET_KEY", "bench-secret"),
+               "RECURRING_SCHEDULER_ENABLED": "false", "ASYNC_DATABASE_URL": ""}
+        python(SETUP, env)
+        samples = [json.loads(python(COLD_START, env)) for _ in range(rounds)]
+    return {
+        "rounds": rounds,
+        **{phase: round(statistics.median(sample[phase] for sample in samples), 1) for phase in samples[0]},
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(int(sys.argv[1]) if len(sys.argv) > 1 else 5), indent=2))
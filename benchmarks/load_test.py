@@ -0,0 +1,301 @@
+"""
+In-process load test of the API.
+
+Drives the real app.main:app through httpx.AsyncClient(transport=ASGITransport) with
+concurrent virtual users, each logged in as one seeded user and sending a weighted
+mix of requests (login, list, create, update, delete). Prints the throughput and
+p50/p95/p99 latency of every route as JSON; save it with --output and pass it back
+with --baseline on a later run to flag regressions.
+
+Without --database-url, a throwaway SQLite database is seeded first (see
+benchmarks.seed); with it, an already seeded database is used as is (--seed to seed it).
+
+Usage:
+    python -m benchmarks.load_test [--requests N | --duration SECONDS] [--concurrency N]
+                                   [--mix login=1,list=60,create=20,update=12,delete=7]
+                                   [--users N] [--transactions-per-user N]
+                                   [--database-url URL [--seed]] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.database import get_async_db
+from app.main import app
+from benchmarks.seed import PASSWORD, seed, user_email
+
+API = settings.api_v1_str
+DEFAULT_MIX = {"login": 1, "list": 60, "create": 20, "update": 12, "delete": 7}
+ROUTES = {
+    "login": f"POST {API}/auth/login",
+    "list": f"GET {API}/transactions",
+    "create": f"POST {API}/transactions",
+    "update": f"PUT {API}/transactions/{{id}}",
+    "delete": f"DELETE {API}/transactions/{{id}}",
+}
+PAGE_SIZE = 50
+# Created transaction ids a virtual user remembers for updates and deletes
+KNOWN_IDS_MAX = 1000
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Parse "login=1,list=60,..." into weights; operations left out get weight 0."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ROUTES:
+            raise ValueError(f"Unknown operation {name!r} (expected one of {', '.join(ROUTES)})")
+        mix[name] = int(weight)
+    if not any(mix.values()):
+        raise ValueError("The mix needs at least one operation with a positive weight")
+    return mix
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)]
+
+
+class Recorder:
+    """Latency samples and status codes per route."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, operation: str, seconds: float, status_code: int) -> None:
+        self.latencies[operation].append(seconds)
+        self.statuses[operation][status_code] += 1
+
+    def report(self, seconds: float) -> dict:
+        routes = {}
+        for operation in ROUTES:
+            samples = sorted(self.latencies.get(operation, []))
+            if not samples:
+                continue
+            statuses = self.statuses[operation]
+            routes[ROUTES[operation]] = {
+                "requests": len(samples),
+                "errors": sum(count for status_code, count in statuses.items() if status_code >= 400),
+                "statuses": {str(status_code): count for status_code, count in sorted(statuses.items())},
+                "throughput_rps": round(len(samples) / seconds, 1),
+                "latency_ms": {
+                    "mean": round(sum(samples) / len(samples) * 1000, 2),
+                    "p50": round(percentile(samples, 50) * 1000, 2),
+                    "p95": round(percentile(samples, 95) * 1000, 2),
+                    "p99": round(percentile(samples, 99) * 1000, 2),
+                    "max": round(samples[-1] * 1000, 2),
+                },
+            }
+        total = sum(route["requests"] for route in routes.values())
+        return {
+            "seconds": round(seconds, 3),
+            "requests": total,
+            "errors": sum(route["errors"] for route in routes.values()),
+            "throughput_rps": round(total / seconds, 1) if seconds else 0.0,
+            "routes": routes,
+        }
+
+
+class VirtualUser:
+    """One logged-in client sending the request mix as fast as the app answers."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, email: str, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.email = email
+        self.rng = rng
+        self.headers: dict[str, str] = {}
+        # Ids of the last list page (seeded data) and ids created by this client
+        self.seen_ids: list[int] = []
+        self.created_ids: list[int] = []
+
+    async def request(self, operation: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        self.recorder.record(operation, time.perf_counter() - start, response.status_code)
+        return response
+
+    def pick_id(self, pop: bool = False) -> Optional[int]:
+        """A transaction to update or delete: one created by this client first, else a seeded one."""
+        for ids in (self.created_ids, self.seen_ids):
+            if ids:
+                index = self.rng.randrange(len(ids))
+                return ids.pop(index) if pop else ids[index]
+        return None
+
+    async def login(self) -> None:
+        response = await self.request("login", "POST", f"{API}/auth/login",
+                                      data={"username": self.email, "password": PASSWORD})
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def list(self) -> None:
+        response = await self.request("list", "GET", f"{API}/transactions", params={"limit": PAGE_SIZE})
+        if response.status_code == 200:
+            self.seen_ids = [item["id"] for item in response.json()]
+
+    async def create(self) -> None:
+        response = await self.request("create", "POST", f"{API}/transactions", json={
+            "amount": str(self.rng.randint(100, 20000) / 100),
+            "description": "Load test purchase",
+            "transaction_type": "expense",
+        })
+        if response.status_code == 201:
+            self.created_ids.append(response.json()["id"])
+            if len(self.created_ids) > KNOWN_IDS_MAX:
+                del self.created_ids[0]
+
+    async def update(self) -> None:
+        transaction_id = self.pick_id()
+        if transaction_id is None:
+            return await self.create()
+        await self.request("update", "PUT", f"{API}/transactions/{transaction_id}",
+                           json={"amount": str(self.rng.randint(100, 20000) / 100)})
+
+    async def delete(self) -> None:
+        transaction_id = self.pick_id(pop=True)
+        if transaction_id is None:
+            return await self.create()
+        await self.request("delete", "DELETE", f"{API}/transactions/{transaction_id}")
+
+
+async def drive(engine: AsyncEngine, users: int, concurrency: int, mix: dict[str, int],
+                requests: Optional[int], duration: Optional[float], random_seed: int) -> dict:
+    """Run the virtual users against the app (bound to engine) and return the report."""
+    session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    operations = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in operations]
+    recorder = Recorder()
+    remaining = requests
+    deadline = None
+
+    def keep_going() -> bool:
+        nonlocal remaining
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        if remaining is not None:
+            if remaining <= 0:
+                return False
+            remaining -= 1
+        return True
+
+    async def run_user(index: int) -> None:
+        user = VirtualUser(client, recorder, user_email("bench", index % users), random.Random(random_seed + index))
+        await user.login()
+        while keep_going():
+            await getattr(user, user.rng.choices(operations, weights)[0])()
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        # One connection per virtual user at most; the app's lifespan (scheduler, create_all) is not run
+        limits = httpx.Limits(max_connections=None)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest",
+                                     limits=limits, timeout=None) as client:
+            start = time.perf_counter()
+            if duration is not None:
+                deadline = start + duration
+            await asyncio.gather(*(run_user(index) for index in range(concurrency)))
+            seconds = time.perf_counter() - start
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+    return recorder.report(seconds)
+
+
+async def run(requests: Optional[int] = 2000, duration: Optional[float] = None, concurrency: int = 10,
+              mix: Optional[dict[str, int]] = None, users: int = 10, transactions_per_user: int = 1000,
+              database_url: Optional[str] = None, seed_database: bool = False, random_seed: int = 42) -> dict:
+    """
+    Seed (a throwaway SQLite database unless database_url is given) and load test.
+    Stops after requests requests or duration seconds, whichever comes first.
+    """
+    mix = mix or DEFAULT_MIX
+    config = {"requests": requests, "duration": duration, "concurrency": concurrency, "mix": mix,
+              "users": users, "transactions_per_user": transactions_per_user, "random_seed": random_seed}
+    with tempfile.TemporaryDirectory() as tmp:
+        url = database_url or f"sqlite+aiosqlite:///{Path(tmp) / 'load_test.db'}"
+        engine = create_async_engine(url)
+        try:
+            seeded = None
+            if database_url is None or seed_database:
+                seeded = await seed(engine, users=users, transactions_per_user=transactions_per_user,
+                                    seed=random_seed)
+            report = await drive(engine, users, concurrency, mix, requests, duration, random_seed)
+        finally:
+            await engine.dispose()
+    return {"config": config, "seeded": seeded, **report}
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.2) -> list[str]:
+    """
+    Regressions of current against baseline: routes whose p95 latency grew, or whose
+    throughput dropped, by more than tolerance (a fraction).
+    """
+    regressions = []
+    for route, before in baseline["routes"].items():
+        after = current["routes"].get(route)
+        if after is None:
+            continue
+        p95_before, p95_after = before["latency_ms"]["p95"], after["latency_ms"]["p95"]
+        if p95_before and p95_after > p95_before * (1 + tolerance):
+            regressions.append(f"{route}: p95 {p95_before} ms -> {p95_after} ms")
+        rps_before, rps_after = before["throughput_rps"], after["throughput_rps"]
+        if rps_before and rps_after < rps_before * (1 - tolerance):
+            regressions.append(f"{route}: throughput {rps_before} -> {rps_after} req/s")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="In-process load test of the API.")
+    parser.add_argument("--requests", type=int, default=None, help="total requests (default 2000)")
+    parser.add_argument("--duration", type=float, default=None, help="run for this many seconds instead")
+    parser.add_argument("--concurrency", type=int, default=10, help="virtual users sending requests at once")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="operation weights, e.g. login=1,list=60,create=20,update=12,delete=7")
+    parser.add_argument("--users", type=int, default=10, help="seeded users the virtual users log in as")
+    parser.add_argument("--transactions-per-user", type=int, default=1000)
+    parser.add_argument("--database-url", default=None, help="async URL of an already seeded database")
+    parser.add_argument("--seed", action="store_true", help="seed --database-url before the run")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None, help="also write the report to this file")
+    parser.add_argument("--baseline", type=Path, default=None, help="report of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression against the baseline")
+    args = parser.parse_args()
+
+    requests = args.requests if args.requests is not None or args.duration is not None else 2000
+    report = asyncio.run(run(requests, args.duration, args.concurrency, args.mix, args.users,
+                             args.transactions_per_user, args.database_url, args.seed, args.random_seed))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output is not None:
+        args.output.write_text(output)
+    if args.baseline is not None:
+        regressions = compare(json.loads(args.baseline.read_text()), report, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,31 +4,52 @@
 Test configuration and fixtures for Personal Finance Tracker API.
 
 This module provides shared pytest fixtures for testing:
-- test_db: In-memory SQLite database for isolated tests
+- test_db: Fresh SQLite database (sync session) for isolated tests
+- override_async_db: Points the app's async session dependency at test_db's database
 - client: FastAPI test client with database override
 - test_user_data: Sample user credentials
 - authenticated_client: Pre-authenticated client for protected endpoints
 """
 
+import os
+# Tests drive the recurring scheduler by hand; keep the app from starting it on every TestClient
+os.environ.setdefault("RECURRING_SCHEDULER_ENABLED", "false")
+# Fail any request that repeats one statement shape (N+1 queries)
+os.environ.setdefault("SQL_STRICT_MODE", "true")
+# Test databases are built with create_all, not migrated (tests/test_startup.py covers the check)
+os.environ.setdefault("SCHEMA_CHECK_ENABLED", "false")
+
+import re
 import pytest
-from sqlalchemy import create_engine, inspect
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 from app.models.user import User
-from app.database import Base, get_db
+from app.database import Base, get_async_db
 from app.main import app
+from app.utils.dependencies import user_cache
+from app.services.category_service import category_cache
+from app.services.currency_service import invalidate_rate_table
+from app.utils.query_stats import instrument_engine
 from fastapi.testclient import TestClient
 
 
 
 
 @pytest.fixture
-def test_db():
-    """Create a fresh in-memory SQLite database for each test."""
+def test_db_path(tmp_path):
+    """SQLite file shared by the sync test session and the app's async sessions."""
+    return tmp_path / "test.db"
+
+
+@pytest.fixture
+def test_db(test_db_path):
+    """Create a fresh SQLite database for each test."""
     engine = create_engine(
-        "sqlite:///:memory:",
+        f"sqlite:///{test_db_path}",
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,  # Use static pool for in-memory DB
     )
     
     # Create all tables
@@ -42,23 +63,84 @@ def test_db():
     finally:
         db.close()
         Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+@pytest.fixture
+def test_async_engine(test_db, test_db_path):
+    """Async engine on the test database, used by the app during tests."""
+    # NullPool: TestClient may run each request on a new event loop, so never reuse a connection
+    engine = create_async_engine(f"sqlite+aiosqlite:///{test_db_path}", poolclass=NullPool)
+    # Same per-request SQL tracking as the app's engine (Server-Timing, strict mode)
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+@pytest.fixture
+def override_async_db(test_async_engine):
+    """Point the app's get_async_db dependency at the test database."""
+    async_engine = test_async_engine
+    TestAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    
+    async def override_get_async_db():
+        async with TestAsyncSessionLocal() as db:
+            yield db
+    
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    # Every test starts with a new database, so cached users from older tests are stale
+    user_cache.clear()
+    category_cache.clear()
+    invalidate_rate_table()
+    yield
+    app.dependency_overrides.clear()
 
 
 @pytest.fixture()
-def client(test_db):
+def client(override_async_db):
     """Create a FastAPI test client with test database."""
-    def override_get_db():
-        try:
-            yield test_db
-        finally:
-            pass
-        
-    app.dependency_overrides[get_db] = override_get_db
-    
     with TestClient(app) as test_client:
         yield test_client
-    
-    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def count_queries(test_async_engine):
+    """
+    Record the SQL statements the app runs, to pin query counts per endpoint:
+        with count_queries() as queries:
+            client.get(...)
+        assert len(queries) == 2
+    """
+    @contextmanager
+    def _count_queries():
+        statements = []
+        
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(test_async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(test_async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return _count_queries
+
+
+def db_queries(response) -> int:
+    """Statements the request ran, read from its Server-Timing header."""
+    return int(re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', response.headers["server-timing"]).group(1))
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Assert an endpoint stays within its query budget:
+        query_budget(client.get(...), 2)
+    """
+    def _query_budget(response, max_queries: int):
+        queries = db_queries(response)
+        assert queries <= max_queries, f"{response.request.method} {response.request.url.path} ran {queries} queries (budget {max_queries})"
+        return response
+    return _query_budget
 
 
 @pytest.fixture()
@@ -71,11 +153,9 @@ def test_user_data():
     }
 
 
-def create_authenticated_client(user_data, test_db):
+def create_authenticated_client(user_data):
     """Helper to spawn a new client and log in a specific user."""
     new_client = TestClient(app)
-    # Override DB for this specific client instance
-    app.dependency_overrides[get_db] = lambda: test_db
     
     # Register and Login
     new_client.post("/api/v1/auth/register", json=user_data)
@@ -89,17 +169,17 @@ def create_authenticated_client(user_data, test_db):
     return new_client
 
 @pytest.fixture
-def authenticated_client(test_db, test_user_data):
-    yield create_authenticated_client(test_user_data, test_db)
+def authenticated_client(override_async_db, test_user_data):
+    yield create_authenticated_client(test_user_data)
 
 @pytest.fixture
-def second_authenticated_client(test_db):
+def second_authenticated_client(override_async_db):
     user2_data = {
         "email": "other@example.com", 
         "username": "otheruser", 
         "password": "password123"
     }
-    yield create_authenticated_client(user2_data, test_db)
+    yield create_authenticated_client(user2_data)
 
 @pytest.fixture()
 def test_transaction_data():
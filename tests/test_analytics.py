@@ -0,0 +1,192 @@
+def test_spending_by_category(authenticated_client, second_authenticated_client, test_transaction_data):
+    """Test expenses are summed per category and income is left out"""
+    food = authenticated_client.post("/api/v1/categories", json={"name": "Food"}).json()
+    for amount in (10, 15.5):
+        authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, amount=amount, category_id=food["id"]))
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, amount=4))
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, amount=1000, transaction_type="income"))
+    second_authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, amount=99))
+
+    response = authenticated_client.get("/api/v1/analytics/spending")
+    assert response.status_code == 200
+    data = response.json()
+    assert float(data["total"]) == 29.5
+    assert [(c["category_name"], float(c["total"]), c["count"]) for c in data["categories"]] == [
+        ("Food", 25.5, 2),
+        (None, 4.0, 1),
+    ]
+
+
+def test_income_vs_expense_date_range(authenticated_client, test_transaction_data):
+    """Test income vs expense totals only count transactions inside the date range"""
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, amount=300, transaction_type="income", date="2024-05-01"))
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, amount=120, date="2024-05-02"))
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, amount=50, date="2024-06-02"))
+
+    response = authenticated_client.get("/api/v1/analytics/income-vs-expense",
+                                        params={"from": "2024-05-01", "to": "2024-05-31"})
+    data = response.json()
+    assert float(data["income"]) == 300
+    assert float(data["expense"]) == 120
+    assert float(data["net"]) == 180
+    assert data["expense_count"] == 1
+
+
+def test_income_vs_expense_no_transactions(authenticated_client):
+    """Test totals are zero for a user without transactions"""
+    data = authenticated_client.get("/api/v1/analytics/income-vs-expense").json()
+    assert float(data["net"]) == 0
+    assert data["income_count"] == 0
+
+
+def rollup_rows(test_db):
+    """Non-empty rollup rows as comparable tuples"""
+    from app.models.transaction_rollup import TransactionRollup
+    test_db.expire_all()
+    return sorted(
+        (r.user_id, r.granularity.value, str(r.period), r.category_id, r.transaction_type.value, float(r.total), r.count)
+        for r in test_db.query(TransactionRollup).all() if r.count
+    )
+
+
+def rebuild(test_async_engine):
+    import asyncio
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from app.services.rollup_service import rebuild_rollups
+
+    async def _rebuild():
+        async with AsyncSession(test_async_engine) as db:
+            await rebuild_rollups(db)
+    asyncio.run(_rebuild())
+
+
+def test_rollups_match_rebuild_after_writes(authenticated_client, test_transaction_data, test_db, test_async_engine):
+    """Test incrementally maintained rollups equal a full rebuild after every kind of write"""
+    rent = authenticated_client.post("/api/v1/categories", json={"name": "Rent"}).json()
+    food = authenticated_client.post("/api/v1/categories", json={"name": "Food"}).json()
+    t1 = authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-01-05", category_id=rent["id"])).json()
+    t2 = authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-01-20", amount=30)).json()
+    authenticated_client.post("/api/v1/transactions/bulk", json={"items": [
+        dict(test_transaction_data, date="2024-02-01", amount=5, category_id=food["id"]),
+        dict(test_transaction_data, date="2024-02-01", amount=7, transaction_type="income"),
+    ]})
+    authenticated_client.put(f"/api/v1/transactions/{t1['id']}", json={"amount": 250, "category_id": food["id"]})
+    authenticated_client.put(f"/api/v1/transactions/{t2['id']}", json={"transaction_type": "income"})
+    authenticated_client.delete(f"/api/v1/categories/{food['id']}")
+    t3 = authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-03-03")).json()
+    authenticated_client.delete(f"/api/v1/transactions/{t3['id']}")
+
+    incremental = rollup_rows(test_db)
+    assert incremental
+    rebuild(test_async_engine)
+    assert rollup_rows(test_db) == incremental
+
+
+
+def test_rollups_use_the_utc_day(authenticated_client, test_transaction_data, test_db, test_async_engine):
+    """Test a transaction with a non-UTC offset across midnight is rolled up on its UTC day, like the timeseries"""
+    created = authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, amount=50,
+                                                                            date="2024-01-01T02:00:00+05:00")).json()
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, amount=10,
+                                                                 date="2024-01-31T23:30:00-02:00"))
+    authenticated_client.put(f"/api/v1/transactions/{created['id']}", json={"amount": 60})
+
+    summary = authenticated_client.get("/api/v1/analytics/summary", params={"granularity": "day"}).json()
+    assert [(p["period"], float(p["expense"])) for p in summary] == [("2023-12-31", 60), ("2024-02-01", 10)]
+    timeseries = authenticated_client.get("/api/v1/analytics/timeseries",
+                                          params={"bucket": "day", "from": "2023-12-31", "to": "2024-02-01"}).json()
+    assert [(p["period"], float(p["expense"])) for p in timeseries if float(p["expense"])] == [
+        ("2023-12-31", 60), ("2024-02-01", 10),
+    ]
+    incremental = rollup_rows(test_db)
+    rebuild(test_async_engine)
+    assert rollup_rows(test_db) == incremental
+
+    authenticated_client.delete(f"/api/v1/transactions/{created['id']}")
+    summary = authenticated_client.get("/api/v1/analytics/summary", params={"granularity": "month"}).json()
+    assert [(p["period"], float(p["expense"])) for p in summary if float(p["expense"])] == [("2024-02-01", 10)]
+
+def test_monthly_summary(authenticated_client, test_transaction_data):
+    """Test the summary endpoint returns per-month totals from the rollups"""
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-01-05", amount=40))
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-01-25", amount=500, transaction_type="income"))
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-02-10", amount=60))
+
+    response = authenticated_client.get("/api/v1/analytics/summary", params={"granularity": "month"})
+    assert response.status_code == 200
+    assert [(p["period"], float(p["income"]), float(p["expense"]), float(p["net"])) for p in response.json()] == [
+        ("2024-01-01", 500, 40, 460),
+        ("2024-02-01", 0, 60, -60),
+    ]
+
+
+def test_summary_columnar(authenticated_client, test_transaction_data):
+    """Test the summary series comes as parallel arrays (epoch periods, minor units) with the columnar Accept"""
+    from app.utils.columnar import COLUMNAR_MEDIA_TYPE
+
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-01-05", amount=40.25))
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-02-10", amount=500, transaction_type="income"))
+
+    response = authenticated_client.get("/api/v1/analytics/summary", params={"granularity": "month"},
+                                        headers={"Accept": COLUMNAR_MEDIA_TYPE})
+    assert response.headers["content-type"] == COLUMNAR_MEDIA_TYPE
+    assert response.json() == {
+        "count": 2,
+        "amount_scale": 2,
+        "period": [1704067200000, 1706745600000],
+        "income_minor": [0, 50000],
+        "expense_minor": [4025, 0],
+        "net_minor": [-4025, 50000],
+    }
+
+
+def test_timeseries_fills_gaps(authenticated_client, test_transaction_data):
+    """Test every bucket of the range comes back, empty ones with zeros, weeks starting on Monday"""
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-03-04T10:00:00", amount=30))
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-03-10T23:00:00", amount=20))
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-03-20", amount=500, transaction_type="income"))
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-05-01", amount=99))
+
+    response = authenticated_client.get("/api/v1/analytics/timeseries",
+                                        params={"bucket": "week", "from": "2024-03-06", "to": "2024-03-27"})
+    assert response.status_code == 200
+    assert [(p["period"], float(p["income"]), float(p["expense"]), float(p["net"])) for p in response.json()] == [
+        ("2024-03-04", 0, 50, -50),
+        ("2024-03-11", 0, 0, 0),
+        ("2024-03-18", 500, 0, 500),
+        ("2024-03-25", 0, 0, 0),
+    ]
+
+    days = authenticated_client.get("/api/v1/analytics/timeseries",
+                                    params={"bucket": "day", "from": "2024-03-01", "to": "2024-03-31"}).json()
+    assert len(days) == 31
+    assert [(p["period"], float(p["expense"])) for p in days if float(p["expense"])] == [("2024-03-04", 30), ("2024-03-10", 20)]
+
+    months = authenticated_client.get("/api/v1/analytics/timeseries",
+                                      params={"bucket": "month", "from": "2024-01-15", "to": "2024-05-15"}).json()
+    assert [(p["period"], float(p["net"])) for p in months] == [
+        ("2024-01-01", 0), ("2024-02-01", 0), ("2024-03-01", 450), ("2024-04-01", 0), ("2024-05-01", -99),
+    ]
+
+
+def test_timeseries_two_years_daily(authenticated_client, test_transaction_data, query_budget):
+    """Test a two-year daily series is one request and one query, and oversized ranges are refused"""
+    from app.utils.columnar import COLUMNAR_MEDIA_TYPE
+
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2023-01-01", amount=5))
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-12-31", amount=7))
+
+    response = query_budget(authenticated_client.get("/api/v1/analytics/timeseries",
+                                                     params={"from": "2023-01-01", "to": "2024-12-31"},
+                                                     headers={"Accept": COLUMNAR_MEDIA_TYPE}), 2)
+    columns = response.json()
+    assert columns["count"] == 731
+    assert columns["expense_minor"][0] == 500
+    assert columns["expense_minor"][-1] == 700
+    assert sum(columns["expense_minor"]) == 1200
+
+    response = authenticated_client.get("/api/v1/analytics/timeseries", params={"from": "2020-01-01", "to": "2024-12-31"})
+    assert response.status_code == 422
+    response = authenticated_client.get("/api/v1/analytics/timeseries", params={"from": "2024-02-01", "to": "2024-01-01"})
+    assert response.status_code == 422
+    assert authenticated_client.get("/api/v1/analytics/timeseries", params={"bucket": "year"}).status_code == 422
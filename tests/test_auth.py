@@ -82,4 +82,59 @@ def test_delete_user(authenticated_client):
     response = authenticated_client.delete("/api/v1/users/me")
     
     assert response.status_code == 200
-    assert "deleted" in response.json()["message"].lower()
\ No newline at end of file
+    assert "deleted" in response.json()["message"].lower()
+
+def test_refresh_token(authenticated_client):
+    """Test refreshing the access token of a logged in user"""
+    response = authenticated_client.post("/api/v1/auth/refresh")
+    assert response.status_code == 200
+    assert "access_token" in response.json()
+
+
+def test_login_rehashes_outdated_password(client, test_user_data, test_db):
+    """Test logging in upgrades a hash made with old Argon2 parameters"""
+    from passlib.context import CryptContext
+    from app.models.user import User
+    client.post("/api/v1/auth/register", json=test_user_data)
+    old_context = CryptContext(schemes=["argon2"], argon2__time_cost=1)
+    user = test_db.query(User).filter(User.email == test_user_data["email"]).first()
+    user.hashed_password = old_context.hash(test_user_data["password"])
+    test_db.commit()
+
+    response = client.post("/api/v1/auth/login", data={"username": test_user_data["email"],
+            "password": test_user_data["password"]})
+    assert response.status_code == 200
+    test_db.refresh(user)
+    assert "t=1," not in user.hashed_password
+
+
+def test_login_busy_password_pool(client, test_user_data, monkeypatch):
+    """Test login answers 503 when the password pool queue is full"""
+    from app.config import settings
+    client.post("/api/v1/auth/register", json=test_user_data)
+    monkeypatch.setattr(settings, "password_hash_max_pending", 0)
+    response = client.post("/api/v1/auth/login", data={"username": test_user_data["email"],
+            "password": test_user_data["password"]})
+    assert response.status_code == 503
+
+
+def test_decode_access_token_uses_cache():
+    """Test a verified token is served from the token cache on reuse"""
+    from app.utils.security import create_access_token, decode_access_token, token_cache
+    token = create_access_token({"sub": "42"})
+    assert decode_access_token(token)["sub"] == "42"
+    hits_before = token_cache.hits
+    assert decode_access_token(token)["sub"] == "42"
+    assert token_cache.hits == hits_before + 1
+
+
+def test_decode_access_token_expired_not_served_from_cache(monkeypatch):
+    """Test a cached token is rejected once its exp has passed"""
+    import time
+    from datetime import timedelta
+    from app.utils import security
+    token = security.create_access_token({"sub": "42"}, expires_delta=timedelta(minutes=5))
+    assert security.decode_access_token(token) is not None
+    later = time.time() + 600
+    monkeypatch.setattr(security.time, "time", lambda: later)
+    assert security.decode_access_token(token) is None
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+
+def test_percentile_nearest_rank():
+    """Test percentiles pick the nearest-rank sample"""
+    from benchmarks.load_test import percentile
+
+    samples = [float(value) for value in range(1, 101)]
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 95) == 95
+    assert percentile(samples, 99) == 99
+    assert percentile([7.0], 99) == 7
+    assert percentile([], 50) == 0
+
+
+def test_parse_mix():
+    """Test the request mix option parses weights and rejects unknown operations"""
+    from benchmarks.load_test import parse_mix
+
+    assert parse_mix("list=3, create=1") == {"list": 3, "create": 1}
+    with pytest.raises(ValueError):
+        parse_mix("list=1,fetch=2")
+    with pytest.raises(ValueError):
+        parse_mix("list=0")
+
+
+def test_compare_flags_regressions():
+    """Test a slower p95 or a lower throughput than the baseline is reported"""
+    from benchmarks.load_test import compare
+
+    def report(p95, rps):
+        return {"routes": {"GET /x": {"latency_ms": {"p95": p95}, "throughput_rps": rps}}}
+
+    assert compare(report(10, 100), report(11, 95)) == []
+    assert len(compare(report(10, 100), report(15, 100))) == 1
+    assert len(compare(report(10, 100), report(10, 50))) == 1
+
+
+def test_seed_and_load_test(override_async_db, test_async_engine, test_db):
+    """Test the seeder fills users, categories, transactions and rollups, and the load test runs on it"""
+    from app.models.transaction import Transaction
+    from app.models.transaction_rollup import RollupGranularity, TransactionRollup
+    from benchmarks.load_test import drive
+    from benchmarks.seed import seed
+
+    seeded = asyncio.run(seed(test_async_engine, users=2, categories_per_user=3, transactions_per_user=50,
+                              batch_size=30))
+    assert (seeded["users"], seeded["categories"], seeded["transactions"]) == (2, 6, 100)
+    assert test_db.scalar(select(func.count(Transaction.id))) == 100
+    assert test_db.scalar(
+        select(func.sum(TransactionRollup.count)).filter(TransactionRollup.granularity == RollupGranularity.DAY)
+    ) == 100
+
+    mix = {"list": 2, "create": 1, "update": 1, "delete": 1}
+    report = asyncio.run(drive(test_async_engine, users=2, concurrency=2, mix=mix, requests=30,
+                               duration=None, random_seed=1))
+    # One login per virtual user, then the requested number of mixed requests
+    assert report["requests"] == 32
+    assert report["errors"] == 0
+    assert report["routes"]["POST /api/v1/auth/login"]["requests"] == 2
+    for route in report["routes"].values():
+        latency = route["latency_ms"]
+        assert latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
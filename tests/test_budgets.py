@@ -0,0 +1,93 @@
+def test_budget_crud(authenticated_client):
+    """Test creating, listing, updating and deleting a budget"""
+    response = authenticated_client.post("/api/v1/budgets", json={"amount": 500, "period": "monthly", "start_date": "2024-01-01"})
+    assert response.status_code == 201
+    budget_id = response.json()["id"]
+
+    assert len(authenticated_client.get("/api/v1/budgets").json()) == 1
+    response = authenticated_client.put(f"/api/v1/budgets/{budget_id}", json={"amount": 750})
+    assert float(response.json()["amount"]) == 750
+    assert authenticated_client.delete(f"/api/v1/budgets/{budget_id}").status_code == 200
+    assert authenticated_client.get(f"/api/v1/budgets/{budget_id}").status_code == 404
+
+
+
+def test_budget_update_clears_category_and_end_date(authenticated_client):
+    """Test an explicit null clears category_id and end_date, while amount and period cannot be null"""
+    category = authenticated_client.post("/api/v1/categories", json={"name": "Food"}).json()
+    budget = authenticated_client.post("/api/v1/budgets", json={"amount": 100, "period": "monthly", "category_id": category["id"],
+                                                                "start_date": "2024-01-01", "end_date": "2024-12-31"}).json()
+
+    response = authenticated_client.put(f"/api/v1/budgets/{budget['id']}", json={"category_id": None})
+    assert response.status_code == 200
+    assert response.json()["category_id"] is None
+    assert response.json()["end_date"] == "2024-12-31"
+    response = authenticated_client.put(f"/api/v1/budgets/{budget['id']}", json={"end_date": None})
+    assert response.status_code == 200
+    assert response.json()["end_date"] is None
+
+    assert authenticated_client.put(f"/api/v1/budgets/{budget['id']}", json={"amount": None}).status_code == 422
+    assert authenticated_client.put(f"/api/v1/budgets/{budget['id']}", json={}).status_code == 422
+
+def test_budget_other_users_category(authenticated_client, second_authenticated_client):
+    """Test a budget cannot point at another user's category"""
+    category = second_authenticated_client.post("/api/v1/categories", json={"name": "Travel"}).json()
+    response = authenticated_client.post("/api/v1/budgets", json={"amount": 100, "period": "weekly", "category_id": category["id"]})
+    assert response.status_code == 404
+
+
+def test_budget_status(authenticated_client, test_transaction_data):
+    """Test spent/remaining/percentage for category and overall budgets in their current period"""
+    food = authenticated_client.post("/api/v1/categories", json={"name": "Food"}).json()
+    for date, amount, category_id in [
+        ("2024-03-04", 30, food["id"]),   # Monday, same week and month
+        ("2024-03-06", 45, food["id"]),   # as_of day
+        ("2024-03-06", 20, None),
+        ("2024-02-28", 99, food["id"]),   # previous month, same year
+    ]:
+        authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date=date, amount=amount, category_id=category_id))
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-03-06", amount=1000, transaction_type="income"))
+
+    budgets = [
+        {"amount": 50, "period": "daily", "category_id": food["id"]},
+        {"amount": 100, "period": "weekly", "category_id": food["id"]},
+        {"amount": 100, "period": "monthly"},
+        {"amount": 1000, "period": "yearly", "category_id": food["id"]},
+    ]
+    for budget in budgets:
+        authenticated_client.post("/api/v1/budgets", json=dict(budget, start_date="2024-01-01"))
+
+    response = authenticated_client.get("/api/v1/analytics/budget-status", params={"as_of": "2024-03-06"})
+    assert response.status_code == 200
+    statuses = response.json()
+    assert [float(s["spent"]) for s in statuses] == [45, 75, 95, 174]
+    assert float(statuses[1]["remaining"]) == 25
+    assert statuses[1]["percentage_used"] == 75.0
+    assert statuses[1]["period_start"] == "2024-03-04"
+    assert statuses[1]["period_end"] == "2024-03-10"
+    assert [s["is_over_budget"] for s in statuses] == [False, False, False, False]
+
+
+def test_budget_status_query_count(authenticated_client, count_queries):
+    """Test evaluating many budgets takes a fixed number of queries"""
+    for i in range(20):
+        period = ["daily", "weekly", "monthly", "yearly"][i % 4]
+        authenticated_client.post("/api/v1/budgets", json={"amount": 10 + i, "period": period})
+
+    with count_queries() as queries:
+        response = authenticated_client.get("/api/v1/analytics/budget-status")
+    assert len(response.json()) == 20
+    # budgets + one aggregate over the rollups
+    assert len(queries) == 2
+
+
+def test_delete_category_removes_its_budgets(authenticated_client):
+    """Test deleting a category deletes the budgets scoped to it"""
+    food = authenticated_client.post("/api/v1/categories", json={"name": "Food"}).json()
+    authenticated_client.post("/api/v1/budgets", json={"amount": 100, "period": "monthly", "category_id": food["id"]})
+    authenticated_client.post("/api/v1/budgets", json={"amount": 300, "period": "monthly"})
+
+    authenticated_client.delete(f"/api/v1/categories/{food['id']}")
+    budgets = authenticated_client.get("/api/v1/budgets").json()
+    assert [b["category_id"] for b in budgets] == [None]
+    assert authenticated_client.delete("/api/v1/users/me").status_code == 200
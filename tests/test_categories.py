@@ -0,0 +1,12 @@
+def test_categories_etag(authenticated_client):
+    """Test category lists answer 304 until a category changes"""
+    category = authenticated_client.post("/api/v1/categories", json={"name": "Food"}).json()
+    etag = authenticated_client.get("/api/v1/categories").headers["ETag"]
+    assert authenticated_client.get("/api/v1/categories", headers={"If-None-Match": etag}).status_code == 304
+    assert authenticated_client.get(f"/api/v1/categories/{category['id']}",
+                                    headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+
+    authenticated_client.put(f"/api/v1/categories/{category['id']}", json={"name": "Groceries"})
+    response = authenticated_client.get("/api/v1/categories", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "Groceries"
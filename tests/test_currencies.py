@@ -0,0 +1,216 @@
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.main import app
+from app.models.user import User
+from app.services.currency_service import ExchangeRateError, RateTable
+from app.services.exchange_rate_provider import StaticExchangeRateProvider, get_exchange_rate_provider
+from app.utils.dependencies import user_cache
+
+RATES = [
+    {"base": "EUR", "quote": "USD", "date": "2024-01-01", "rate": "1.10"},
+    {"base": "EUR", "quote": "USD", "date": "2024-02-01", "rate": "1.20"},
+    {"base": "USD", "quote": "GBP", "date": "2024-01-01", "rate": "0.80"},
+]
+
+
+@pytest.fixture
+def admin_client(authenticated_client, test_db):
+    """The authenticated client, promoted to admin."""
+    test_db.query(User).update({User.is_admin: True})
+    test_db.commit()
+    user_cache.clear()
+    return authenticated_client
+
+
+@pytest.fixture
+def with_rates(admin_client):
+    response = admin_client.post("/api/v1/exchange-rates", json=RATES)
+    assert response.json() == {"loaded": 3}
+    return admin_client
+
+
+def test_rate_table_lookups():
+    """Test rates are picked by bisecting dates, inverted and crossed through the pivot"""
+    table = RateTable([
+        ("EUR", "USD", date(2024, 2, 1), Decimal("1.20")),
+        ("EUR", "USD", date(2024, 1, 1), Decimal("1.10")),
+        ("USD", "GBP", date(2024, 1, 1), Decimal("0.80")),
+    ])
+    assert table.rate("EUR", "USD", date(2024, 1, 31)) == Decimal("1.10")
+    assert table.rate("EUR", "USD", date(2024, 2, 1)) == Decimal("1.20")
+    # Days before the first rate use it
+    assert table.rate("EUR", "USD", date(2023, 6, 1)) == Decimal("1.10")
+    assert table.rate("GBP", "USD", date(2024, 3, 1)) == Decimal("1.25")
+    assert table.rate("EUR", "GBP", date(2024, 3, 1)) == Decimal("0.960")
+    assert table.currencies == {"EUR", "USD", "GBP"}
+    assert table.supports("GBP", "EUR")
+    assert not table.supports("EUR", "JPY")
+    with pytest.raises(ExchangeRateError):
+        table.rate("JPY", "USD", date(2024, 1, 1))
+    assert table.convert_many([(Decimal("10"), "EUR", date(2024, 1, 15)), (Decimal("3.33"), "EUR", date(2024, 1, 15)),
+                               (Decimal("5"), "USD", date(2024, 1, 15))], "USD") == [
+        Decimal("11.00"), Decimal("3.66"), Decimal("5.00")
+    ]
+
+
+def test_load_rates_requires_admin(authenticated_client):
+    """Test only admins can load exchange rates"""
+    response = authenticated_client.post("/api/v1/exchange-rates", json=RATES)
+    assert response.status_code == 403
+
+
+def test_currencies_and_rates(with_rates):
+    """Test listing currencies and reading a (crossed) rate on a day"""
+    assert with_rates.get("/api/v1/currencies").json() == {"base": "USD", "currencies": ["EUR", "GBP", "USD"]}
+    response = with_rates.get("/api/v1/exchange-rates", params={"base": "GBP", "quote": "EUR", "on": "2024-02-15"})
+    assert response.status_code == 200
+    assert Decimal(response.json()["rate"]).quantize(Decimal("0.0001")) == Decimal("1.0417")
+    response = with_rates.get("/api/v1/exchange-rates", params={"base": "JPY", "quote": "USD"})
+    assert response.status_code == 422
+
+
+def test_convert_amount(with_rates):
+    """Test converting an amount to the user's currency at the rate of a day"""
+    response = with_rates.post("/api/v1/transactions/convert",
+                               json={"amount": "20", "currency": "EUR", "date": "2024-02-10"})
+    assert response.status_code == 200
+    data = response.json()
+    assert Decimal(data["converted_amount"]) == Decimal("24.00")
+    assert data["converted_currency"] == "USD"
+
+
+def test_fetch_rates_from_provider(admin_client):
+    """Test fetching rates through the provider dependency"""
+    assert admin_client.post("/api/v1/exchange-rates/fetch", params={"base": "EUR"}).status_code == 503
+    app.dependency_overrides[get_exchange_rate_provider] = lambda: StaticExchangeRateProvider({"USD": {"EUR": "0.90", "CHF": "0.80"}})
+    response = admin_client.post("/api/v1/exchange-rates/fetch", params={"base": "USD", "on": "2024-03-01"})
+    assert response.json() == {"loaded": 2}
+    rate = admin_client.get("/api/v1/exchange-rates", params={"base": "CHF", "quote": "USD", "on": "2024-03-01"}).json()["rate"]
+    assert Decimal(rate).quantize(Decimal("0.0001")) == Decimal("1.2500")
+
+
+def test_foreign_transaction_requires_rate(authenticated_client, test_transaction_data):
+    """Test a transaction in a currency without a rate to the user's is rejected"""
+    response = authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, currency="EUR"))
+    assert response.status_code == 422
+    response = authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, currency="USD"))
+    assert response.status_code == 201
+    assert response.json()["currency"] is None
+
+
+def test_analytics_convert_foreign_transactions(with_rates, test_transaction_data):
+    """Test spending, totals, the summary and budgets convert each transaction at the rate of its day"""
+    food = with_rates.post("/api/v1/categories", json={"name": "Food"}).json()
+    for day, amount, currency in [("2024-01-10", 10, "EUR"), ("2024-02-10", 10, "EUR"), ("2024-02-11", 5, None)]:
+        response = with_rates.post("/api/v1/transactions/", json=dict(test_transaction_data, date=day, amount=amount,
+                                                                      currency=currency, category_id=food["id"]))
+        assert response.status_code == 201
+    with_rates.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-02-12", amount=100,
+                                                       currency="GBP", transaction_type="income"))
+
+    spending = with_rates.get("/api/v1/analytics/spending").json()
+    assert float(spending["total"]) == 28
+    assert [(c["category_name"], float(c["total"]), c["count"]) for c in spending["categories"]] == [("Food", 28, 3)]
+
+    totals = with_rates.get("/api/v1/analytics/income-vs-expense").json()
+    assert float(totals["income"]) == 125
+    assert float(totals["net"]) == 97
+
+    summary = with_rates.get("/api/v1/analytics/summary", params={"granularity": "month"}).json()
+    assert [(s["period"], float(s["income"]), float(s["expense"])) for s in summary] == [
+        ("2024-01-01", 0, 11), ("2024-02-01", 125, 17),
+    ]
+
+    timeseries = with_rates.get("/api/v1/analytics/timeseries",
+                                params={"bucket": "month", "from": "2024-01-01", "to": "2024-02-29"}).json()
+    assert [(p["period"], float(p["income"]), float(p["expense"])) for p in timeseries] == [
+        ("2024-01-01", 0, 11), ("2024-02-01", 125, 17),
+    ]
+
+    with_rates.post("/api/v1/budgets", json={"amount": 20, "period": "monthly", "category_id": food["id"], "start_date": "2024-01-01"})
+    status = with_rates.get("/api/v1/analytics/budget-status", params={"as_of": "2024-02-15"}).json()
+    assert float(status[0]["spent"]) == 17
+    assert status[0]["is_over_budget"] is False
+
+
+def test_export_and_import_currency(with_rates, test_transaction_data):
+    """Test exports carry the currency and the converted amount, and imports read the currency column"""
+    content = (
+        "date,transaction_type,amount,currency,category_id,description\n"
+        "2024-01-05,expense,10,EUR,,Hotel\n"
+        "2024-01-06,expense,4,,,Coffee\n"
+        "2024-01-07,expense,4,JPY,,Sushi\n"
+    )
+    report = with_rates.post("/api/v1/import/transactions",
+                             files={"file": ("transactions.csv", content.encode(), "text/csv")}).json()
+    assert report["imported"] == 2
+    assert [error["line"] for error in report["errors"]] == [4]
+
+    rows = list(csv.DictReader(io.StringIO(with_rates.get("/api/v1/export/transactions").text)))
+    assert [(row["amount"], row["currency"], row["converted_amount"]) for row in rows] == [
+        ("10.00", "EUR", "11.00"), ("4.00", "USD", "4.00"),
+    ]
+
+
+def test_change_user_currency(with_rates, test_transaction_data):
+    """Test changing the user's currency keeps transaction amounts and converts analytics to the new one"""
+    with_rates.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-02-10", amount=12))
+    with_rates.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-02-10", amount=10, currency="EUR"))
+
+    assert with_rates.put("/api/v1/users/me", json={"currency": "JPY"}).status_code == 400
+    response = with_rates.put("/api/v1/users/me", json={"currency": "EUR"})
+    assert response.status_code == 200
+    assert response.json()["currency"] == "EUR"
+
+    transactions = with_rates.get("/api/v1/transactions/").json()
+    assert sorted((t["currency"] or "", float(t["amount"])) for t in transactions) == [("", 10), ("USD", 12)]
+    spending = with_rates.get("/api/v1/analytics/spending").json()
+    assert float(spending["total"]) == 20
+
+
+def test_change_user_currency_keeps_recurring_templates(with_rates):
+    """Test a recurring template keeps its currency across a user currency change and books occurrences in it"""
+    template = {"amount": 100, "transaction_type": "expense", "frequency": "monthly",
+                "start_date": "2024-02-01", "end_date": "2024-02-01"}
+    dollars = with_rates.post("/api/v1/recurring", json=template).json()
+    euros = with_rates.post("/api/v1/recurring", json=dict(template, currency="EUR")).json()
+    assert (dollars["currency"], euros["currency"]) == (None, "EUR")
+    assert with_rates.post("/api/v1/recurring", json=dict(template, currency="JPY")).status_code == 422
+
+    assert with_rates.put("/api/v1/users/me", json={"currency": "EUR"}).status_code == 200
+    templates = with_rates.get("/api/v1/recurring").json()
+    assert [t["currency"] for t in templates] == ["USD", None]
+
+    for t in templates:
+        assert with_rates.post(f"/api/v1/recurring/{t['id']}/process").json()["created"] == 1
+    transactions = with_rates.get("/api/v1/transactions/").json()
+    assert sorted((t["currency"] or "", float(t["amount"])) for t in transactions) == [("", 100), ("USD", 100)]
+    spending = with_rates.get("/api/v1/analytics/spending").json()
+    assert Decimal(spending["total"]) == Decimal("183.33")
+
+
+def test_writes_read_the_committed_currency(with_rates, test_db, test_transaction_data):
+    """Test transaction writes use the user's committed currency, not a stale cached one"""
+    assert with_rates.get("/api/v1/users/me").json()["currency"] == "USD"
+    # As if another worker changed the currency: this worker's cached user still says USD
+    test_db.query(User).update({User.currency: "EUR"})
+    test_db.commit()
+
+    single = with_rates.post("/api/v1/transactions/", json=dict(test_transaction_data, currency="USD")).json()
+    assert single["currency"] == "USD"
+    bulk = with_rates.post("/api/v1/transactions/bulk", json={"items": [
+        dict(test_transaction_data, currency="USD"), dict(test_transaction_data, currency="EUR"),
+    ]})
+    assert bulk.json()["created"] == 2
+    report = with_rates.post("/api/v1/import/transactions", files={"file": (
+        "transactions.csv", b"transaction_type,amount,currency\nexpense,1,USD\nexpense,2,EUR\n", "text/csv"
+    )}).json()
+    assert report["imported"] == 2
+
+    stored = sorted((t["currency"] or "", float(t["amount"])) for t in with_rates.get("/api/v1/transactions/").json())
+    assert stored == [("", 2), ("", 100), ("USD", 1), ("USD", 100), ("USD", 100)]
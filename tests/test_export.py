@@ -0,0 +1,40 @@
+import csv
+import io
+import json
+
+
+def test_export_transactions_csv(authenticated_client, test_transaction_data):
+    """Test exporting transactions as CSV with the category name joined in"""
+    category = authenticated_client.post("/api/v1/categories", json={"name": "Groceries"}).json()
+    test_transaction_data["category_id"] = category["id"]
+    authenticated_client.post("/api/v1/transactions/", json=test_transaction_data)
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, category_id=None))
+
+    response = authenticated_client.get("/api/v1/export/transactions")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 2
+    assert rows[0]["category"] == "Groceries"
+    assert rows[0]["amount"] == "100.00"
+    assert rows[1]["category"] == ""
+
+
+def test_export_transactions_ndjson_date_range(authenticated_client, test_transaction_data):
+    """Test exporting NDJSON only includes transactions inside the date range"""
+    for day in ("2024-01-10", "2024-02-10", "2024-03-10"):
+        authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date=day))
+
+    response = authenticated_client.get("/api/v1/export/transactions",
+                                        params={"format": "ndjson", "from": "2024-02-01", "to": "2024-02-28"})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["date"][:10] for line in lines] == ["2024-02-10"]
+    assert lines[0]["transaction_type"] == "expense"
+
+
+def test_export_transactions_user_isolation(authenticated_client, second_authenticated_client, test_transaction_data):
+    """Test a user's export does not contain other users' transactions"""
+    second_authenticated_client.post("/api/v1/transactions/", json=test_transaction_data)
+    response = authenticated_client.get("/api/v1/export/transactions", params={"format": "ndjson"})
+    assert response.text == ""
@@ -0,0 +1,73 @@
+def upload(client, content):
+    return client.post("/api/v1/import/transactions",
+                       files={"file": ("transactions.csv", content.encode(), "text/csv")})
+
+
+def test_import_transactions_csv(authenticated_client, second_authenticated_client, monkeypatch):
+    """Test importing a CSV inserts valid rows in batches and reports invalid ones by line"""
+    from app.config import settings
+    monkeypatch.setattr(settings, "import_batch_size", 2)
+    own = authenticated_client.post("/api/v1/categories", json={"name": "Rent"}).json()
+    other = second_authenticated_client.post("/api/v1/categories", json={"name": "Rent"}).json()
+    content = (
+        "date,transaction_type,amount,category_id,description\n"
+        f"2024-01-01,expense,10.50,{own['id']},Lunch\n"
+        "2024-01-02,income,2000,,Salary\n"
+        "2024-01-03,expense,-4,,Negative\n"
+        f"2024-01-04,expense,7,{other['id']},Not mine\n"
+        "2024-01-05,expense,3,,\n"
+        "2024-01-06,gift,3,,Bad type\n"
+    )
+
+    response = upload(authenticated_client, content)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["total_rows"] == 6
+    assert report["imported"] == 3
+    assert report["failed"] == 3
+    assert [error["line"] for error in report["errors"]] == [4, 5, 7]
+    assert "greater than 0" in report["errors"][0]["error"]
+    assert "category" in report["errors"][1]["error"].lower()
+
+    listed = authenticated_client.get("/api/v1/transactions/").json()
+    assert len(listed) == 3
+
+
+def test_import_transactions_round_trips_export(authenticated_client, test_transaction_data):
+    """Test a CSV export can be imported back"""
+    authenticated_client.post("/api/v1/transactions/", json=test_transaction_data)
+    exported = authenticated_client.get("/api/v1/export/transactions").text
+    report = upload(authenticated_client, exported).json()
+    assert report["imported"] == 1
+    assert report["failed"] == 0
+
+
+def test_import_transactions_missing_columns(authenticated_client):
+    """Test a CSV without the required columns is rejected"""
+    response = upload(authenticated_client, "date,description\n2024-01-01,Lunch\n")
+    assert response.status_code == 400
+    assert "amount" in response.json()["detail"]
+
+
+def test_import_transactions_database_error(authenticated_client, monkeypatch):
+    """Test a failing batch is rolled back and reported, and the batches committed before it are kept"""
+    from sqlalchemy.exc import OperationalError
+    from app.config import settings
+    from app.services import import_service
+    monkeypatch.setattr(settings, "import_batch_size", 2)
+    bump_data_version = import_service.bump_data_version
+    calls = []
+
+    async def failing_second_batch(db, user_id):
+        calls.append(user_id)
+        if len(calls) == 2:
+            raise OperationalError("INSERT", {}, Exception("disk I/O error"))
+        await bump_data_version(db, user_id)
+
+    monkeypatch.setattr(import_service, "bump_data_version", failing_second_batch)
+    content = "transaction_type,amount\n" + "expense,1\n" * 4
+
+    response = upload(authenticated_client, content)
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Database error"
+    assert len(authenticated_client.get("/api/v1/transactions/").json()) == 2
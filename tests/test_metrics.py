@@ -0,0 +1,74 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+def metric_lines(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    return response.text.splitlines()
+
+
+def test_metrics_count_requests_by_route_template(authenticated_client, test_transaction_data):
+    """Test requests are counted per route template and status, with latency histograms"""
+    from app.utils.metrics import request_metrics
+
+    request_metrics.clear()
+    transaction_id = authenticated_client.post("/api/v1/transactions", json=test_transaction_data).json()["id"]
+    authenticated_client.get(f"/api/v1/transactions/{transaction_id}")
+    authenticated_client.get("/api/v1/transactions/999999")
+    authenticated_client.get("/no/such/path")
+
+    lines = metric_lines(authenticated_client)
+    route = "/api/v1/transactions/{id}"
+    assert 'http_requests_total{method="POST",route="/api/v1/transactions",status="201"} 1' in lines
+    assert f'http_requests_total{{method="GET",route="{route}",status="200"}} 1' in lines
+    assert f'http_requests_total{{method="GET",route="{route}",status="404"}} 1' in lines
+    assert 'http_requests_total{method="GET",route="<unmatched>",status="404"} 1' in lines
+    assert f'http_request_duration_seconds_count{{method="GET",route="{route}"}} 2' in lines
+    assert f'http_request_duration_seconds_bucket{{method="GET",route="{route}",le="+Inf"}} 2' in lines
+    # The scrape itself is in flight while the metrics are rendered
+    assert "http_requests_in_flight 1" in lines
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test histogram buckets render cumulative counts, sum and count"""
+    from app.utils.metrics import Histogram, _render_histogram
+
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert list(_render_histogram("latency", histogram, {"route": "/x"})) == [
+        'latency_bucket{route="/x",le="0.1"} 2',
+        'latency_bucket{route="/x",le="1.0"} 3',
+        'latency_bucket{route="/x",le="+Inf"} 4',
+        'latency_sum{route="/x"} 3.65',
+        'latency_count{route="/x"} 4',
+    ]
+
+
+def test_pool_metrics(tmp_path):
+    """Test pool gauges and checkout wait times of the instrumented pool"""
+    from app.database import get_async_pool_class
+    from app.utils.metrics import InstrumentedAsyncQueuePool, pool_metrics, render_metrics
+
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+    assert get_async_pool_class(url) is InstrumentedAsyncQueuePool
+    assert get_async_pool_class("sqlite+aiosqlite://") is not InstrumentedAsyncQueuePool
+    pool_metrics.clear()
+
+    async def _scrape_while_checked_out():
+        engine = create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, pool_size=2)
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("select 1"))
+                return render_metrics(engine.pool).splitlines()
+        finally:
+            await engine.dispose()
+
+    lines = asyncio.run(_scrape_while_checked_out())
+    assert "db_pool_size 2" in lines
+    assert "db_pool_checked_out 1" in lines
+    assert "db_pool_wait_seconds_count 1" in lines
@@ -0,0 +1,120 @@
+import logging
+
+import pytest
+from fastapi import Depends
+from sqlalchemy import select, text
+
+from tests.conftest import db_queries
+
+# Most statements each endpoint may run (auth, ETag lookup and writes included), against data with
+# several rows of each kind, so a change adding one query per row fails here.
+# Body values naming a seeded id ("category_id") are replaced by that id.
+QUERY_BUDGETS = [
+    ("GET", "/api/v1/users/me", None, 1),
+    ("GET", "/api/v1/transactions", None, 2),
+    ("GET", "/api/v1/transactions/{transaction_id}", None, 2),
+    ("POST", "/api/v1/transactions", {"amount": 5, "transaction_type": "expense", "category_id": "category_id"}, 4),
+    ("PUT", "/api/v1/transactions/{transaction_id}", {"amount": 7, "category_id": "category_id"}, 5),
+    ("DELETE", "/api/v1/transactions/{transaction_id}", None, 4),
+    ("GET", "/api/v1/categories", None, 2),
+    ("GET", "/api/v1/budgets", None, 1),
+    ("GET", "/api/v1/analytics/budget-status", None, 2),
+    ("GET", "/api/v1/analytics/spending", None, 1),
+    ("GET", "/api/v1/analytics/summary", None, 1),
+    ("GET", "/api/v1/analytics/timeseries", None, 1),
+    ("GET", "/api/v1/recurring", None, 1),
+]
+
+
+@pytest.fixture
+def seeded_ids(authenticated_client):
+    """A user with categories, transactions across them, a budget and a recurring template."""
+    category_ids = [
+        authenticated_client.post("/api/v1/categories", json={"name": name}).json()["id"]
+        for name in ("Food", "Rent", "Fun")
+    ]
+    transaction_ids = [
+        authenticated_client.post("/api/v1/transactions", json={
+            "amount": 10 + i, "transaction_type": "expense", "category_id": category_ids[i % 3]
+        }).json()["id"]
+        for i in range(6)
+    ]
+    authenticated_client.post("/api/v1/budgets", json={"amount": 100, "period": "monthly",
+                                                        "category_id": category_ids[0]})
+    authenticated_client.post("/api/v1/recurring", json={"amount": 9, "transaction_type": "expense",
+                                                          "frequency": "monthly"})
+    return {"category_id": category_ids[0], "transaction_id": transaction_ids[0]}
+
+
+@pytest.mark.parametrize("method,path,body,budget", QUERY_BUDGETS, ids=[f"{m} {p}" for m, p, _, _ in QUERY_BUDGETS])
+def test_query_budget(authenticated_client, seeded_ids, query_budget, method, path, body, budget):
+    """Test each endpoint stays within its query budget"""
+    if body is not None:
+        body = {key: seeded_ids.get(value, value) if isinstance(value, str) else value for key, value in body.items()}
+    response = authenticated_client.request(method, path.format(**seeded_ids), json=body)
+    assert response.status_code < 300
+    query_budget(response, budget)
+
+
+def test_server_timing_matches_statements_run(authenticated_client, test_transaction_data, count_queries):
+    """Test Server-Timing reports every statement the request ran"""
+    authenticated_client.post("/api/v1/transactions", json=test_transaction_data)
+
+    with count_queries() as queries:
+        response = authenticated_client.get("/api/v1/transactions")
+    assert db_queries(response) == len(queries) > 0
+    assert "app;dur=" in response.headers["server-timing"]
+
+
+def test_request_log_has_query_stats(authenticated_client, caplog):
+    """Test each request is logged with its statement count and database time"""
+    with caplog.at_level(logging.INFO, logger="app.utils.query_stats"):
+        response = authenticated_client.get("/api/v1/transactions")
+    record = caplog.records[-1]
+    assert (record.method, record.route, record.status_code) == ("GET", "/api/v1/transactions", 200)
+    assert record.db_queries == db_queries(response)
+    assert record.db_ms >= 0
+
+
+def test_strict_mode_flags_repeated_statements(test_async_engine):
+    """Test strict mode fails on one statement shape repeated past the limit, IN lists of any size included"""
+    import asyncio
+    from app.config import settings
+    from app.models.user import User
+    from app.utils.query_stats import RepeatedStatementError, track_queries
+
+    async def _run(strict, statements):
+        async with test_async_engine.connect() as conn:
+            with track_queries(strict=strict) as stats:
+                for statement in statements:
+                    await conn.execute(statement)
+        return stats
+
+    repeated = [select(User.id).filter(User.id.in_(range(i + 1))) for i in range(settings.sql_repeated_statement_limit + 1)]
+    with pytest.raises(RepeatedStatementError):
+        asyncio.run(_run(True, repeated))
+    assert asyncio.run(_run(False, repeated)).count == len(repeated)
+    # Different shapes do not add up
+    assert asyncio.run(_run(True, [text(f"select {i}") for i in range(10)])).count == 10
+
+
+def test_strict_mode_fails_n_plus_one_endpoint(authenticated_client):
+    """Test an endpoint running one query per row is caught in strict mode"""
+    from app.main import app
+    from app.database import get_async_db
+    from app.models.transaction import Transaction
+    from app.utils.query_stats import RepeatedStatementError
+
+    for i in range(8):
+        authenticated_client.post("/api/v1/transactions", json={"amount": i + 1, "transaction_type": "expense"})
+
+    async def per_row(db=Depends(get_async_db)):
+        ids = (await db.scalars(select(Transaction.id))).all()
+        return [await db.scalar(select(Transaction.amount).filter(Transaction.id == id)) for id in ids]
+
+    app.add_api_route("/n-plus-one", per_row)
+    try:
+        with pytest.raises(RepeatedStatementError):
+            authenticated_client.get("/n-plus-one")
+    finally:
+        app.router.routes.pop()
@@ -0,0 +1,87 @@
+import shutil
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import database
+from app.models.transaction import Transaction, TransactionType
+from app.utils.cache import TTLCache
+
+
+@pytest.fixture
+def replica(test_db_path, tmp_path, monkeypatch):
+    """
+    Replica that only changes when snapshot() copies the primary into it, so tests
+    see exactly which database served a read.
+    """
+    replica_path = tmp_path / "replica.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{replica_path}", poolclass=NullPool)
+    monkeypatch.setattr(database, "ReplicaSessionLocal",
+                        async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False))
+    monkeypatch.setattr(database, "recent_writers", TTLCache(max_size=100, ttl=60))
+
+    def snapshot():
+        shutil.copyfile(test_db_path, replica_path)
+
+    snapshot()
+    return snapshot
+
+
+def add_transaction_behind_api(test_db, user_id):
+    """Write on the primary without going through the API (so no read stickiness)."""
+    test_db.add(Transaction(user_id=user_id, amount=1, transaction_type=TransactionType.EXPENSE,
+                            date=datetime.now(timezone.utc)))
+    test_db.commit()
+
+
+def transaction_count(client):
+    response = client.get("/api/v1/transactions")
+    assert response.status_code == 200
+    return len(response.json())
+
+
+def test_reads_go_to_replica(authenticated_client, test_transaction_data, test_db, replica):
+    """Test read-only endpoints read from the replica once the user's sticky window is over"""
+    authenticated_client.post("/api/v1/transactions", json=test_transaction_data)
+    user_id = authenticated_client.get("/api/v1/users/me").json()["id"]
+    replica()
+    database.recent_writers.clear()
+
+    add_transaction_behind_api(test_db, user_id)
+    # The replica has not caught up with the primary yet
+    assert transaction_count(authenticated_client) == 1
+    assert len(authenticated_client.get("/api/v1/analytics/summary", params={"granularity": "day"}).json()) == 1
+    # Writes always go to the primary
+    assert authenticated_client.post("/api/v1/transactions", json=test_transaction_data).status_code == 201
+
+
+def test_user_reads_own_writes_from_primary(authenticated_client, second_authenticated_client,
+                                            test_transaction_data, replica):
+    """Test a user who just wrote reads from the primary, while other users keep using the replica"""
+    replica()
+    database.recent_writers.clear()
+
+    authenticated_client.post("/api/v1/transactions", json=test_transaction_data)
+    assert transaction_count(authenticated_client) == 1
+
+    second_user_id = second_authenticated_client.get("/api/v1/users/me").json()["id"]
+    assert database.reads_from_primary(second_user_id) is False
+
+
+def test_sticky_window_expires(authenticated_client, test_transaction_data, replica, monkeypatch):
+    """Test reads return to the replica when the sticky window is over"""
+    monkeypatch.setattr(database, "recent_writers", TTLCache(max_size=100, ttl=0))
+    replica()
+
+    authenticated_client.post("/api/v1/transactions", json=test_transaction_data)
+    assert transaction_count(authenticated_client) == 0
+
+
+def test_without_replica_reads_use_primary(authenticated_client, test_transaction_data):
+    """Test reads fall back to the primary (and no write is tracked) without a replica"""
+    assert database.ReplicaSessionLocal is None
+    authenticated_client.post("/api/v1/transactions", json=test_transaction_data)
+    assert len(database.recent_writers) == 0
+    assert transaction_count(authenticated_client) == 1
@@ -0,0 +1,139 @@
+import asyncio
+from datetime import date, timedelta
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+
+def make_scheduler(test_async_engine, **kwargs):
+    from app.services.recurring_service import RecurringScheduler
+    return RecurringScheduler(async_sessionmaker(bind=test_async_engine, expire_on_commit=False), **kwargs)
+
+
+def run_scheduler(scheduler, today):
+    async def _run():
+        await scheduler.load()
+        return await scheduler.run_once(today)
+    return asyncio.run(_run())
+
+
+def template_transactions(client, template_id):
+    return sorted(
+        (t["date"][:10], float(t["amount"]))
+        for t in client.get("/api/v1/transactions", params={"limit": 500}).json()
+        if t["recurring_transaction_id"] == template_id
+    )
+
+
+def test_next_occurrence_keeps_day_of_month():
+    """Test monthly occurrences are clamped to short months without drifting"""
+    from app.models.recurring_transaction import RecurrenceFrequency
+    from app.services.recurring_service import next_occurrence
+
+    anchor = date(2024, 1, 31)
+    current = anchor
+    dates = []
+    for _ in range(3):
+        current = next_occurrence(RecurrenceFrequency.MONTHLY, anchor, current)
+        dates.append(current)
+    assert dates == [date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)]
+    assert next_occurrence(RecurrenceFrequency.YEARLY, date(2024, 2, 29), date(2024, 2, 29)) == date(2025, 2, 28)
+
+
+def test_recurring_crud(authenticated_client):
+    """Test creating, listing, updating and deactivating a template"""
+    response = authenticated_client.post("/api/v1/recurring", json={
+        "amount": 1200, "description": "Rent", "transaction_type": "expense",
+        "frequency": "monthly", "start_date": "2024-01-01",
+    })
+    assert response.status_code == 201
+    template = response.json()
+    assert template["next_occurrence_date"] == "2024-01-01"
+    assert template["is_active"] is True
+
+    assert len(authenticated_client.get("/api/v1/recurring").json()) == 1
+    response = authenticated_client.put(f"/api/v1/recurring/{template['id']}", json={"amount": 1300})
+    assert float(response.json()["amount"]) == 1300
+    response = authenticated_client.delete(f"/api/v1/recurring/{template['id']}")
+    assert response.json()["is_active"] is False
+    assert authenticated_client.post(f"/api/v1/recurring/{template['id']}/process").status_code == 409
+
+
+def test_recurring_other_user(authenticated_client, second_authenticated_client):
+    """Test templates of another user are not visible"""
+    template = authenticated_client.post("/api/v1/recurring", json={
+        "amount": 10, "transaction_type": "expense", "frequency": "daily",
+    }).json()
+    assert second_authenticated_client.put(f"/api/v1/recurring/{template['id']}", json={"amount": 5}).status_code == 404
+    assert second_authenticated_client.post(f"/api/v1/recurring/{template['id']}/process").status_code == 404
+
+
+def test_scheduler_catches_up_without_duplicates(authenticated_client, test_async_engine):
+    """Test the scheduler creates every missed occurrence once, even when run again or by two workers"""
+    template = authenticated_client.post("/api/v1/recurring", json={
+        "amount": 50, "transaction_type": "expense", "frequency": "weekly",
+        "start_date": "2024-01-01", "end_date": "2024-02-05",
+    }).json()
+    authenticated_client.post("/api/v1/recurring", json={
+        "amount": 9, "transaction_type": "income", "frequency": "daily", "start_date": "2024-03-01",
+    })
+
+    # Two workers loaded the same due queue; the second finds the template already advanced
+    worker_a = make_scheduler(test_async_engine)
+    worker_b = make_scheduler(test_async_engine)
+    asyncio.run(worker_b.load())
+    assert run_scheduler(worker_a, date(2024, 1, 20)) == 1
+    assert asyncio.run(worker_b.run_once(date(2024, 1, 20))) == 0
+    assert template_transactions(authenticated_client, template["id"]) == [
+        ("2024-01-01", 50.0), ("2024-01-08", 50.0), ("2024-01-15", 50.0),
+    ]
+
+    # Catch up after "downtime" past the end date: the template is finished and deactivated
+    run_scheduler(worker_a, date(2024, 2, 20))
+    run_scheduler(worker_a, date(2024, 2, 20))
+    assert [d for d, _ in template_transactions(authenticated_client, template["id"])] == [
+        "2024-01-01", "2024-01-08", "2024-01-15", "2024-01-22", "2024-01-29", "2024-02-05",
+    ]
+    template = authenticated_client.get("/api/v1/recurring").json()[0]
+    assert template["is_active"] is False
+    assert template["next_occurrence_date"] == "2024-02-12"
+
+    summary = authenticated_client.get("/api/v1/analytics/summary", params={"granularity": "month"}).json()
+    assert [float(s["expense"]) for s in summary] == [250.0, 50.0]
+
+
+def test_scheduler_processes_in_batches(authenticated_client, test_async_engine, count_queries):
+    """Test due templates are materialized a batch at a time, not one commit per template"""
+    for i in range(25):
+        authenticated_client.post("/api/v1/recurring", json={
+            "amount": 10 + i, "transaction_type": "expense", "frequency": "daily", "start_date": "2024-01-01",
+        })
+    scheduler = make_scheduler(test_async_engine, batch_size=10)
+    asyncio.run(scheduler.load())
+
+    with count_queries() as queries:
+        assert asyncio.run(scheduler.run_once(date(2024, 1, 3))) == 25
+    inserts = [q for q in queries if q.startswith("INSERT INTO transactions")]
+    # 3 batches of at most 10 templates, 3 occurrences each
+    assert len(inserts) == 3
+    assert len(template_transactions(authenticated_client, None)) == 0
+    assert len(authenticated_client.get("/api/v1/transactions", params={"limit": 500}).json()) == 75
+    assert len(scheduler) == 25
+
+
+def test_process_endpoint_and_resume(authenticated_client):
+    """Test processing by hand catches up once, and resuming skips the paused period"""
+    today = date.today()
+    start = today - timedelta(days=2)
+    template = authenticated_client.post("/api/v1/recurring", json={
+        "amount": 5, "transaction_type": "expense", "frequency": "daily", "start_date": start.isoformat(),
+    }).json()
+
+    response = authenticated_client.post(f"/api/v1/recurring/{template['id']}/process")
+    assert response.json()["created"] == 3
+    assert response.json()["recurring_transaction"]["next_occurrence_date"] == (today + timedelta(days=1)).isoformat()
+    assert authenticated_client.post(f"/api/v1/recurring/{template['id']}/process").json()["created"] == 0
+
+    authenticated_client.delete(f"/api/v1/recurring/{template['id']}")
+    response = authenticated_client.put(f"/api/v1/recurring/{template['id']}", json={"is_active": True})
+    assert response.json()["next_occurrence_date"] == (today + timedelta(days=1)).isoformat()
+    assert len(template_transactions(authenticated_client, template["id"])) == 3
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.database import Base
+from app.main import app
+from app.utils.startup import ALEMBIC_INI, SchemaRevisionError, prewarm_pool, verify_schema_revision
+
+
+def stamp(engine, revision):
+    """Record `revision` in alembic_version, as `alembic stamp` would."""
+    script = ScriptDirectory.from_config(Config(str(ALEMBIC_INI)))
+
+    async def _stamp():
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: MigrationContext.configure(sync_conn).stamp(script, revision))
+    asyncio.run(_stamp())
+
+
+def test_schema_check_requires_head_revision(test_async_engine):
+    """Test startup refuses a database without the Alembic head revision, and accepts it at head"""
+    with pytest.raises(SchemaRevisionError, match="<none>"):
+        asyncio.run(verify_schema_revision(test_async_engine))
+    stamp(test_async_engine, "44034f855ee9")
+    with pytest.raises(SchemaRevisionError, match="44034f855ee9"):
+        asyncio.run(verify_schema_revision(test_async_engine))
+    stamp(test_async_engine, "head")
+    asyncio.run(verify_schema_revision(test_async_engine))
+
+
+def test_fresh_database_migrates_and_starts(tmp_path):
+    """Test `alembic upgrade head` builds the models' schema on an empty database and the app then starts with the check on"""
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'fresh.db'}", SCHEMA_CHECK_ENABLED="true")
+    root = ALEMBIC_INI.parent
+
+    def run(*args):
+        result = subprocess.run([sys.executable, *args], cwd=root, env=env, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        return result.stdout
+
+    run("-m", "alembic", "upgrade", "head")
+    # The migrations match the models (and autogenerate leaves the FTS tables alone)
+    run("-m", "alembic", "check")
+    engine = create_engine(env["DATABASE_URL"])
+    try:
+        assert set(Base.metadata.tables) <= set(inspect(engine).get_table_names())
+    finally:
+        engine.dispose()
+    assert run("-c", (
+        "from fastapi.testclient import TestClient\n"
+        "from app.main import app\n"
+        "with TestClient(app) as client:\n"
+        "    print(client.get('/ready').status_code)\n"
+    )).strip() == "200"
+
+
+def test_app_does_not_start_on_unmigrated_database(monkeypatch):
+    """Test the lifespan fails (instead of creating tables) when the schema check does"""
+    from app import main
+    from app.config import settings
+
+    async def outdated(engine):
+        raise SchemaRevisionError("outdated")
+
+    monkeypatch.setattr(settings, "schema_check_enabled", True)
+    monkeypatch.setattr(main, "verify_schema_revision", outdated)
+    with pytest.raises(SchemaRevisionError):
+        with TestClient(app):
+            pass
+    assert TestClient(app).get("/ready").status_code == 503
+
+
+def test_ready_flips_after_startup(override_async_db):
+    """Test /ready answers 503 until the lifespan warm-up is done and after shutdown, while /health always answers"""
+    client = TestClient(app)
+    assert client.get("/ready").status_code == 503
+    assert client.get("/health").status_code == 200
+    with TestClient(app) as client:
+        response = client.get("/ready")
+        assert (response.status_code, response.json()) == (200, {"status": "ready"})
+        assert app.state.startup_seconds > 0
+        # The OpenAPI document was built during startup
+        assert app.openapi_schema is not None
+    assert client.get("/ready").status_code == 503
+
+
+def test_prewarm_pool(tmp_path):
+    """Test prewarming leaves connections idle in the pool, capped at its size"""
+    async def _run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+                                     poolclass=AsyncAdaptedQueuePool, pool_size=3)
+        try:
+            opened = await prewarm_pool(engine, 5)
+            return opened, engine.pool.checkedin()
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(_run()) == (3, 3)
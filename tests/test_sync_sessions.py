@@ -0,0 +1,48 @@
+import csv
+import io
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.config import settings
+from app.services.category_service import category_cache
+from app.services.currency_service import invalidate_rate_table
+from app.utils.dependencies import user_cache
+from tests.conftest import create_authenticated_client
+
+
+@pytest.fixture
+def sync_client(test_db, test_db_path, test_user_data, monkeypatch):
+    """Authenticated client whose requests run on the sync path (database_async off) against the test database."""
+    engine = create_engine(f"sqlite:///{test_db_path}")
+    monkeypatch.setattr(settings, "database_async", False)
+    monkeypatch.setattr(database, "ThreadedSessionLocal",
+                        sessionmaker(bind=engine, autoflush=False, expire_on_commit=False))
+    user_cache.clear()
+    category_cache.clear()
+    invalidate_rate_table()
+    yield create_authenticated_client(test_user_data)
+    engine.dispose()
+
+
+def test_sync_path_serves_the_api(sync_client, test_transaction_data):
+    """Test writes, reads, streamed exports and analytics work with the sync engine in the threadpool"""
+    category = sync_client.post("/api/v1/categories", json={"name": "Food"}).json()
+    for day in ("2024-01-10", "2024-01-11"):
+        response = sync_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date=day, category_id=category["id"]))
+        assert response.status_code == 201
+    transaction_id = response.json()["id"]
+
+    assert sync_client.put(f"/api/v1/transactions/{transaction_id}", json={"amount": 40}).status_code == 200
+    assert len(sync_client.get("/api/v1/transactions/").json()) == 2
+    assert sync_client.get("/api/v1/users/me").json()["username"] == "testuser"
+
+    rows = list(csv.DictReader(io.StringIO(sync_client.get("/api/v1/export/transactions").text)))
+    assert [row["amount"] for row in rows] == ["100.00", "40.00"]
+    spending = sync_client.get("/api/v1/analytics/spending").json()
+    assert float(spending["total"]) == 140
+
+    assert sync_client.delete(f"/api/v1/transactions/{transaction_id}").status_code == 200
+    assert len(sync_client.get("/api/v1/transactions/").json()) == 1
@@ -156,4 +156,360 @@ def test_delete_transaction_other_user(authenticated_client, second_authenticate
     # User 2 tries to delete User 1's transaction
     response = second_authenticated_client.delete(f"/api/v1/transactions/{user1_tx_id}")
     assert response.status_code == 404  
-    
\ No newline at end of file
+    
+
+def test_list_transactions_cursor_pagination(authenticated_client, test_transaction_data):
+    """ Test walking all pages with the cursor returns every transaction once, newest first"""
+    for day in range(1, 6):
+        test_transaction_data["date"] = f"2024-03-0{day}"
+        authenticated_client.post("/api/v1/transactions/", json=test_transaction_data)
+
+    seen = []
+    response = authenticated_client.get("/api/v1/transactions/", params={"limit": 2})
+    while True:
+        assert response.status_code == 200
+        seen.extend(tx["date"][:10] for tx in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        response = authenticated_client.get("/api/v1/transactions/", params={"limit": 2, "cursor": cursor})
+
+    assert seen == [f"2024-03-0{day}" for day in range(5, 0, -1)]
+
+
+def test_list_transactions_invalid_cursor(authenticated_client):
+    """ Test a malformed cursor is rejected"""
+    response = authenticated_client.get("/api/v1/transactions/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_list_transactions_limit_too_large(authenticated_client):
+    """ Test the page size is capped by the server"""
+    response = authenticated_client.get("/api/v1/transactions/", params={"limit": 100000})
+    assert response.status_code == 422
+
+
+def test_update_transaction_category(authenticated_client, test_transaction_data):
+    """ Test moving a transaction to a category returns the nested category"""
+    tx_id = authenticated_client.post("/api/v1/transactions/", json=test_transaction_data).json()["id"]
+    category = authenticated_client.post("/api/v1/categories", json={"name": "Groceries"}).json()
+
+    response = authenticated_client.put(f"/api/v1/transactions/{tx_id}", json={"category_id": category["id"]})
+    assert response.status_code == 200
+    assert response.json()["category"]["name"] == "Groceries"
+
+
+def test_list_transactions_query_count(authenticated_client, test_transaction_data, count_queries):
+    """ Test a page of categorized transactions loads with its categories in one query, not one per row"""
+    for i in range(5):
+        category = authenticated_client.post("/api/v1/categories", json={"name": f"Category {i}"}).json()
+        test_transaction_data["category_id"] = category["id"]
+        authenticated_client.post("/api/v1/transactions/", json=test_transaction_data)
+
+    with count_queries() as queries:
+        response = authenticated_client.get("/api/v1/transactions/")
+    assert response.status_code == 200
+    assert all(tx["category"] is not None for tx in response.json())
+    # data version (ETag) + transactions page joined with categories (the user comes from the cache)
+    assert len(queries) == 2
+
+
+def test_list_fast_path_matches_response_model(authenticated_client, test_transaction_data):
+    """ Test the list fast path serializes exactly like TransactionResponse, and keeps it in the OpenAPI schema"""
+    from app.schemas.transaction import CategoryRow, TransactionResponse, TransactionRow
+    from app.schemas.category import CategoryResponse
+
+    assert list(TransactionRow.__annotations__) == list(TransactionResponse.model_fields)
+    assert list(CategoryRow.__annotations__) == list(CategoryResponse.model_fields)
+
+    category = authenticated_client.post("/api/v1/categories", json={"name": "Café ☕", "color": "#fff"}).json()
+    authenticated_client.post("/api/v1/transactions", json={**test_transaction_data, "category_id": category["id"]})
+    authenticated_client.post("/api/v1/transactions", json={**test_transaction_data, "amount": "0.10",
+                                                            "description": None})
+    response = authenticated_client.get("/api/v1/transactions")
+    assert response.headers["content-type"] == "application/json"
+    assert "etag" in response.headers
+    listed = response.json()
+    assert [item["category"] and item["category"]["name"] for item in listed] == [None, "Café ☕"]
+    # Each listed item is what the detail endpoint (response model path) returns
+    for item in listed:
+        assert item == authenticated_client.get(f"/api/v1/transactions/{item['id']}").json()
+        assert list(item) == list(TransactionResponse.model_fields)
+
+    schema = authenticated_client.get("/openapi.json").json()
+    list_schema = schema["paths"]["/api/v1/transactions"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert list_schema == {"type": "array", "items": {"$ref": "#/components/schemas/TransactionResponse"},
+                           "title": "Response Get Current User Transactions Api V1 Transactions Get"}
+
+
+def test_list_columnar_representation(authenticated_client, test_transaction_data):
+    """ Test Accept: columnar returns the page as parallel arrays matching the JSON list, cursor included"""
+    from datetime import datetime, timezone
+    from app.utils.columnar import COLUMNAR_MEDIA_TYPE
+
+    category = authenticated_client.post("/api/v1/categories", json={"name": "Rent"}).json()
+    authenticated_client.post("/api/v1/transactions", json={**test_transaction_data, "amount": "1234.56",
+                                                            "date": "2024-03-01T12:30:00.250000",
+                                                            "category_id": category["id"]})
+    authenticated_client.post("/api/v1/transactions", json={**test_transaction_data, "amount": "0.10",
+                                                            "transaction_type": "income", "date": "2024-03-02"})
+    authenticated_client.post("/api/v1/transactions", json={**test_transaction_data, "date": "2024-02-01"})
+
+    params = {"limit": 2}
+    listed = authenticated_client.get("/api/v1/transactions", params=params)
+    response = authenticated_client.get("/api/v1/transactions", params=params, headers={"Accept": COLUMNAR_MEDIA_TYPE})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == COLUMNAR_MEDIA_TYPE
+    assert response.headers["vary"] == "Accept"
+    assert response.headers["x-next-cursor"] == listed.headers["x-next-cursor"]
+    # One ETag per representation, so a JSON page never revalidates a columnar one
+    assert response.headers["etag"] != listed.headers["etag"]
+    not_modified = authenticated_client.get("/api/v1/transactions", params=params,
+                                            headers={"Accept": COLUMNAR_MEDIA_TYPE, "If-None-Match": response.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["vary"] == "Accept"
+    assert authenticated_client.get("/api/v1/transactions", params=params,
+                                    headers={"If-None-Match": response.headers["etag"]}).status_code == 200
+    columns = response.json()
+    assert columns == {
+        "count": 2,
+        "amount_scale": 2,
+        "transaction_types": ["income", "expense"],
+        "id": [item["id"] for item in listed.json()],
+        "amount_minor": [10, 123456],
+        "currency": [None, None],
+        "date": [int(datetime(2024, 3, 2, tzinfo=timezone.utc).timestamp() * 1000),
+                 int(datetime(2024, 3, 1, 12, 30, 0, 250000, tzinfo=timezone.utc).timestamp() * 1000)],
+        "transaction_type": [0, 1],
+        "category_id": [None, category["id"]],
+    }
+    # JSON stays the default, and wins when ranked higher
+    for accept in ("*/*", f"application/json, {COLUMNAR_MEDIA_TYPE};q=0.5"):
+        assert authenticated_client.get("/api/v1/transactions", headers={"Accept": accept}).headers["content-type"] == "application/json"
+
+    empty = authenticated_client.get("/api/v1/transactions", params={"q": "nothing"}, headers={"Accept": COLUMNAR_MEDIA_TYPE})
+    assert empty.json()["count"] == 0 and empty.json()["id"] == []
+
+    schema = authenticated_client.get("/openapi.json").json()
+    content = schema["paths"]["/api/v1/transactions"]["get"]["responses"]["200"]["content"]
+    assert content[COLUMNAR_MEDIA_TYPE]["schema"]["title"] == "TransactionColumns"
+
+
+def test_preferred_media_type():
+    """ Test Accept negotiation picks the offer with the highest quality, most specific range first"""
+    from app.utils.columnar import preferred_media_type
+
+    offered = ("application/json", "application/vnd.x+json")
+    assert preferred_media_type(None, offered) == "application/json"
+    assert preferred_media_type("application/vnd.x+json", offered) == "application/vnd.x+json"
+    assert preferred_media_type("application/*;q=0.5, application/vnd.x+json", offered) == "application/vnd.x+json"
+    assert preferred_media_type("application/vnd.x+json;q=0.9, */*", offered) == "application/json"
+    assert preferred_media_type("application/json;q=0, */*;q=0.1", offered) == "application/vnd.x+json"
+    assert preferred_media_type("text/html", offered) == "application/json"
+
+
+def test_get_transaction_query_count(authenticated_client, test_transaction_data, count_queries):
+    """ Test a single transaction and its category come back in one query"""
+    category = authenticated_client.post("/api/v1/categories", json={"name": "Rent"}).json()
+    test_transaction_data["category_id"] = category["id"]
+    tx_id = authenticated_client.post("/api/v1/transactions/", json=test_transaction_data).json()["id"]
+
+    with count_queries() as queries:
+        response = authenticated_client.get(f"/api/v1/transactions/{tx_id}")
+    assert response.json()["category"]["name"] == "Rent"
+    # data version (ETag) + the transaction joined with its category
+    assert len(queries) == 2
+
+
+def test_bulk_create_transactions(authenticated_client, second_authenticated_client, test_transaction_data):
+    """ Test bulk create inserts valid items and reports items with a foreign category"""
+    own_category = authenticated_client.post("/api/v1/categories", json={"name": "Food"}).json()
+    other_category = second_authenticated_client.post("/api/v1/categories", json={"name": "Food"}).json()
+    items = [dict(test_transaction_data, amount=i + 1) for i in range(3)]
+    items[1]["category_id"] = own_category["id"]
+    items[2]["category_id"] = other_category["id"]
+
+    response = authenticated_client.post("/api/v1/transactions/bulk", json={"items": items})
+    assert response.status_code == 201
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 1
+    assert data["results"][2] == {"index": 2, "id": None, "error": "Category not found"}
+
+    listed = authenticated_client.get("/api/v1/transactions/").json()
+    assert sorted(tx["id"] for tx in listed) == sorted(r["id"] for r in data["results"][:2])
+    assert any(tx["category"] and tx["category"]["name"] == "Food" for tx in listed)
+
+
+def test_bulk_create_transactions_invalid_item(authenticated_client, test_transaction_data):
+    """ Test a schema-invalid item rejects the whole request"""
+    items = [test_transaction_data, dict(test_transaction_data, amount=-5)]
+    response = authenticated_client.post("/api/v1/transactions/bulk", json={"items": items})
+    assert response.status_code == 422
+
+
+def test_list_transactions_etag(authenticated_client, test_transaction_data, count_queries):
+    """ Test If-None-Match with the current ETag gets a 304 without running the list queries"""
+    authenticated_client.post("/api/v1/transactions/", json=test_transaction_data)
+    response = authenticated_client.get("/api/v1/transactions/")
+    etag = response.headers["ETag"]
+
+    with count_queries() as queries:
+        response = authenticated_client.get("/api/v1/transactions/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert len(queries) == 1
+
+    # Any write moves the version on
+    tx_id = authenticated_client.post("/api/v1/transactions/", json=test_transaction_data).json()["id"]
+    response = authenticated_client.get("/api/v1/transactions/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    etag = response.headers["ETag"]
+    assert authenticated_client.get(f"/api/v1/transactions/{tx_id}", headers={"If-None-Match": etag}).status_code == 304
+    authenticated_client.put(f"/api/v1/transactions/{tx_id}", json={"amount": 5})
+    assert authenticated_client.get(f"/api/v1/transactions/{tx_id}", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_etag_is_per_user(authenticated_client, second_authenticated_client):
+    """ Test one user's writes do not change another user's ETag, and ETags never match across users"""
+    etag = authenticated_client.get("/api/v1/transactions/").headers["ETag"]
+    second_authenticated_client.post("/api/v1/categories", json={"name": "Food"})
+    assert authenticated_client.get("/api/v1/transactions/", headers={"If-None-Match": etag}).status_code == 304
+    assert second_authenticated_client.get("/api/v1/transactions/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_category_ownership_is_cached(authenticated_client, test_transaction_data, count_queries):
+    """ Test transaction writes check the category against the cached ids instead of a SELECT"""
+    category = authenticated_client.post("/api/v1/categories", json={"name": "Rent"}).json()
+    test_transaction_data["category_id"] = category["id"]
+    tx_id = authenticated_client.post("/api/v1/transactions/", json=test_transaction_data).json()["id"]
+
+    with count_queries() as queries:
+        assert authenticated_client.post("/api/v1/transactions/", json=test_transaction_data).status_code == 201
+        assert authenticated_client.put(f"/api/v1/transactions/{tx_id}", json={"category_id": category["id"]}).status_code == 200
+    assert not [q for q in queries if q.startswith("SELECT categories.id")]
+
+    # Deleting the category drops it from the cache
+    authenticated_client.delete(f"/api/v1/categories/{category['id']}")
+    assert authenticated_client.post("/api/v1/transactions/", json=test_transaction_data).status_code == 404
+
+
+def test_category_cache_reloads_on_unknown_id(authenticated_client, test_transaction_data, test_db):
+    """ Test a category created elsewhere (e.g. by another worker) is accepted despite a warm cache"""
+    from app.models.category import Category
+    user_id = authenticated_client.get("/api/v1/users/me").json()["id"]
+    rent = authenticated_client.post("/api/v1/categories", json={"name": "Rent"}).json()
+    # Warms the cache with {rent}
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, category_id=rent["id"]))
+
+    other = Category(user_id=user_id, name="Created elsewhere")
+    test_db.add(other)
+    test_db.commit()
+    response = authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, category_id=other.id))
+    assert response.status_code == 201
+
+
+def test_stale_category_cache_is_caught_by_foreign_key(authenticated_client, test_transaction_data, test_db, test_async_engine):
+    """ Test a category deleted elsewhere while cached is rejected by the database, then evicted"""
+    from sqlalchemy import event, text
+    from app.services.category_service import category_cache
+
+    @event.listens_for(test_async_engine.sync_engine, "connect")
+    def enable_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    category = authenticated_client.post("/api/v1/categories", json={"name": "Rent"}).json()
+    authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, category_id=category["id"]))
+    test_db.execute(text("DELETE FROM transactions"))
+    test_db.execute(text("DELETE FROM categories"))
+    test_db.commit()
+
+    response = authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, category_id=category["id"]))
+    assert response.status_code == 404
+    assert len(category_cache) == 0
+
+
+def test_list_transactions_filters(authenticated_client, test_transaction_data):
+    """ Test the list filters by date range, type, category, uncategorized and amount range"""
+    food = authenticated_client.post("/api/v1/categories", json={"name": "Food"}).json()
+    for date, amount, transaction_type, category_id in [
+        ("2024-01-05", 10, "expense", food["id"]),
+        ("2024-01-20", 50, "expense", None),
+        ("2024-02-03", 75, "income", None),
+        ("2024-02-10", 120, "expense", food["id"]),
+    ]:
+        authenticated_client.post("/api/v1/transactions/", json=dict(
+            test_transaction_data, date=date, amount=amount, transaction_type=transaction_type, category_id=category_id))
+
+    def amounts(**params):
+        response = authenticated_client.get("/api/v1/transactions/", params=params)
+        assert response.status_code == 200
+        return [float(t["amount"]) for t in response.json()]
+
+    assert amounts(**{"from": "2024-01-10", "to": "2024-02-05"}) == [75, 50]
+    assert amounts(transaction_type="income") == [75]
+    assert amounts(category_id=food["id"]) == [120, 10]
+    assert amounts(uncategorized="true") == [75, 50]
+    assert amounts(min_amount=20, max_amount=100) == [75, 50]
+    assert amounts(category_id=food["id"], min_amount=20, transaction_type="expense") == [120]
+
+    assert authenticated_client.get("/api/v1/transactions/", params={"category_id": food["id"], "uncategorized": "true"}).status_code == 400
+    assert authenticated_client.get("/api/v1/transactions/", params={"min_amount": 5, "max_amount": 1}).status_code == 400
+
+
+def test_list_transactions_filters_with_cursor(authenticated_client, test_transaction_data):
+    """ Test cursor pages of a filtered list only contain matching rows"""
+    for i in range(6):
+        authenticated_client.post("/api/v1/transactions/", json=dict(
+            test_transaction_data, amount=i + 1, transaction_type="income" if i % 2 else "expense"))
+
+    response = authenticated_client.get("/api/v1/transactions/", params={"transaction_type": "income", "limit": 2})
+    page = [float(t["amount"]) for t in response.json()]
+    response = authenticated_client.get("/api/v1/transactions/", params={
+        "transaction_type": "income", "limit": 2, "cursor": response.headers["X-Next-Cursor"]})
+    page += [float(t["amount"]) for t in response.json()]
+    assert sorted(page) == [2, 4, 6]
+
+
+def test_search_transactions_description(authenticated_client, test_transaction_data):
+    """ Test q matches whole words and a typed prefix, and follows updates and deletes"""
+    ids = {}
+    for description in ["Weekly grocery shopping", "Coffee with Sam", "Grocery delivery fee", None]:
+        response = authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, description=description))
+        ids[description] = response.json()["id"]
+
+    def found(q):
+        return sorted(t["description"] for t in authenticated_client.get("/api/v1/transactions/", params={"q": q}).json())
+
+    assert found("grocery") == ["Grocery delivery fee", "Weekly grocery shopping"]
+    assert found("groc") == ["Grocery delivery fee", "Weekly grocery shopping"]
+    assert found("grocery fee") == ["Grocery delivery fee"]
+    assert found('coffee "OR') == []
+    assert found("tea") == []
+
+    authenticated_client.put(f"/api/v1/transactions/{ids['Coffee with Sam']}", json={"description": "Tea with Sam"})
+    assert found("tea") == ["Tea with Sam"]
+    assert found("coffee") == []
+    authenticated_client.delete(f"/api/v1/transactions/{ids['Grocery delivery fee']}")
+    assert found("grocery") == ["Weekly grocery shopping"]
+
+
+def test_search_is_per_user(authenticated_client, second_authenticated_client, test_transaction_data):
+    """ Test the description search never returns another user's transactions"""
+    second_authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, description="Secret rent"))
+    assert authenticated_client.get("/api/v1/transactions/", params={"q": "rent"}).json() == []
+
+
+def test_dates_stored_as_naive_utc(authenticated_client, test_transaction_data):
+    """Test aware dates are converted to UTC before binding, and come back as naive UTC"""
+    from datetime import datetime, timedelta, timezone
+    from app.database import UTCDateTime
+
+    aware = datetime(2024, 3, 10, 23, 0, tzinfo=timezone(timedelta(hours=2)))
+    assert UTCDateTime().process_bind_param(aware, None) == datetime(2024, 3, 10, 21, 0)
+
+    created = authenticated_client.post("/api/v1/transactions/", json=dict(test_transaction_data, date="2024-03-10T23:00:00+02:00")).json()
+    response = authenticated_client.get(f"/api/v1/transactions/{created['id']}")
+    assert response.json()["date"] == "2024-03-10T21:00:00"
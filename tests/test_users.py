@@ -0,0 +1,48 @@
+from app.utils.dependencies import user_cache
+
+
+def test_current_user_is_cached(authenticated_client):
+    """Test repeated authenticated requests are served from the user cache"""
+    authenticated_client.get("/api/v1/users/me")
+    hits_before = user_cache.hits
+    response = authenticated_client.get("/api/v1/users/me")
+    assert response.status_code == 200
+    assert user_cache.hits == hits_before + 1
+
+
+def test_profile_update_invalidates_cache(authenticated_client):
+    """Test the profile reflects an update right away instead of the cached snapshot"""
+    authenticated_client.get("/api/v1/users/me")
+    authenticated_client.put("/api/v1/users/me", json={"username": "renamed"})
+    response = authenticated_client.get("/api/v1/users/me")
+    assert response.json()["username"] == "renamed"
+
+
+def test_deleted_user_is_not_served_from_cache(authenticated_client):
+    """Test a deleted account can no longer authenticate"""
+    authenticated_client.get("/api/v1/users/me")
+    authenticated_client.delete("/api/v1/users/me")
+    response = authenticated_client.get("/api/v1/users/me")
+    assert response.status_code == 401
+
+
+def test_delete_user_with_categorized_transactions(authenticated_client, test_transaction_data):
+    """Test deleting an account also removes its categories and transactions"""
+    category = authenticated_client.post("/api/v1/categories", json={"name": "Bills"}).json()
+    test_transaction_data["category_id"] = category["id"]
+    authenticated_client.post("/api/v1/transactions/", json=test_transaction_data)
+    response = authenticated_client.delete("/api/v1/users/me")
+    assert response.status_code == 200
+
+
+def test_profile_etag(authenticated_client):
+    """Test /me answers 304 for an unchanged profile and 200 after an update"""
+    etag = authenticated_client.get("/api/v1/users/me").headers["ETag"]
+    response = authenticated_client.get("/api/v1/users/me", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    authenticated_client.put("/api/v1/users/me", json={"username": "renamed"})
+    response = authenticated_client.get("/api/v1/users/me", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["username"] == "renamed"
+    assert response.headers["ETag"] != etag